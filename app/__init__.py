@@ -1,13 +1,46 @@
-from flask import Flask
-from flask_sqlalchemy import SQLAlchemy
-from flask_migrate import Migrate
-from dotenv import load_dotenv
 import os
 
-load_dotenv()
 
+def load_environment():
+    """
+    Loads the `.env` file, unless the configuration is already in the
+    environment, as in a container or on a serverless runtime.
+    """
+    if "DATABASE_URI" not in os.environ:
+        from dotenv import load_dotenv
 
-def create_app(db_instance):
+        load_dotenv()
+
+
+load_environment()
+
+# applications created without a database, registered by the next `get_db()`
+_deferred_apps = []
+
+
+def get_db():
+    """
+    Returns:
+        SQLAlchemy: The `db` of this package (`app.database`). The first call
+        imports SQLAlchemy; every call registers it on the applications
+        `create_app` deferred.
+    """
+    from app.database import db
+
+    while _deferred_apps:
+        init_database(_deferred_apps.pop(0), db)
+    return db
+
+
+def create_app(db_instance=None):
+    """
+    Builds the Flask application. Without `db_instance`, the `db` of this
+    package is registered by the next `get_db()`, so that SQLAlchemy is only
+    imported once a request or a command needs the database. Debug
+    applications and the `flask` command register it right away, with
+    Flask-Migrate for `flask db`.
+    """
+    from flask import Flask
 
     app = Flask(__name__)
     app.config["SQLALCHEMY_DATABASE_URI"] = os.getenv(
@@ -15,10 +48,24 @@ def create_app(db_instance):
     )
     app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
 
-    db_instance.init_app(app)
-    Migrate(app, db_instance)
-
+    if db_instance is None:
+        # Flask refuses new teardown functions after the first request of a
+        # debug application, the database of those is registered right away
+        if not app.debug and os.getenv("FLASK_RUN_FROM_CLI") != "true":
+            _deferred_apps.append(app)
+            return app
+        db_instance = get_db()
+    init_database(app, db_instance)
     return app
 
 
-db = SQLAlchemy()
+def init_database(app, db_instance):
+    from app.db_pool import create_engine_options
+
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = create_engine_options()
+    db_instance.init_app(app)
+    if os.getenv("FLASK_RUN_FROM_CLI") == "true":
+        # migrations only run from the command line
+        from flask_migrate import Migrate
+
+        Migrate(app, db_instance)
@@ -0,0 +1,322 @@
+"""
+Asyncio serving mode: the health, enter-path and get-last-executions routes
+of `app.main`, with the same JSON contract, as an ASGI application. Both
+front ends run enter-path through `app.handlers`.
+
+    pip install uvicorn  # optional, not in requirements.txt
+    uvicorn app.asgi:app --host 0.0.0.0 --port 5000
+
+Connections are handled by the event loop, so idle keep-alive clients cost
+no thread. The validation and the algorithm run on a pool of CPU threads
+(or, through them, on the process backend), and the queries on the threads
+of `AsyncExecutionQueryService`.
+"""
+import asyncio
+import json
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import partial
+from typing import Any, Awaitable, Callable, Dict, List, NamedTuple, Optional, Tuple
+from urllib.parse import parse_qsl
+
+from sqlalchemy import create_engine
+from sqlalchemy.engine.url import make_url
+from sqlalchemy.orm import scoped_session, sessionmaker
+from sqlalchemy.pool import QueuePool, StaticPool
+
+from app.db_pool import create_engine_options, dialect_engine_options
+from app.db_queries import (
+    AsyncExecutionQueryService,
+    ExecutionQueryService,
+    create_rollup_buffer,
+    create_write_buffer,
+)
+from app.engine_selector import create_engine_selector
+from app.execution_backend import create_execution_backend
+from app.handlers import (
+    error_body,
+    execution_body,
+    is_binary,
+    log_execution,
+    parse_path,
+    path_archive,
+    run_path,
+)
+from app.path_archive import path_archive_enabled
+from app.result_cache import create_result_cache
+from app.serialization import dumps, execution_item, stream_json_array
+from app.validation import InvalidInputError, parse_executions_page
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger("RobotCleaningService")
+
+
+class Database:
+    """
+    The `session` and `app_context` of Flask-SQLAlchemy, without Flask, for
+    `ExecutionQueryService` and `ExecutionWriteBuffer`.
+    """
+
+    def __init__(self, uri: str):
+        url = make_url(uri)
+        self.engine = create_engine(
+            url, **dialect_engine_options(url, create_engine_options())
+        )
+        # the executions are used after their session is removed
+        self.session = scoped_session(
+            sessionmaker(bind=self.engine, expire_on_commit=False)
+        )
+
+    def max_connections(self) -> int:
+        """
+        Returns:
+            int: How many connections the pool hands out at a time: its size
+            plus its overflow, 1 for an in-memory SQLite database, and the CPU
+            count for a NullPool, which has no bound of its own.
+        """
+        pool = self.engine.pool
+        if isinstance(pool, QueuePool):
+            return pool.size() + max(pool._max_overflow, 0)
+        if isinstance(pool, StaticPool):
+            return 1
+        return os.cpu_count() or 1
+
+    @contextmanager
+    def app_context(self):
+        try:
+            yield
+        finally:
+            self.session.remove()
+
+
+class Request(NamedTuple):
+    method: str
+    path: str
+    query: Dict[str, str]
+    headers: Dict[str, str]
+    body: bytes
+
+    @property
+    def mimetype(self) -> str:
+        return self.headers.get("content-type", "").split(";")[0].strip().lower()
+
+
+class Response(NamedTuple):
+    status: int
+    body: bytes
+    headers: List[Tuple[bytes, bytes]] = []
+
+
+def json_response(
+    data: Any, status: int = 200, headers: Optional[Dict[str, str]] = None
+) -> Response:
+    extra = [
+        (name.lower().encode(), value.encode())
+        for name, value in (headers or {}).items()
+    ]
+    return Response(
+        status, dumps(data), [(b"content-type", b"application/json")] + extra
+    )
+
+
+class ASGIApp:
+    """Routes the HTTP requests of an ASGI server to the handlers below."""
+
+    def __init__(
+        self,
+        database: Database,
+        cpu_workers: int,
+        write_buffer=None,
+        rollup_buffer=None,
+    ):
+        self.database = database
+        self.write_buffer = write_buffer
+        self.rollup_buffer = rollup_buffer
+        self.db_service = AsyncExecutionQueryService(
+            ExecutionQueryService(database, write_buffer, rollup_buffer),
+            database.max_connections(),
+        )
+        self.cpu_executor = ThreadPoolExecutor(
+            max_workers=cpu_workers, thread_name_prefix="robot-cpu"
+        )
+        self.execution_backend = create_execution_backend()
+        self.result_cache = create_result_cache()
+        self.engine_selector = create_engine_selector()
+        self.archive_paths = path_archive_enabled()
+        self.routes: Dict[Tuple[str, str], Callable[[Request], Awaitable[Response]]] = {
+            ("GET", "/health"): self.health,
+            (
+                "GET",
+                "/robot-cleaning-service/get-last-executions",
+            ): self.get_last_executions,
+            ("POST", "/robot-cleaning-service/enter-path"): self.enter_path,
+        }
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self.lifespan(receive, send)
+            return
+        if scope["type"] != "http":
+            return
+
+        handler = self.routes.get((scope["method"], scope["path"]))
+        if handler is None:
+            if any(path == scope["path"] for _, path in self.routes):
+                response = json_response({"error": "Method not allowed"}, 405)
+            else:
+                response = json_response({"error": "Not found"}, 404)
+        else:
+            request = Request(
+                scope["method"],
+                scope["path"],
+                dict(parse_qsl(scope.get("query_string", b"").decode("latin-1"))),
+                {
+                    name.decode("latin-1").lower(): value.decode("latin-1")
+                    for name, value in scope.get("headers", [])
+                },
+                await read_body(receive),
+            )
+            response = await handler(request)
+
+        await send(
+            {
+                "type": "http.response.start",
+                "status": response.status,
+                "headers": response.headers
+                + [(b"content-length", str(len(response.body)).encode())],
+            }
+        )
+        await send({"type": "http.response.body", "body": response.body})
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                self.close()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    def close(self):
+        for buffer in (self.write_buffer, self.rollup_buffer):
+            if buffer is not None:
+                buffer.close()
+        self.db_service.close()
+        self.cpu_executor.shutdown(wait=True)
+        self.execution_backend.shutdown()
+        self.database.engine.dispose()
+
+    async def health(self, request: Request) -> Response:
+        return json_response({"status": "healthy"})
+
+    async def get_last_executions(self, request: Request) -> Response:
+        try:
+            before, limit = parse_executions_page(request.query)
+        except InvalidInputError as e:
+            return json_response({"error": e.errors}, 400)
+        try:
+            executions = await self.db_service.get_last_executions(before, limit)
+        except Exception as e:
+            logger.error(f"An unexpected error occurred: {e}")
+            return json_response({"error": "Internal server error"}, 500)
+
+        body = await self.offload(
+            lambda: "".join(stream_json_array(map(execution_item, executions))).encode()
+        )
+        return Response(200, body, [(b"content-type", b"application/json")])
+
+    async def enter_path(self, request: Request) -> Response:
+        try:
+            binary = is_binary(request.mimetype)
+            try:
+                path, run = await self.offload(self.execute_path, request, binary)
+            except InvalidInputError as e:
+                logger.error("Input validation failed")
+                return json_response({"error": e.errors}, 400)
+
+            execution = await self.db_service.add_execution(
+                len(path.commands),
+                run.result,
+                run.duration,
+                path_archive(path, binary) if self.archive_paths else None,
+            )
+            log_execution(path, binary, run)
+            return json_response(
+                execution_body(path, run, execution),
+                201,
+                {"X-Cache": run.cache_status} if run.cache_status is not None else None,
+            )
+        except Exception as e:
+            return json_response(*error_body(e))
+
+    def execute_path(self, request: Request, binary: bool):
+        """
+        The CPU part of enter-path, run on a CPU thread: parses the body and
+        runs it through `app.handlers.run_path`.
+
+        Raises:
+            InvalidInputError: When the body is not a valid path.
+        """
+        path = parse_path(binary, lambda: request.body, partial(parse_json, request))
+        return path, run_path(
+            path,
+            binary,
+            self.result_cache,
+            self.engine_selector,
+            self.execution_backend,
+        )
+
+    async def offload(self, fn: Callable[..., Any], *args: Any) -> Any:
+        return await asyncio.get_running_loop().run_in_executor(
+            self.cpu_executor, partial(fn, *args)
+        )
+
+
+async def read_body(receive) -> bytes:
+    chunks = []
+    while True:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            break
+        chunks.append(message.get("body", b""))
+        if not message.get("more_body", False):
+            break
+    return b"".join(chunks)
+
+
+def parse_json(request: Request) -> Any:
+    """
+    The body, like Flask's `get_json`: None when it is not JSON, and an error
+    (an internal error in both front ends) when it is malformed.
+    """
+    if request.mimetype != "application/json" and not request.mimetype.endswith(
+        "+json"
+    ):
+        return None
+    return json.loads(request.body)
+
+
+def create_asgi_app(database_uri: Optional[str] = None) -> ASGIApp:
+    """
+    Builds the ASGI application from the environment of `app.main`, plus:
+        ASGI_CPU_THREADS: threads running the validation and the algorithm
+            (default: CPU count)
+    The database threads match the connection pool size plus its overflow.
+    """
+    database = Database(
+        database_uri
+        or os.getenv("DATABASE_URI", "postgresql://user:password@db:5432/robot_service")
+    )
+    write_buffer = create_write_buffer(database, database)
+    return ASGIApp(
+        database,
+        cpu_workers=int(os.getenv("ASGI_CPU_THREADS", os.cpu_count() or 1)),
+        write_buffer=write_buffer,
+        rollup_buffer=create_rollup_buffer(database, database, write_buffer),
+    )
+
+
+app = create_asgi_app()
@@ -0,0 +1,445 @@
+import time
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from app.execute_commands_numpy import (
+    Segments,
+    commands_to_arrays,
+    count_crossings_arrays,
+    count_segment_points,
+    create_segments,
+    merge_segment_arrays,
+)
+
+# below this many rectangles, counting them one by one beats the fixed cost
+# of a sweep over all the lines
+SWEEP_MIN_RECTANGLES = 16
+
+
+class CoverageIndex:
+    """
+    The cells visited by a path, kept as its merged horizontal and vertical
+    lines, to answer "was this cell visited?" and "how many cells of this
+    rectangle were visited?" without building the set of visited points.
+
+    The merged lines are sorted by constant and start and do not overlap
+    within a constant, so the line that may hold a cell is found by bisect.
+    """
+
+    def __init__(self, horizontal: Segments, vertical: Segments):
+        self.horizontal = horizontal
+        self.vertical = vertical
+        self.size = (
+            count_segment_points(horizontal[1], horizontal[2])
+            + count_segment_points(vertical[1], vertical[2])
+            - count_crossings_arrays(vertical, horizontal)
+        )
+
+    @classmethod
+    def from_arrays(
+        cls, directions: np.ndarray, steps: np.ndarray, x: int, y: int
+    ) -> "CoverageIndex":
+        """
+        Indexes the path given as direction code and steps arrays. The start
+        is added as a one-cell horizontal line, for paths that do not move.
+        time complexity: O(nlogn)
+        """
+        horizontal, vertical = create_segments(x, y, directions, steps.astype(np.int64))
+        start = ([y], [x], [x])
+        horizontal = tuple(
+            np.concatenate((line, point)) for line, point in zip(horizontal, start)
+        )
+        return cls(merge_segment_arrays(*horizontal), merge_segment_arrays(*vertical))
+
+    @classmethod
+    def from_commands(
+        cls, commands: List[Dict[str, int]], x: int, y: int
+    ) -> "CoverageIndex":
+        """Indexes the path of `commands`, as given to `execute_commands_v2`."""
+        return cls.from_arrays(*commands_to_arrays(commands), x, y)
+
+    def __len__(self) -> int:
+        return self.size
+
+    def contains(self, xs: np.ndarray, ys: np.ndarray) -> np.ndarray:
+        """
+        Batch point lookup.
+        time complexity: O(logn) per point
+
+        Returns:
+            np.ndarray: For every (x, y) point, whether the path visited it.
+        """
+        xs = np.asarray(xs, dtype=np.int64)
+        ys = np.asarray(ys, dtype=np.int64)
+        return _on_segments(self.horizontal, ys, xs) | _on_segments(
+            self.vertical, xs, ys
+        )
+
+    def count(self, x1: int, y1: int, x2: int, y2: int) -> int:
+        """
+        Counts the visited cells of the rectangle with the opposite corners
+        (x1, y1) and (x2, y2), both included.
+        time complexity: O(logn + klogk), k being the number of lines crossing
+        the rectangle
+
+        The lines of the rectangle's band are found by bisect and clipped to
+        it. The cells shared by a horizontal and a vertical line are counted
+        once by subtracting the crossings of the clipped lines.
+
+        Returns:
+            int: The number of visited cells inside the rectangle.
+        """
+        x1, x2 = min(x1, x2), max(x1, x2)
+        y1, y2 = min(y1, y2), max(y1, y2)
+        horizontal = _clip(self.horizontal, y1, y2, x1, x2)
+        vertical = _clip(self.vertical, x1, x2, y1, y2)
+        return (
+            count_segment_points(horizontal[1], horizontal[2])
+            + count_segment_points(vertical[1], vertical[2])
+            - count_crossings_arrays(vertical, horizontal)
+        )
+
+    def count_rectangles(self, rectangles: np.ndarray) -> np.ndarray:
+        """
+        Batch counterpart of `count`, for (x1, y1, x2, y2) rows of opposite
+        corners. Past a few rectangles, they share one sweep of the lines,
+        see `count_rectangles`.
+        time complexity: O((n + r)logn) for r rectangles
+
+        Returns:
+            np.ndarray: The number of visited cells inside each rectangle.
+        """
+        rectangles = np.asarray(rectangles, dtype=np.int64).reshape(-1, 4)
+        if len(rectangles) < SWEEP_MIN_RECTANGLES:
+            return np.array(
+                [self.count(*map(int, rectangle)) for rectangle in rectangles],
+                dtype=np.int64,
+            )
+        xs, ys = rectangles[:, 0::2], rectangles[:, 1::2]
+        # cells beyond the path count nothing: the clipped corners stay far
+        # from the int64 limits
+        h_constants, h_starts, h_ends = self.horizontal
+        v_constants, v_starts, v_ends = self.vertical
+        x_low = min(h_starts.min(), v_constants.min(initial=h_starts.min())) - 1
+        x_high = max(h_ends.max(), v_constants.max(initial=h_ends.max())) + 1
+        y_low = min(h_constants.min(), v_starts.min(initial=h_constants.min())) - 1
+        y_high = max(h_constants.max(), v_ends.max(initial=h_constants.max())) + 1
+        xs = np.clip(xs, x_low, x_high)
+        ys = np.clip(ys, y_low, y_high)
+        return count_rectangles(
+            self.horizontal,
+            self.vertical,
+            xs.min(axis=1),
+            ys.min(axis=1),
+            xs.max(axis=1),
+            ys.max(axis=1),
+        )
+
+
+class ActiveCounters:
+    """
+    Counters, one per leaf, that only count while their leaf is active:
+    `add` increments the active counters of a range and `sum` adds the
+    counters of a range, active or not. A segment tree keeps, for every
+    node, its active leaves and the sum of its counters; the increments are
+    pushed down lazily, and along the path of a leaf before it is toggled,
+    so every operation is O(logn) without recursion.
+    """
+
+    def __init__(self, size: int):
+        self.levels = max(1, (size - 1).bit_length())
+        self.size = 1 << self.levels
+        self.active = [0] * (2 * self.size)
+        self.total = [0] * (2 * self.size)
+        self.pending = [0] * self.size
+
+    def set_active(self, leaf: int, active: int):
+        node = leaf + self.size
+        for level in range(self.levels, 0, -1):
+            self._push(node >> level)
+        delta = active - self.active[node]
+        while node:
+            self.active[node] += delta
+            node >>= 1
+
+    def add(self, first: int, last: int):
+        """Increments the active counters of the leaves [first, last)."""
+        if first >= last:
+            return
+        low, high = first + self.size, last + self.size
+        self._push_bounds(low, high)
+        left, right = low, high
+        while left < right:
+            if left & 1:
+                self._apply(left, 1)
+                left += 1
+            if right & 1:
+                right -= 1
+                self._apply(right, 1)
+            left >>= 1
+            right >>= 1
+        # the ancestors of the updated nodes are computed again
+        for level in range(1, self.levels + 1):
+            if (low >> level) << level != low:
+                node = low >> level
+                self.total[node] = self.total[2 * node] + self.total[2 * node + 1]
+            if (high >> level) << level != high:
+                node = (high - 1) >> level
+                self.total[node] = self.total[2 * node] + self.total[2 * node + 1]
+
+    def sum(self, first: int, last: int) -> int:
+        """The sum of the counters of the leaves [first, last)."""
+        if first >= last:
+            return 0
+        left, right = first + self.size, last + self.size
+        self._push_bounds(left, right)
+        total = 0
+        while left < right:
+            if left & 1:
+                total += self.total[left]
+                left += 1
+            if right & 1:
+                right -= 1
+                total += self.total[right]
+            left >>= 1
+            right >>= 1
+        return total
+
+    def _apply(self, node: int, increment: int):
+        self.total[node] += self.active[node] * increment
+        if node < self.size:
+            self.pending[node] += increment
+
+    def _push(self, node: int):
+        increment = self.pending[node]
+        if increment:
+            self._apply(2 * node, increment)
+            self._apply(2 * node + 1, increment)
+            self.pending[node] = 0
+
+    def _push_bounds(self, low: int, high: int):
+        # the nodes above the range are only partly covered by it
+        for level in range(self.levels, 0, -1):
+            if (low >> level) << level != low:
+                self._push(low >> level)
+            if (high >> level) << level != high:
+                self._push((high - 1) >> level)
+
+
+class LinearPrefixSums:
+    """
+    Fenwick tree of (a, b) pairs: `value(m, t)` is the sum of `a * t + b`
+    over the first `m` entries.
+    """
+
+    def __init__(self, size: int):
+        self.a = [0] * (size + 1)
+        self.b = [0] * (size + 1)
+
+    def add(self, index: int, a: int, b: int):
+        index += 1
+        while index < len(self.a):
+            self.a[index] += a
+            self.b[index] += b
+            index += index & -index
+
+    def value(self, count: int, t: int) -> int:
+        a = b = 0
+        while count:
+            a += self.a[count]
+            b += self.b[count]
+            count -= count & -count
+        return a * t + b
+
+
+def count_rectangles(
+    horizontal: Segments,
+    vertical: Segments,
+    x1: np.ndarray,
+    y1: np.ndarray,
+    x2: np.ndarray,
+    y2: np.ndarray,
+) -> np.ndarray:
+    """
+    Counts the cells of the merged lines inside every rectangle
+    [x1, x2] x [y1, y2] in one sweep along x, instead of clipping the lines
+    and counting their crossings once per rectangle.
+    time complexity: O((n + r)logn) for n lines and r rectangles
+    space complexity: O(n + r)
+
+    A rectangle is the band [y1, y2] up to x2 minus the band up to x1 - 1.
+    The horizontal lines are sorted by y, so a band is a range of them; its
+    cells up to the sweep position grow by one per line that started and
+    has not ended, kept as `a * x + b` per line. The vertical lines passed
+    add their cells in [y1, y2] the same way along y. Their crossings are
+    counted on the horizontal lines: every vertical line increments the
+    counters of the horizontal lines it crosses, those of its y range that
+    are active at its x, see `ActiveCounters`.
+
+    Returns:
+        np.ndarray: The number of cells inside each rectangle.
+    """
+    h_constants, h_starts, h_ends = horizontal
+    v_constants, v_starts, v_ends = vertical
+    h_count, v_count, r_count = len(h_constants), len(v_constants), len(x1)
+    if r_count == 0:
+        return np.zeros(0, dtype=np.int64)
+
+    # the range of horizontal lines in every band and crossed by every line
+    firsts = np.searchsorted(h_constants, y1, side="left").tolist()
+    lasts = np.searchsorted(h_constants, y2, side="right").tolist()
+    crossed_firsts = np.searchsorted(h_constants, v_starts, side="left").tolist()
+    crossed_lasts = np.searchsorted(h_constants, v_ends, side="right").tolist()
+    # the y positions where a vertical line starts or stops adding cells
+    y_keys = np.unique(np.concatenate((v_starts, v_ends + 1)))
+    start_keys = np.searchsorted(y_keys, v_starts).tolist()
+    end_keys = np.searchsorted(y_keys, v_ends + 1).tolist()
+    high_keys = np.searchsorted(y_keys, y2, side="right").tolist()
+    low_keys = np.searchsorted(y_keys, y1 - 1, side="right").tolist()
+
+    # at the same x, the lines are toggled before the vertical lines cross
+    # them, and the queries see both
+    event_x = np.concatenate((h_starts, h_ends + 1, v_constants, x2, x1 - 1))
+    kinds = np.repeat([0, 0, 1, 2, 2], [h_count, h_count, v_count, r_count, r_count])
+    order = np.lexsort((kinds, event_x))
+    event_x = event_x.tolist()
+    h_starts, h_ends = h_starts.tolist(), h_ends.tolist()
+    v_starts, v_ends = v_starts.tolist(), v_ends.tolist()
+    y1, y2 = y1.tolist(), y2.tolist()
+
+    crossings = ActiveCounters(h_count)
+    h_cells = LinearPrefixSums(h_count)
+    v_cells = LinearPrefixSums(len(y_keys))
+    counts = [0] * r_count
+    v_first, r_first = 2 * h_count, 2 * h_count + v_count
+    for event in order.tolist():  # O(n + r) events of O(logn)
+        if event < h_count:
+            crossings.set_active(event, 1)
+            h_cells.add(event, 1, 1 - h_starts[event])
+        elif event < v_first:
+            line = event - h_count
+            crossings.set_active(line, 0)
+            h_cells.add(line, -1, h_ends[line])
+        elif event < r_first:
+            line = event - v_first
+            crossings.add(crossed_firsts[line], crossed_lasts[line])
+            v_cells.add(start_keys[line], 1, 1 - v_starts[line])
+            v_cells.add(end_keys[line], -1, v_ends[line])
+        else:
+            rectangle = (event - r_first) % r_count
+            x, first, last = event_x[event], firsts[rectangle], lasts[rectangle]
+            cells = (
+                h_cells.value(last, x)
+                - h_cells.value(first, x)
+                + v_cells.value(high_keys[rectangle], y2[rectangle])
+                - v_cells.value(low_keys[rectangle], y1[rectangle] - 1)
+                - crossings.sum(first, last)
+            )
+            counts[rectangle] += cells if event - r_first < r_count else -cells
+    return np.array(counts, dtype=np.int64)
+
+
+def _candidates(
+    constants: np.ndarray,
+    starts: np.ndarray,
+    query_constants: np.ndarray,
+    query_positions: np.ndarray,
+) -> np.ndarray:
+    """
+    The last segment at or before every query in (constant, start) order,
+    -1 when there is none. A combined key lets one np.searchsorted bisect
+    both orders, unless it could overflow.
+    """
+    constant_min, constant_max = int(constants.min()), int(constants.max())
+    start_min, start_max = int(starts.min()), int(starts.max())
+    span = start_max - start_min + 2
+    if (constant_max - constant_min + 3) * span < 1 << 62:
+        # values outside the segments compare like the next value outside them
+        keys = (constants - constant_min + 1) * span + (starts - start_min + 1)
+        query_keys = (
+            np.clip(query_constants, constant_min - 1, constant_max + 1)
+            - constant_min
+            + 1
+        ) * span + (np.clip(query_positions, start_min - 1, start_max) - start_min + 1)
+        return np.searchsorted(keys, query_keys, side="right") - 1
+
+    # merge the queries into the segments, a segment before a query it ties
+    count = len(constants)
+    order = np.lexsort(
+        (
+            np.concatenate((np.zeros(count), np.ones(len(query_constants)))),
+            np.concatenate((starts, query_positions)),
+            np.concatenate((constants, query_constants)),
+        )
+    )
+    last = np.maximum.accumulate(np.where(order < count, order, -1))
+    candidates = np.empty(len(query_constants), dtype=np.int64)
+    candidates[order[order >= count] - count] = last[order >= count]
+    return candidates
+
+
+def _on_segments(
+    segments: Segments, query_constants: np.ndarray, query_positions: np.ndarray
+) -> np.ndarray:
+    constants, starts, ends = segments
+    if len(constants) == 0:
+        return np.zeros(len(query_constants), dtype=bool)
+    candidates = _candidates(constants, starts, query_constants, query_positions)
+    found = np.maximum(candidates, 0)
+    return (
+        (candidates >= 0)
+        & (constants[found] == query_constants)
+        & (ends[found] >= query_positions)
+    )
+
+
+def _clip(
+    segments: Segments, constant_low: int, constant_high: int, low: int, high: int
+) -> Segments:
+    # the segments are sorted by constant: the band is one slice
+    constants, starts, ends = segments
+    first = np.searchsorted(constants, constant_low, side="left")
+    last = np.searchsorted(constants, constant_high, side="right")
+    constants, starts, ends = (
+        constants[first:last],
+        starts[first:last],
+        ends[first:last],
+    )
+    inside = (starts <= high) & (ends >= low)
+    return (
+        constants[inside],
+        np.maximum(starts[inside], low),
+        np.minimum(ends[inside], high),
+    )
+
+
+def execute_coverage_queries(
+    directions: np.ndarray,
+    steps: np.ndarray,
+    x: int,
+    y: int,
+    points: np.ndarray,
+    rectangles: np.ndarray,
+) -> Tuple[int, np.ndarray, List[int], float]:
+    """
+    Indexes a path and answers a batch of queries on it.
+
+    Args:
+        directions (np.ndarray): The direction codes of the commands.
+        steps (np.ndarray): The steps of the commands.
+        x (int): The starting x-coordinate of the robot.
+        y (int): The starting y-coordinate of the robot.
+        points (np.ndarray): (x, y) rows of the cells to look up.
+        rectangles (np.ndarray): (x1, y1, x2, y2) rows of opposite corners.
+
+    Returns:
+        Tuple[int, np.ndarray, List[int], float]: The number of unique points
+        visited, whether each point was visited, the visited cells of each
+        rectangle and the duration of the execution in seconds.
+    """
+    start_time = time.perf_counter()
+    index = CoverageIndex.from_arrays(directions, steps, x, y)
+    visited = index.contains(points[:, 0], points[:, 1])
+    counts = index.count_rectangles(rectangles).tolist()
+    return len(index), visited, counts, time.perf_counter() - start_time
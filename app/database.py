@@ -0,0 +1,18 @@
+import flask_sqlalchemy
+
+from app.db_pool import dialect_engine_options
+
+
+class SQLAlchemy(flask_sqlalchemy.SQLAlchemy):
+    def create_engine(self, sa_url, engine_opts):
+        # the options are read from the environment once, and adapted here to
+        # the database the engine is (re)created for
+        return super().create_engine(
+            sa_url, dialect_engine_options(sa_url, engine_opts)
+        )
+
+
+db = SQLAlchemy()
+
+# the tables are known as soon as `db` is, for `db.create_all()` and migrations
+from app import models  # noqa: E402,F401
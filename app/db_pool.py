@@ -0,0 +1,215 @@
+import os
+import threading
+import time
+from typing import Any, Dict, List
+
+from sqlalchemy import exc
+from sqlalchemy.engine.url import URL
+from sqlalchemy.pool import NullPool, QueuePool, StaticPool
+
+from app.instrumentation import POOL_CHECKOUT_SECONDS, Sample
+
+# create_engine arguments only the queue pool accepts
+QUEUE_POOL_OPTIONS = ("poolclass", "pool_size", "max_overflow", "pool_timeout")
+
+
+class PoolMetrics:
+    """Checkout counters of an `InstrumentedQueuePool`, updated under a lock."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.peak_checked_out = 0
+
+    def record_checkout(self, wait: float, checked_out: int):
+        with self.lock:
+            self.checkouts += 1
+            self.wait_seconds_total += wait
+            self.wait_seconds_max = max(self.wait_seconds_max, wait)
+            self.peak_checked_out = max(self.peak_checked_out, checked_out)
+
+    def record_timeout(self, wait: float):
+        with self.lock:
+            self.timeouts += 1
+            self.wait_seconds_total += wait
+            self.wait_seconds_max = max(self.wait_seconds_max, wait)
+
+
+class InstrumentedQueuePool(QueuePool):
+    """
+    QueuePool measuring how long every checkout takes: the wait for a free
+    connection, plus the connect of a new one and the pre-ping if any. The
+    times go to its `PoolMetrics` and to `POOL_CHECKOUT_SECONDS`, served at
+    /metrics.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def connect(self):
+        start_time = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            wait = time.perf_counter() - start_time
+            self.metrics.record_timeout(wait)
+            POOL_CHECKOUT_SECONDS.observe(("timeout",), wait)
+            raise
+        wait = time.perf_counter() - start_time
+        self.metrics.record_checkout(wait, self.checkedout())
+        POOL_CHECKOUT_SECONDS.observe(("checkout",), wait)
+        return connection
+
+
+def create_engine_options() -> Dict[str, Any]:
+    """
+    Reads the connection pool configuration from the environment:
+    - DATABASE_POOL_SIZE: connections kept open (default: 10), 0 opens a
+      new connection for every checkout, e.g. behind PgBouncer.
+    - DATABASE_MAX_OVERFLOW: connections opened on top of the pool under
+      load, and closed when returned (default: 20).
+    - DATABASE_POOL_TIMEOUT: seconds to wait for a connection before failing
+      (default: 30).
+    - DATABASE_POOL_RECYCLE: seconds after which a connection is replaced
+      (default: 1800), -1 never replaces them.
+    - DATABASE_POOL_PRE_PING: 1 tests every connection on checkout, so
+      connections dropped by the server are replaced (default: 1).
+    - DATABASE_STATEMENT_TIMEOUT: milliseconds after which PostgreSQL
+      cancels a statement (default: 0, no timeout).
+
+    Returns:
+        Dict[str, Any]: The `SQLALCHEMY_ENGINE_OPTIONS`.
+    """
+    options = {
+        "pool_recycle": int(os.getenv("DATABASE_POOL_RECYCLE", "1800")),
+        "pool_pre_ping": os.getenv("DATABASE_POOL_PRE_PING", "1") == "1",
+    }
+    pool_size = int(os.getenv("DATABASE_POOL_SIZE", "10"))
+    if pool_size > 0:
+        options.update(
+            poolclass=InstrumentedQueuePool,
+            pool_size=pool_size,
+            max_overflow=int(os.getenv("DATABASE_MAX_OVERFLOW", "20")),
+            pool_timeout=float(os.getenv("DATABASE_POOL_TIMEOUT", "30")),
+        )
+    else:
+        options["poolclass"] = NullPool
+
+    statement_timeout = int(os.getenv("DATABASE_STATEMENT_TIMEOUT", "0"))
+    if statement_timeout > 0:
+        options["connect_args"] = {
+            "options": f"-c statement_timeout={statement_timeout}"
+        }
+    return options
+
+
+def dialect_engine_options(url: URL, options: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Adapts engine options to the database of `url`, so that the same
+    configuration works when the tests point the application to SQLite:
+    - the `options` connect argument is PostgreSQL only;
+    - an in-memory SQLite database is one connection, kept in a StaticPool;
+    - SQLite connections may be used by the thread that checks them out.
+
+    Returns:
+        Dict[str, Any]: A copy of the options, adapted.
+    """
+    options = dict(options)
+    connect_args = dict(options.get("connect_args", {}))
+    if url.get_backend_name() != "postgresql":
+        connect_args.pop("options", None)
+
+    if url.get_backend_name() == "sqlite":
+        if url.database in (None, "", ":memory:"):
+            for name in QUEUE_POOL_OPTIONS:
+                options.pop(name, None)
+            options["poolclass"] = StaticPool
+        connect_args["check_same_thread"] = False
+
+    if connect_args:
+        options["connect_args"] = connect_args
+    else:
+        options.pop("connect_args", None)
+    return options
+
+
+def pool_metrics(pool) -> Dict[str, Any]:
+    """
+    Returns:
+        Dict[str, Any]: The pool class and, for an `InstrumentedQueuePool`, its
+        current state and checkout counters since it was created.
+    """
+    metrics = {"pool": type(pool).__name__}
+    if not isinstance(pool, InstrumentedQueuePool):
+        return metrics
+
+    counters = pool.metrics
+    with counters.lock:
+        metrics.update(
+            {
+                "size": pool.size(),
+                "checked_in": pool.checkedin(),
+                "checked_out": pool.checkedout(),
+                "overflow": max(pool.overflow(), 0),
+                "max_overflow": pool._max_overflow,
+                "peak_checked_out": counters.peak_checked_out,
+                "checkouts": counters.checkouts,
+                "timeouts": counters.timeouts,
+                "wait_seconds_total": counters.wait_seconds_total,
+                "wait_seconds_max": counters.wait_seconds_max,
+                "wait_seconds_mean": (
+                    counters.wait_seconds_total / counters.checkouts
+                    if counters.checkouts
+                    else 0.0
+                ),
+            }
+        )
+    return metrics
+
+
+def pool_samples(pool) -> List[Sample]:
+    """
+    Returns:
+        List[Sample]: The state of an `InstrumentedQueuePool` as the gauges of
+        `app.instrumentation.render_samples`, none for another pool. Its
+        checkouts, timeouts and wait times are in `POOL_CHECKOUT_SECONDS`.
+    """
+    metrics = pool_metrics(pool)
+    if "size" not in metrics:
+        return []
+    return [
+        (
+            "robot_db_pool_size",
+            "gauge",
+            "Connections kept open by the database pool.",
+            metrics["size"],
+        ),
+        (
+            "robot_db_pool_checked_out",
+            "gauge",
+            "Connections of the database pool in use.",
+            metrics["checked_out"],
+        ),
+        (
+            "robot_db_pool_overflow",
+            "gauge",
+            "Connections opened on top of the database pool.",
+            metrics["overflow"],
+        ),
+        (
+            "robot_db_pool_peak_checked_out",
+            "gauge",
+            "Most connections of the database pool in use at once.",
+            metrics["peak_checked_out"],
+        ),
+        (
+            "robot_db_pool_wait_seconds_max",
+            "gauge",
+            "Longest checkout from the database pool.",
+            metrics["wait_seconds_max"],
+        ),
+    ]
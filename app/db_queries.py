@@ -1,29 +1,359 @@
-from app.models import Execution
+from app.models import Execution, ExecutionDurationHistogram, ExecutionRollup
+from app.path_archive import ArchivedPath, decode_path_archive
+from app.rollups import PERCENTILES, apply_rollups, percentile
+from sqlalchemy import tuple_
 from sqlalchemy.exc import SQLAlchemyError
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import List, Tuple, Dict, Any, Callable, Iterator, Optional
+import asyncio
+import atexit
+import datetime
+import logging
+import os
+import threading
+
+logger = logging.getLogger("RobotCleaningService")
+
+ARCHIVE_COLUMNS = ("path", "start_x", "start_y", "min_x", "min_y", "max_x", "max_y")
+Archive = Callable[[], Dict[str, Any]]
 
 
 class ExecutionQueryService:
-    def __init__(self, db):
+    def __init__(self, db, write_buffer=None, rollup_buffer=None):
         self.db = db
+        self.write_buffer = write_buffer
+        self.rollup_buffer = rollup_buffer
+
+    def add_execution(self, commands_count, result, duration, archive=None):
+        """
+        Stores an execution. With a write buffer the row is queued and written
+        in bulk later; the returned execution is not attached to the session,
+        but its timestamp is already set.
+
+        `archive` is an optional callable returning the path archive columns
+        (see `app.path_archive`). With a write buffer it is only called by
+        the flush thread, so compressing the path costs the request nothing.
+
+        With a rollup buffer the rollups are updated after the commit, by its
+        thread, instead of in the transaction of the request.
+        """
+        timestamp = datetime.datetime.utcnow()
+        row = {
+            "timestamp": timestamp,
+            "commands": commands_count,
+            "result": result,
+            "duration": duration,
+        }
+        if self.write_buffer is not None:
+            self.write_buffer.add(row, archive)
+            return Execution(**row)
 
-    def add_execution(self, commands_count, result, duration):
         try:
-            execution = Execution(
-                commands=commands_count, result=result, duration=duration
-            )
+            execution = Execution(**row, **resolve_archive(archive))
             self.db.session.add(execution)
+            if self.rollup_buffer is None:
+                apply_rollups(self.db.session, [row])
             self.db.session.commit()
-            return execution
         except SQLAlchemyError as e:
             self.db.session.rollback()
             raise Exception(f"Database error: {str(e)}")
+        if self.rollup_buffer is not None:
+            self.rollup_buffer.add(row)
+        return execution
 
-    def get_last_executions(self):
+    def add_executions(
+        self,
+        executions: List[Tuple[int, int, float]],
+        archives: Optional[List[Optional[Archive]]] = None,
+    ):
+        """
+        Stores a batch of (commands_count, result, duration) executions with a
+        single multi-row INSERT, or queues them in the write buffer.
+        `archives` holds the optional archive callable of each execution.
+
+        Returns:
+            List[Dict[str, Any]]: The stored rows, with their timestamps.
+        """
+        timestamp = datetime.datetime.utcnow()
+        rows = [
+            {
+                "timestamp": timestamp,
+                "commands": commands_count,
+                "result": result,
+                "duration": duration,
+            }
+            for commands_count, result, duration in executions
+        ]
+        archives = archives or [None] * len(rows)
+        if self.write_buffer is not None:
+            for row, archive in zip(rows, archives):
+                self.write_buffer.add(row, archive)
+        elif rows:
+            values = [dict(row) for row in rows]
+            if any(archives):
+                for row, archive in zip(values, archives):
+                    row.update(resolve_archive(archive))
+            try:
+                self.db.session.execute(Execution.__table__.insert().values(values))
+                if self.rollup_buffer is None:
+                    apply_rollups(self.db.session, rows)
+                self.db.session.commit()
+            except SQLAlchemyError as e:
+                self.db.session.rollback()
+                raise Exception(f"Database error: {str(e)}")
+            if self.rollup_buffer is not None:
+                for row in rows:
+                    self.rollup_buffer.add(row)
+        return rows
+
+    def insert_executions(self, rows: List[Dict[str, Any]]):
+        """
+        Inserts many executions in one round trip (executemany), skipping the
+        ORM unit of work.
+        """
+        if not rows:
+            return
         try:
-            return Execution.query.order_by(Execution.timestamp.desc()).limit(100).all()
+            self.db.session.execute(Execution.__table__.insert(), rows)
+            apply_rollups(self.db.session, rows)
+            self.db.session.commit()
         except SQLAlchemyError as e:
+            self.db.session.rollback()
+            raise Exception(f"Database error: {str(e)}")
+
+    def add_rollups(self, rows: List[Dict[str, Any]]):
+        """
+        Adds already stored executions to the rollups, in a transaction of
+        their own.
+        """
+        if not rows:
+            return
+        try:
+            apply_rollups(self.db.session, rows)
+            self.db.session.commit()
+        except SQLAlchemyError as e:
+            self.db.session.rollback()
+            raise Exception(f"Database error: {str(e)}")
+
+    def get_last_executions(
+        self,
+        before: Optional[Tuple[datetime.datetime, int]] = None,
+        limit: int = 100,
+    ):
+        """
+        Returns the most recent executions, older than the `before`
+        (timestamp, id) cursor when given. The query only selects columns
+        and walks the (timestamp, id) index, so a page costs the same on any
+        table size and builds no ORM objects.
+
+        Returns:
+            List[Row]: The id, timestamp, commands, result and duration of
+            each execution, newest first.
+        """
+        try:
+            return self._last_executions_query(before, limit).all()
+        except SQLAlchemyError as e:
+            raise Exception(f"Database error: {str(e)}")
+
+    def iter_last_executions(
+        self,
+        before: Optional[Tuple[datetime.datetime, int]] = None,
+        limit: int = 100,
+        batch_size: int = 500,
+    ) -> Iterator:
+        """
+        `get_last_executions`, streamed from the cursor `batch_size` rows at a
+        time. The query runs right away, so that its errors are raised before
+        a streamed response has started.
+        """
+        query = self._last_executions_query(before, limit)
+        rows = iter(query.execution_options(stream_results=True).yield_per(batch_size))
+        try:
+            # iterating a query is lazy: the first row runs it
+            first = next(rows, None)
+        except SQLAlchemyError as e:
+            raise Exception(f"Database error: {str(e)}")
+        return self._stream_rows(first, rows)
+
+    @staticmethod
+    def _stream_rows(first: Any, rows: Iterator) -> Iterator:
+        if first is None:
+            return
+        yield first
+        try:
+            yield from rows
+        except SQLAlchemyError as e:
+            raise Exception(f"Database error: {str(e)}")
+
+    def _last_executions_query(self, before, limit):
+        query = self.db.session.query(
+            Execution.id,
+            Execution.timestamp,
+            Execution.commands,
+            Execution.result,
+            Execution.duration,
+        )
+        if before is not None:
+            query = query.filter(tuple_(Execution.timestamp, Execution.id) < before)
+        return query.order_by(Execution.timestamp.desc(), Execution.id.desc()).limit(
+            limit
+        )
+
+    def get_stats(
+        self,
+        resolution: str,
+        since: datetime.datetime,
+        until: datetime.datetime,
+    ) -> List[Dict[str, Any]]:
+        """
+        Reads the execution statistics of the `resolution` ("minute" or
+        "hour") buckets starting in [since, until) from the rollup tables.
+        The cost depends on the number of buckets, not of executions.
+
+        Returns:
+            List[Dict[str, Any]]: For every bucket with executions, oldest
+            first: its start, the number of executions and commands, the mean
+            result and duration, and the duration percentiles.
+        """
+        rollup, histogram = ExecutionRollup, ExecutionDurationHistogram
+        try:
+            buckets = (
+                self.db.session.query(
+                    rollup.bucket_start,
+                    rollup.executions,
+                    rollup.total_commands,
+                    rollup.total_result,
+                    rollup.total_duration,
+                )
+                .filter(
+                    rollup.resolution == resolution,
+                    rollup.bucket_start >= since,
+                    rollup.bucket_start < until,
+                )
+                .order_by(rollup.bucket_start)
+                .all()
+            )
+            bins = (
+                self.db.session.query(
+                    histogram.bucket_start, histogram.bin, histogram.executions
+                )
+                .filter(
+                    histogram.resolution == resolution,
+                    histogram.bucket_start >= since,
+                    histogram.bucket_start < until,
+                )
+                .all()
+            )
+        except SQLAlchemyError as e:
+            raise Exception(f"Database error: {str(e)}")
+
+        histograms: Dict[datetime.datetime, Dict[int, int]] = {}
+        for start, bin, count in bins:
+            histograms.setdefault(start, {})[bin] = count
+
+        stats = []
+        for start, executions, commands, result, duration in buckets:
+            bucket = {
+                "start": start,
+                "executions": executions,
+                "commands": commands,
+                "mean_result": result / executions,
+                "mean_duration": duration / executions,
+            }
+            for q in PERCENTILES:
+                bucket[f"p{q}_duration"] = percentile(
+                    histograms.get(start, {0: executions}), executions, q
+                )
+            stats.append(bucket)
+        return stats
+
+    def rebuild_rollups(self, batch_size: int = 10000):
+        """
+        Recomputes the rollup tables from the execution table, e.g. after
+        the rollup migration on an existing database.
+        """
+        try:
+            self.db.session.query(ExecutionRollup).delete()
+            self.db.session.query(ExecutionDurationHistogram).delete()
+            last_id = 0
+            while True:
+                batch = (
+                    self.db.session.query(
+                        Execution.id,
+                        Execution.timestamp,
+                        Execution.commands,
+                        Execution.result,
+                        Execution.duration,
+                    )
+                    .filter(Execution.id > last_id, Execution.timestamp.isnot(None))
+                    .order_by(Execution.id)
+                    .limit(batch_size)
+                    .all()
+                )
+                apply_rollups(self.db.session, [row._asdict() for row in batch])
+                if len(batch) < batch_size:
+                    break
+                last_id = batch[-1].id
+            self.db.session.commit()
+        except SQLAlchemyError as e:
+            self.db.session.rollback()
             raise Exception(f"Database error: {str(e)}")
 
+    def get_archived_path(self, execution_id: int) -> Optional[ArchivedPath]:
+        """
+        Returns:
+            Optional[ArchivedPath]: The archived path of an execution, or None
+            when it was not archived.
+        """
+        try:
+            blob = (
+                self.db.session.query(Execution.path)
+                .filter(Execution.id == execution_id)
+                .scalar()
+            )
+        except SQLAlchemyError as e:
+            raise Exception(f"Database error: {str(e)}")
+        return decode_path_archive(blob) if blob is not None else None
+
+    def iter_archived_paths(
+        self, bounding_box: Optional[Tuple[int, int, int, int]] = None, batch_size=100
+    ) -> Iterator[Tuple[int, datetime.datetime, ArchivedPath]]:
+        """
+        Streams the archived paths in id order, optionally only those whose
+        bounding box intersects the (min_x, min_y, max_x, max_y) box. Paths
+        are fetched `batch_size` at a time with keyset pagination, so memory
+        does not grow with the archive and no cursor stays open between
+        batches.
+
+        Yields:
+            Tuple[int, datetime.datetime, ArchivedPath]: The execution id,
+            its timestamp and its path.
+        """
+        last_id = 0
+        while True:
+            query = self.db.session.query(
+                Execution.id, Execution.timestamp, Execution.path
+            ).filter(Execution.path.isnot(None), Execution.id > last_id)
+            if bounding_box is not None:
+                min_x, min_y, max_x, max_y = bounding_box
+                query = query.filter(
+                    Execution.max_x >= min_x,
+                    Execution.min_x <= max_x,
+                    Execution.max_y >= min_y,
+                    Execution.min_y <= max_y,
+                )
+            try:
+                batch = query.order_by(Execution.id).limit(batch_size).all()
+            except SQLAlchemyError as e:
+                raise Exception(f"Database error: {str(e)}")
+
+            for execution_id, timestamp, blob in batch:
+                yield execution_id, timestamp, decode_path_archive(blob)
+            if len(batch) < batch_size:
+                return
+            last_id = batch[-1][0]
+
     def delete_execution(self, execution):
         try:
             self.db.session.delete(execution)
@@ -31,3 +361,195 @@ class ExecutionQueryService:
         except SQLAlchemyError as e:
             self.db.session.rollback()
             raise Exception(f"Database error: {str(e)}")
+
+
+class AsyncExecutionQueryService:
+    """
+    Asyncio front of `ExecutionQueryService`: the same queries, run on a pool
+    of `max_workers` threads, so that an event loop serves any number of
+    connections while at most `max_workers` requests use the database at a
+    time (the connection pool size plus its overflow). Every call removes
+    the session of its thread when done, returning the connection to the
+    pool; the session must not expire its objects on commit.
+    """
+
+    def __init__(self, service: ExecutionQueryService, max_workers: int):
+        self.service = service
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="execution-queries"
+        )
+
+    async def add_execution(self, commands_count, result, duration, archive=None):
+        return await self._run(
+            self.service.add_execution, commands_count, result, duration, archive
+        )
+
+    async def get_last_executions(
+        self,
+        before: Optional[Tuple[datetime.datetime, int]] = None,
+        limit: int = 100,
+    ):
+        return await self._run(self.service.get_last_executions, before, limit)
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+
+    async def _run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        return await asyncio.get_running_loop().run_in_executor(
+            self.executor, partial(self._call, fn, *args)
+        )
+
+    def _call(self, fn: Callable[..., Any], *args: Any) -> Any:
+        try:
+            return fn(*args)
+        finally:
+            self.service.db.session.remove()
+
+
+class ExecutionWriteBuffer:
+    """
+    Write-behind buffer for executions. Rows are collected in memory and
+    inserted in bulk by a background thread when `max_size` rows are waiting
+    or `max_interval` seconds passed since the last flush. `close` stops the
+    thread and writes whatever is left.
+
+    A failed flush is logged and its rows are dropped, so a database outage
+    does not make the buffer grow without bounds.
+    """
+
+    rows_name = "executions"
+
+    def __init__(self, app, db, max_size: int = 500, max_interval: float = 0.5):
+        self.app = app
+        self.service = ExecutionQueryService(db)
+        self.max_size = max_size
+        self.max_interval = max_interval
+        self.rows: List[Tuple[Dict[str, Any], Optional[Archive]]] = []
+        self.lock = threading.Lock()
+        self.wake_up = threading.Event()
+        self.closed = False
+        self.thread = threading.Thread(
+            target=self._run, name="execution-write-buffer", daemon=True
+        )
+        self.thread.start()
+
+    def add(self, row: Dict[str, Any], archive: Optional[Archive] = None):
+        with self.lock:
+            self.rows.append((row, archive))
+            full = len(self.rows) >= self.max_size
+        if full:
+            self.wake_up.set()
+
+    def flush(self) -> int:
+        """
+        Writes the waiting rows.
+
+        Returns:
+            int: The number of rows written.
+        """
+        with self.lock:
+            pending, self.rows = self.rows, []
+        if not pending:
+            return 0
+        rows = [row for row, _ in pending]
+        if any(archive is not None for _, archive in pending):
+            # executemany needs the same columns in every row
+            rows = [dict(row, **resolve_archive(archive)) for row, archive in pending]
+        try:
+            with self.app.app_context():
+                self.write(rows)
+        except Exception as e:
+            logger.error(
+                f"Dropped {len(rows)} {self.rows_name} after a failed flush: {e}"
+            )
+            return 0
+        return len(rows)
+
+    def write(self, rows: List[Dict[str, Any]]):
+        self.service.insert_executions(rows)
+
+    def close(self):
+        self.closed = True
+        self.wake_up.set()
+        self.thread.join()
+        self.flush()
+
+    def _run(self):
+        while not self.closed:
+            self.wake_up.wait(self.max_interval)
+            self.wake_up.clear()
+            self.flush()
+
+
+class RollupBuffer(ExecutionWriteBuffer):
+    """
+    Rollups of the executions committed by the requests, applied in bulk by
+    a background thread. Every execution of a minute upserts the same rollup
+    and histogram rows: updated in each request transaction, their row locks
+    would serialize the commits of concurrent requests.
+
+    The rollups lag the execution table by up to `max_interval` seconds, and
+    the rows of a failed flush are dropped like those of the write buffer;
+    `flask rebuild-rollups` recomputes them from the execution table.
+    """
+
+    rows_name = "executions from the rollups"
+
+    def write(self, rows: List[Dict[str, Any]]):
+        self.service.add_rollups(rows)
+
+
+def resolve_archive(archive: Optional[Archive]) -> Dict[str, Any]:
+    """
+    Returns:
+        Dict[str, Any]: The path archive columns of an execution, all None
+        when it has no archive or the archive could not be encoded.
+    """
+    if archive is not None:
+        try:
+            return archive()
+        except Exception as e:
+            logger.error(f"Could not archive the path of an execution: {e}")
+    return dict.fromkeys(ARCHIVE_COLUMNS)
+
+
+def create_write_buffer(app, db):
+    """
+    Builds the execution write buffer from the environment:
+        EXECUTION_WRITE_MODE: "sync" (default) commits every execution in the
+            request, "buffered" writes them in bulk from a background thread
+        EXECUTION_WRITE_BATCH_SIZE: rows that trigger a flush (default: 500)
+        EXECUTION_WRITE_INTERVAL: seconds between flushes (default: 0.5)
+    """
+    mode = os.getenv("EXECUTION_WRITE_MODE", "sync")
+    if mode == "sync":
+        return None
+    if mode != "buffered":
+        raise ValueError(f"Unknown execution write mode '{mode}'")
+
+    write_buffer = ExecutionWriteBuffer(
+        app,
+        db,
+        max_size=int(os.getenv("EXECUTION_WRITE_BATCH_SIZE", 500)),
+        max_interval=float(os.getenv("EXECUTION_WRITE_INTERVAL", 0.5)),
+    )
+    atexit.register(write_buffer.close)
+    return write_buffer
+
+
+def create_rollup_buffer(app, db, write_buffer=None):
+    """
+    Builds the rollup buffer of the synchronous write mode from the
+    environment:
+        EXECUTION_ROLLUP_INTERVAL: seconds between the updates of the rollups
+            (default: 1), 0 updates them in the transaction of each request
+    The write buffer already updates the rollups once per flush: with one,
+    there is no rollup buffer.
+    """
+    interval = float(os.getenv("EXECUTION_ROLLUP_INTERVAL", 1))
+    if write_buffer is not None or interval <= 0:
+        return None
+
+    rollup_buffer = RollupBuffer(app, db, max_size=10000, max_interval=interval)
+    atexit.register(rollup_buffer.close)
+    return rollup_buffer
@@ -0,0 +1,127 @@
+import json
+import logging
+import math
+import os
+from typing import List, Dict, NamedTuple, Optional
+
+from app.engines import ENGINES
+from app.execute_commands_numpy import MAX_ARRAY_STEPS
+
+logger = logging.getLogger("RobotCleaningService")
+
+DEFAULT_CONFIG_PATH = os.path.join(os.path.dirname(__file__), "engine_selector.json")
+COST_FEATURES = ("fixed", "per_command", "per_command_log", "per_step")
+# engines computing the positions in int64 arrays
+ARRAY_ENGINES = ("numpy",)
+
+
+class PathFeatures(NamedTuple):
+    commands: int
+    total_steps: int
+    average_steps: float
+
+    @classmethod
+    def from_commands(cls, commands: List[Dict[str, int]]) -> "PathFeatures":
+        total_steps = sum(command["steps"] for command in commands)  # O(n)
+        average_steps = total_steps / len(commands) if commands else 0.0
+        return cls(len(commands), total_steps, average_steps)
+
+    def cost_terms(self) -> Dict[str, float]:
+        """Values multiplied by the coefficients of each engine's cost model."""
+        return {
+            "fixed": 1.0,
+            "per_command": float(self.commands),
+            "per_command_log": self.commands * math.log2(self.commands + 1),
+            "per_step": float(self.total_steps),
+        }
+
+
+class EngineSelector:
+    """
+    Picks the engine with the lowest predicted cost for a path. The cost of an
+    engine is a linear model over `PathFeatures.cost_terms`, with coefficients
+    (in seconds) calibrated by
+    `app/tests/performance_tests/calibrate_engine_selector.py`.
+
+    V1 keeps every visited cell in memory, so it is never picked for paths
+    with more than `v1_max_steps` steps. The array engines are never picked
+    for paths with more than `MAX_ARRAY_STEPS` steps, whose positions could
+    overflow int64. Only the engines of the config are candidates: the
+    bitmap, whose memory grows with the steps, is left out of it.
+    """
+
+    def __init__(
+        self,
+        costs: Dict[str, Dict[str, float]],
+        v1_max_steps: int,
+        engine: str = "adaptive",
+    ):
+        unknown = [name for name in costs if name not in ENGINES]
+        if engine != "adaptive" and engine not in ENGINES:
+            unknown.append(engine)
+        if unknown:
+            raise ValueError(f"Unknown engines: {', '.join(unknown)}")
+
+        self.costs = costs
+        self.v1_max_steps = v1_max_steps
+        self.engine = engine
+
+    @classmethod
+    def from_config(
+        cls, path: str = DEFAULT_CONFIG_PATH, engine: str = "adaptive"
+    ) -> "EngineSelector":
+        with open(path) as config_file:
+            config = json.load(config_file)
+        return cls(config["costs"], config["v1_max_steps"], engine)
+
+    def predict(self, features: PathFeatures) -> Dict[str, float]:
+        terms = features.cost_terms()
+        return {
+            name: sum(
+                coefficients.get(term, 0.0) * terms[term] for term in COST_FEATURES
+            )
+            for name, coefficients in self.costs.items()
+        }
+
+    def select(self, commands: List[Dict[str, int]]) -> str:
+        """
+        Returns:
+            str: The name of the engine to run the commands with.
+        """
+        features = PathFeatures.from_commands(commands)
+        candidates = list(self.costs) if self.engine == "adaptive" else [self.engine]
+        refused = []
+        if features.total_steps > self.v1_max_steps:
+            refused.append("v1")
+        if features.total_steps > MAX_ARRAY_STEPS:
+            refused.extend(ARRAY_ENGINES)
+        candidates = [name for name in candidates if name not in refused]
+        if not candidates:
+            logger.warning(
+                f"{', '.join(refused)} refused for {features.total_steps} steps, "
+                "falling back to V2"
+            )
+            return "v2"
+        if len(candidates) == 1:
+            return candidates[0]
+
+        predictions = self.predict(features)
+        return min(candidates, key=predictions.__getitem__)
+
+
+def create_engine_selector(
+    config_path: Optional[str] = None,
+) -> EngineSelector:
+    """
+    Builds the engine selector from the environment:
+        EXECUTION_ENGINE: "adaptive" (default) or the name of an engine to always use
+        ENGINE_SELECTOR_CONFIG: calibrated cost models (default: app/engine_selector.json)
+        V1_MAX_STEPS: overrides the V1 memory budget of the config, in steps
+    """
+    selector = EngineSelector.from_config(
+        config_path or os.getenv("ENGINE_SELECTOR_CONFIG", DEFAULT_CONFIG_PATH),
+        engine=os.getenv("EXECUTION_ENGINE", "adaptive"),
+    )
+    if os.getenv("V1_MAX_STEPS"):
+        selector.v1_max_steps = int(os.getenv("V1_MAX_STEPS"))
+    return selector
@@ -0,0 +1,46 @@
+from functools import partial
+from typing import Callable, List, Tuple, Dict
+
+from app.execute_commands_v1 import execute_commands_v1
+from app.execute_commands_v2 import execute_commands_v2
+from app.execute_commands_numpy import execute_commands_numpy
+from app.execute_commands_bitmap import execute_commands_bitmap
+from app.execute_commands_footprint import execute_commands_footprint
+
+Engine = Callable[[List[Dict[str, int]], int, int], Tuple[int, float]]
+
+ENGINES: Dict[str, Engine] = {
+    "v1": execute_commands_v1,
+    "v2": execute_commands_v2,
+    "numpy": execute_commands_numpy,
+    "bitmap": execute_commands_bitmap,
+}
+
+
+def get_engine(name: str) -> Engine:
+    """
+    Returns the algorithm registered under `name`. Every engine takes
+    `(commands, x, y)` and returns `(result, duration)`.
+    """
+    try:
+        return ENGINES[name]
+    except KeyError:
+        raise ValueError(
+            f"Unknown engine '{name}', expected one of: {', '.join(ENGINES)}"
+        )
+
+
+def select_engine(
+    engine_selector, commands: List[Dict[str, int]], width: int = 1
+) -> Tuple[str, Engine]:
+    """
+    The engine of a path: the one `engine_selector` picks for a robot
+    cleaning one cell at a time, the footprint engine for a wider brush.
+
+    Returns:
+        Tuple[str, Engine]: The name of the engine and the engine.
+    """
+    if width > 1:
+        return "footprint", partial(execute_commands_footprint, width=width)
+    name = engine_selector.select(commands)
+    return name, ENGINES[name]
@@ -0,0 +1,217 @@
+import time
+import logging
+from typing import Any, List, Tuple, Dict
+
+import numpy as np
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger("RobotCleaningService")
+
+# bytes of bitmap a path may use, one byte per cell
+MEMORY_BUDGET = 256 * 1024 * 1024
+TILE_SIZE = 256
+# approximate bytes of a line kept in a sparse tile
+SPAN_BYTES = 64
+
+
+class DenseBitmap:
+    """Bitmap covering the whole bounding box of the path."""
+
+    def __init__(self, min_x: int, min_y: int, max_x: int, max_y: int):
+        self.min_x = min_x
+        self.min_y = min_y
+        self.cells = np.zeros((max_y - min_y + 1, max_x - min_x + 1), dtype=bool)
+
+    def mark_horizontal(self, y: int, start: int, end: int):
+        self.cells[y - self.min_y, start - self.min_x : end - self.min_x + 1] = True
+
+    def mark_vertical(self, x: int, start: int, end: int):
+        self.cells[start - self.min_y : end - self.min_y + 1, x - self.min_x] = True
+
+    def count(self) -> int:
+        return int(np.count_nonzero(self.cells))
+
+
+class TiledBitmap:
+    """
+    Sparse bitmap made of square tiles, allocated only where the path goes.
+    A tile first keeps the lines crossing it, and becomes a bitmap once more
+    lines than its side cross it: a path that only passes by costs a few
+    bytes per tile instead of a tile of cells. Raises MemoryError once the
+    tiles would exceed `memory_budget` bytes.
+    """
+
+    def __init__(self, memory_budget: int, tile_size: int = TILE_SIZE):
+        self.tile_size = tile_size
+        self.memory_budget = memory_budget
+        self.memory = 0
+        # (tile_x, tile_y): a bitmap, or the (row, start, end) lines and the
+        # (column, start, end) lines crossing the tile
+        self.tiles: Dict[Tuple[int, int], Any] = {}
+
+    def mark_horizontal(self, y: int, start: int, end: int):
+        size = self.tile_size
+        tile_y, row = divmod(y, size)
+        for tile_x in range(start // size, end // size + 1):
+            offset = tile_x * size
+            self._mark(
+                tile_x,
+                tile_y,
+                0,
+                row,
+                max(start, offset) - offset,
+                min(end, offset + size - 1) - offset,
+            )
+
+    def mark_vertical(self, x: int, start: int, end: int):
+        size = self.tile_size
+        tile_x, column = divmod(x, size)
+        for tile_y in range(start // size, end // size + 1):
+            offset = tile_y * size
+            self._mark(
+                tile_x,
+                tile_y,
+                1,
+                column,
+                max(start, offset) - offset,
+                min(end, offset + size - 1) - offset,
+            )
+
+    def count(self) -> int:
+        scratch = np.zeros((self.tile_size, self.tile_size), dtype=bool)
+        visited = 0
+        for tile in self.tiles.values():  # O(tiles)
+            if isinstance(tile, np.ndarray):
+                visited += int(np.count_nonzero(tile))
+            else:
+                self._paint(scratch, tile, True)
+                visited += int(np.count_nonzero(scratch))
+                self._paint(scratch, tile, False)
+        return visited
+
+    def _mark(
+        self, tile_x: int, tile_y: int, axis: int, line: int, first: int, last: int
+    ):
+        tile = self.tiles.get((tile_x, tile_y))
+        if isinstance(tile, np.ndarray):
+            if axis == 0:
+                tile[line, first : last + 1] = True
+            else:
+                tile[first : last + 1, line] = True
+            return
+
+        self._reserve(SPAN_BYTES)
+        if tile is None:
+            tile = self.tiles[(tile_x, tile_y)] = ([], [])
+        tile[axis].append((line, first, last))
+        if len(tile[0]) + len(tile[1]) > self.tile_size:
+            # crossed by many lines: cheaper as cells
+            self._reserve(self.tile_size * self.tile_size)
+            self.memory -= SPAN_BYTES * (len(tile[0]) + len(tile[1]))
+            cells = np.zeros((self.tile_size, self.tile_size), dtype=bool)
+            self._paint(cells, tile, True)
+            self.tiles[(tile_x, tile_y)] = cells
+
+    def _reserve(self, size: int):
+        if self.memory + size > self.memory_budget:
+            raise MemoryError("Path does not fit in the bitmap memory budget")
+        self.memory += size
+
+    @staticmethod
+    def _paint(cells: np.ndarray, tile: Any, value: bool):
+        rows, columns = tile
+        for row, first, last in rows:
+            cells[row, first : last + 1] = value
+        for column, first, last in columns:
+            cells[first : last + 1, column] = value
+
+
+def bounding_box(
+    commands: List[Dict[str, int]], x: int, y: int
+) -> Tuple[int, int, int, int]:
+    """
+    Returns:
+        Tuple[int, int, int, int]: The (min_x, min_y, max_x, max_y) positions
+                                   reached by the path.
+    """
+    min_x = max_x = x
+    min_y = max_y = y
+    for command in commands:  # O(n)
+        direction = command["direction"]
+        steps = command["steps"]
+        if direction == "north":
+            y += steps
+            max_y = max(max_y, y)
+        elif direction == "south":
+            y -= steps
+            min_y = min(min_y, y)
+        elif direction == "east":
+            x += steps
+            max_x = max(max_x, x)
+        elif direction == "west":
+            x -= steps
+            min_x = min(min_x, x)
+    return min_x, min_y, max_x, max_y
+
+
+def execute_commands_bitmap(
+    commands: List[Dict[str, int]],
+    x: int,
+    y: int,
+    memory_budget: int = MEMORY_BUDGET,
+    tile_size: int = TILE_SIZE,
+) -> Tuple[int, float]:
+    """
+    Algorithm V1 on a bitmap:
+    Marks the visited cells like V1, but in a bitmap instead of a set of
+    tuples, filling the cells of each command with one slice assignment.
+    The bitmap covers the bounding box of the path when it fits in
+    `memory_budget` bytes, and is split in tiles allocated on demand
+    otherwise, which keep the lines crossing them until they are dense.
+    Time Complexity: O(commands + steps), with the steps filled in C
+    Space Complexity: O(bounding box), or O(commands + steps / tile size) for
+    the tiled bitmap of a sparse path
+
+    Args:
+        commands (List[Dict[str, int]]): A list of movement commands where each
+            command is a dictionary with 'direction' (str) and 'steps' (int).
+        x (int): The starting x-coordinate.
+        y (int): The starting y-coordinate.
+        memory_budget (int): The maximum bitmap size in bytes.
+        tile_size (int): The side of the tiles of the tiled bitmap.
+
+    Returns:
+        Tuple[int, float]: A tuple containing the number of unique cells visited
+        and the duration of execution in seconds.
+    """
+
+    start_time = time.perf_counter()
+
+    min_x, min_y, max_x, max_y = bounding_box(commands, x, y)
+    if (max_x - min_x + 1) * (max_y - min_y + 1) <= memory_budget:
+        bitmap = DenseBitmap(min_x, min_y, max_x, max_y)
+    else:
+        logger.debug("Bounding box exceeds the memory budget, using a tiled bitmap")
+        bitmap = TiledBitmap(memory_budget, tile_size)
+
+    bitmap.mark_horizontal(y, x, x)
+    for command in commands:  # O(commands)
+        direction = command["direction"]
+        steps = command["steps"]
+        if direction == "north":
+            bitmap.mark_vertical(x, y, y + steps)
+            y += steps
+        elif direction == "south":
+            bitmap.mark_vertical(x, y - steps, y)
+            y -= steps
+        elif direction == "east":
+            bitmap.mark_horizontal(y, x, x + steps)
+            x += steps
+        elif direction == "west":
+            bitmap.mark_horizontal(y, x - steps, x)
+            x -= steps
+
+    visited = bitmap.count()
+    duration = time.perf_counter() - start_time
+    logger.debug(f"Visited {visited} unique cells in {duration} seconds")
+    return visited, duration
@@ -0,0 +1,178 @@
+import time
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from app.execute_commands_numpy import (
+    commands_to_arrays,
+    create_segments,
+    merge_segment_arrays,
+)
+
+# the (x1, x2, y1, y2) arrays of half-open rectangles [x1, x2) x [y1, y2)
+Rectangles = Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]
+
+
+def footprint_offsets(width: int) -> Tuple[int, int]:
+    """
+    The cells covered by a `width` x `width` brush around the cell of the
+    robot, on each axis: from `position - before` to `position + after`. An
+    even width leans towards the positive side.
+
+    Returns:
+        Tuple[int, int]: The `before` and `after` offsets.
+    """
+    before = (width - 1) // 2
+    return before, width - 1 - before
+
+
+def footprint_rectangles(
+    x: int, y: int, directions: np.ndarray, steps: np.ndarray, width: int
+) -> Rectangles:
+    """
+    Turns every line of the path into the rectangle its brush sweeps. The
+    lines of a row (column) are widened along their own axis before being
+    merged, so lines closer than the brush become one rectangle.
+    time complexity: O(nlogn)
+
+    Returns:
+        Rectangles: The half-open rectangles swept by the horizontal lines,
+                    then by the vertical lines.
+    """
+    before, after = footprint_offsets(width)
+    horizontal, vertical = create_segments(x, y, directions, steps)
+    h_constants, h_starts, h_ends = merge_segment_arrays(
+        horizontal[0], horizontal[1] - before, horizontal[2] + after
+    )
+    v_constants, v_starts, v_ends = merge_segment_arrays(
+        vertical[0], vertical[1] - before, vertical[2] + after
+    )
+    return (
+        np.concatenate((h_starts, v_constants - before)),
+        np.concatenate((h_ends, v_constants + after)) + 1,
+        np.concatenate((h_constants - before, v_starts)),
+        np.concatenate((h_constants + after, v_ends)) + 1,
+    )
+
+
+def union_area(rectangles: Rectangles) -> int:
+    """
+    Area of the union of half-open rectangles (Klee's measure problem in 2D).
+    time complexity: O(nlogn)
+    space complexity: O(n)
+
+    A line sweeps the rectangles along the x axis: each rectangle enters the
+    sweep at `x1` and leaves it at `x2`. A segment tree over the compressed y
+    coordinates keeps, for every node, how many active rectangles cover its
+    whole range and the length of its range covered by any of them, so the
+    length covered at the sweep position is read at the root. The tree is
+    updated bottom-up, without recursion.
+
+    Returns:
+        int: The number of cells covered by at least one rectangle.
+    """
+    x1, x2, y1, y2 = rectangles
+    if len(x1) == 0:
+        return 0
+
+    ys, compressed = np.unique(np.concatenate((y1, y2)), return_inverse=True)
+    count = len(x1)
+    event_x = np.concatenate((x1, x2))
+    order = np.argsort(event_x, kind="stable")
+    event_x = event_x[order].tolist()
+    lows = np.concatenate((compressed[:count], compressed[:count]))[order].tolist()
+    highs = np.concatenate((compressed[count:], compressed[count:]))[order].tolist()
+    deltas = np.where(order < count, 1, -1).tolist()
+
+    # leaf i covers [ys[i], ys[i + 1]); the padding leaves have no length
+    size = 1 << max(0, (len(ys) - 2).bit_length())
+    total = [0] * (2 * size)
+    total[size : size + len(ys) - 1] = np.diff(ys).tolist()
+    for node in range(size - 1, 0, -1):
+        total[node] = total[2 * node] + total[2 * node + 1]
+    covers = [0] * (2 * size)
+    covered = [0] * (2 * size)
+
+    area = 0
+    previous_x = event_x[0]
+    for event in range(2 * count):  # O(n) events of O(logn)
+        position = event_x[event]
+        area += covered[1] * (position - previous_x)
+        previous_x = position
+
+        delta = deltas[event]
+        low, high = lows[event] + size, highs[event] + size
+        left, right = low, high
+        while left < right:
+            if left & 1:
+                covers[left] += delta
+                if covers[left]:
+                    covered[left] = total[left]
+                elif left < size:
+                    covered[left] = covered[2 * left] + covered[2 * left + 1]
+                else:
+                    covered[left] = 0
+                left += 1
+            if right & 1:
+                right -= 1
+                covers[right] += delta
+                if covers[right]:
+                    covered[right] = total[right]
+                elif right < size:
+                    covered[right] = covered[2 * right] + covered[2 * right + 1]
+                else:
+                    covered[right] = 0
+            left >>= 1
+            right >>= 1
+
+        # the ancestors of the updated nodes are computed again
+        for node in (low >> 1, (high - 1) >> 1):
+            while node:
+                if not covers[node]:
+                    covered[node] = covered[2 * node] + covered[2 * node + 1]
+                node >>= 1
+
+    return area
+
+
+def count_footprint_arrays(
+    directions: np.ndarray, steps: np.ndarray, x: int, y: int, width: int
+) -> int:
+    """
+    Counts the cells cleaned by a `width` x `width` brush following the
+    commands given as direction code and steps arrays. With a width of 1 it
+    is the number of unique points visited.
+
+    Returns:
+        int: The number of cells covered by the brush.
+    """
+    if len(directions) == 0:
+        return width * width
+    return union_area(footprint_rectangles(x, y, directions, steps, width))
+
+
+def execute_commands_footprint(
+    commands: List[Dict[str, int]], x: int, y: int, width: int = 1
+) -> Tuple[int, float]:
+    """
+    Coverage of a robot cleaning a `width` x `width` band around its path:
+    every line becomes the rectangle swept by the brush, and the result is
+    the area of the union of these rectangles.
+    time complexity: O(nlogn)
+    space complexity: O(n)
+
+    Args:
+        commands (List[Dict[str, int]]): A list of commands where each command is a dictionary
+                                         with direction and distance.
+        x (int): The starting x-coordinate of the robot.
+        y (int): The starting y-coordinate of the robot.
+        width (int): The side of the square brush, in cells.
+
+    Returns:
+        Tuple[int, float]: A tuple containing the number of cells cleaned and the
+                           duration of the execution in seconds.
+    """
+    start_time = time.perf_counter()
+    directions, steps = commands_to_arrays(commands)
+    result = count_footprint_arrays(directions, steps, x, y, width)
+    return result, time.perf_counter() - start_time
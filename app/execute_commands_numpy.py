@@ -0,0 +1,288 @@
+import time
+import logging
+from typing import List, Tuple, Dict
+
+import numpy as np
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger("RobotCleaningService")
+
+NORTH, EAST, SOUTH, WEST = 0, 1, 2, 3
+DIRECTION_CODES = {"north": NORTH, "east": EAST, "south": SOUTH, "west": WEST}
+
+Segments = Tuple[np.ndarray, np.ndarray, np.ndarray]
+
+# the steps of a path beyond which its positions, shifted and doubled by the
+# merge and the crossing count, could overflow int64
+MAX_ARRAY_STEPS = 1 << 60
+
+
+def commands_to_arrays(commands: List[Dict[str, int]]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Converts the list of command dictionaries into two int64 arrays holding the
+    direction codes and the number of steps of each command.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: The direction codes and the steps.
+    """
+    count = len(commands)
+    directions = np.fromiter(
+        (DIRECTION_CODES[command["direction"]] for command in commands),
+        dtype=np.int64,
+        count=count,
+    )
+    steps = np.fromiter(
+        (command["steps"] for command in commands), dtype=np.int64, count=count
+    )
+    return directions, steps
+
+
+def create_segments(
+    x: int, y: int, directions: np.ndarray, steps: np.ndarray
+) -> Tuple[Segments, Segments]:
+    """
+    Array version of `create_lines`: computes every position with `np.cumsum`
+    and splits the moves into horizontal and vertical segments.
+
+    Returns:
+        Tuple[Segments, Segments]: The (constant, start, end) arrays of the
+                                   horizontal and the vertical segments.
+    """
+    dx = np.where(directions == EAST, steps, 0) - np.where(directions == WEST, steps, 0)
+    dy = np.where(directions == NORTH, steps, 0) - np.where(
+        directions == SOUTH, steps, 0
+    )
+    xs = np.concatenate(([x], x + np.cumsum(dx)))
+    ys = np.concatenate(([y], y + np.cumsum(dy)))
+
+    horizontal = (directions == EAST) | (directions == WEST)
+    vertical = ~horizontal
+
+    horizontal_segments = (
+        ys[:-1][horizontal],
+        np.minimum(xs[:-1], xs[1:])[horizontal],
+        np.maximum(xs[:-1], xs[1:])[horizontal],
+    )
+    vertical_segments = (
+        xs[:-1][vertical],
+        np.minimum(ys[:-1], ys[1:])[vertical],
+        np.maximum(ys[:-1], ys[1:])[vertical],
+    )
+    return horizontal_segments, vertical_segments
+
+
+def segment_order(constants: np.ndarray, starts: np.ndarray) -> np.ndarray:
+    """
+    Returns:
+        np.ndarray: The indexes of the segments ordered by (constant, start).
+    """
+    if len(constants) == 0:
+        return np.empty(0, dtype=np.intp)
+    # one argsort of a combined key is about twice as fast as np.lexsort
+    constant_min, start_min = constants.min(), starts.min()
+    span = int(starts.max() - start_min) + 1
+    if (int(constants.max() - constant_min) + 1) * span < 1 << 62:
+        return np.argsort((constants - constant_min) * span + (starts - start_min))
+    return np.lexsort((starts, constants))
+
+
+def merge_segment_arrays(
+    constants: np.ndarray, starts: np.ndarray, ends: np.ndarray
+) -> Segments:
+    """
+    Array version of `merge_segments`: sorts the segments by constant and start
+    and merges the overlapping ones using a running maximum of the end
+    positions.
+
+    Returns:
+        Segments: The (constant, start, end) arrays of the merged segments.
+    """
+    if len(constants) == 0:
+        return constants, starts, ends
+
+    # the order of the ends does not matter to the running maximum
+    order = segment_order(constants, starts)
+    constants, starts, ends = constants[order], starts[order], ends[order]
+
+    # running max of the ends per constant: shifting every constant group above
+    # the previous one lets a single np.maximum.accumulate do the reduction
+    new_constant = np.empty(len(constants), dtype=bool)
+    new_constant[0] = True
+    new_constant[1:] = constants[1:] != constants[:-1]
+    group = np.cumsum(new_constant)
+    offset = ends.min()
+    span = int(ends.max() - offset) + 1
+    if (int(group[-1]) + 1) * span < 1 << 62:
+        running_end = np.maximum.accumulate(group * span + (ends - offset))
+        running_end = running_end - group * span + offset
+    else:
+        # the shifted ends would overflow: one accumulate per constant group
+        running_end = np.empty_like(ends)
+        bounds = np.append(np.flatnonzero(new_constant), len(ends))
+        for first, last in zip(bounds[:-1], bounds[1:]):  # O(groups)
+            running_end[first:last] = np.maximum.accumulate(ends[first:last])
+
+    new_segment = new_constant.copy()
+    new_segment[1:] |= starts[1:] > running_end[:-1]
+    first = np.flatnonzero(new_segment)
+    last = np.append(first[1:] - 1, len(constants) - 1)
+    return constants[first], starts[first], running_end[last]
+
+
+def count_segment_points(starts: np.ndarray, ends: np.ndarray) -> int:
+    return int(np.sum(ends - starts + 1))
+
+
+def count_crossings_arrays(vertical: Segments, horizontal: Segments) -> int:
+    """
+    Vectorized counterpart of `calculate_crossings_sweep`.
+    time complexity: O(nlogn)
+
+    Every horizontal segment becomes two weighted points, (start, y, +1) and
+    (end + 1, y, -1), and every vertical segment becomes two signed queries,
+    (x, end, +1) and (x, start - 1, -1). The crossings are then the signed
+    number of (point, query) pairs where the point is not greater than the
+    query on both axes. These pairs are counted level by level on the binary
+    representation of the x order, keeping the events sorted by y inside every
+    block through a stable partition so each level is a few array passes.
+
+    Returns:
+        int: The number of (vertical, horizontal) pairs that share a point.
+    """
+    v_constants, v_starts, v_ends = vertical
+    h_constants, h_starts, h_ends = horizontal
+    if len(v_constants) == 0 or len(h_constants) == 0:
+        return 0
+
+    # points get even keys and queries odd keys, so comparisons are strict
+    x_keys = np.concatenate(
+        (2 * h_starts, 2 * (h_ends + 1), 2 * v_constants + 1, 2 * v_constants + 1)
+    )
+    y_keys = np.concatenate(
+        (2 * h_constants, 2 * h_constants, 2 * v_ends + 1, 2 * (v_starts - 1) + 1)
+    )
+    h_count, v_count = len(h_constants), len(v_constants)
+    weights = np.concatenate(
+        (
+            np.ones(h_count, dtype=np.int64),
+            -np.ones(h_count, dtype=np.int64),
+            np.zeros(2 * v_count, dtype=np.int64),
+        )
+    )
+    signs = np.concatenate(
+        (
+            np.zeros(2 * h_count, dtype=np.int64),
+            np.ones(v_count, dtype=np.int64),
+            -np.ones(v_count, dtype=np.int64),
+        )
+    )
+
+    x_order = np.argsort(x_keys, kind="stable")
+    y_keys, weights, signs = y_keys[x_order], weights[x_order], signs[x_order]
+
+    size = len(y_keys)
+    levels = max(1, (size - 1).bit_length())
+    indexes = np.arange(size)
+    # positions in x order, sorted by y: one block covering every event
+    order = np.argsort(y_keys, kind="stable")
+    crossings = 0
+
+    for level in range(levels - 1, -1, -1):  # O(logn) levels of O(n)
+        half = 1 << level
+        # blocks before the last one are full, so a block starts at its id * size
+        block_first = (order >> (level + 1)) << (level + 1)
+        right_half = (order & half) != 0
+        left = ~right_half
+
+        # points of the left half seen before each query of the right half
+        left_weights = weights[order] * left
+        seen = np.cumsum(left_weights) - left_weights
+        seen -= seen[block_first]
+        crossings += int(np.dot(signs[order] * right_half, seen))
+
+        # split every block into its halves, keeping the y order of each
+        left_before = np.cumsum(left) - left
+        left_before -= left_before[block_first]
+        left_total = np.minimum(half, size - block_first)
+        target = np.where(
+            right_half,
+            indexes + left_total - left_before,
+            block_first + left_before,
+        )
+        next_order = np.empty_like(order)
+        next_order[target] = order
+        order = next_order
+
+    return crossings
+
+
+def count_visited_arrays(
+    directions: np.ndarray, steps: np.ndarray, x: int, y: int
+) -> int:
+    """
+    Counts the unique points visited by the commands given as direction code
+    and steps arrays.
+
+    Returns:
+        int: The number of unique points visited.
+    """
+    if len(directions) == 0:
+        return 1
+
+    horizontal, vertical = create_segments(x, y, directions, steps)
+    horizontal = merge_segment_arrays(*horizontal)
+    vertical = merge_segment_arrays(*vertical)
+
+    horizontal_points = count_segment_points(horizontal[1], horizontal[2])
+    vertical_points = count_segment_points(vertical[1], vertical[2])
+    crossings = count_crossings_arrays(vertical, horizontal)
+    return horizontal_points + vertical_points - crossings
+
+
+def execute_commands_numpy(
+    commands: List[Dict[str, int]], x: int, y: int
+) -> Tuple[int, float]:
+    """
+    Algorithm V2 on NumPy arrays:
+    Same contract as `execute_commands_v2`, but every stage works on int64
+    arrays instead of building one `Line` object per command.
+    time complexity: O(nlogn)
+    space complexity: O(n)
+
+    Args:
+        commands (List[Dict[str, int]]): A list of commands where each command is a dictionary
+                                         with direction and distance.
+        x (int): The starting x-coordinate of the robot.
+        y (int): The starting y-coordinate of the robot.
+
+    Returns:
+        Tuple[int, float]: A tuple containing the number of unique points visited and the
+                           duration of the execution in seconds.
+    """
+
+    start_time = time.perf_counter()
+
+    if not commands:
+        return 1, time.perf_counter() - start_time
+
+    directions, steps = commands_to_arrays(commands)
+    result = count_visited_arrays(directions, steps, x, y)
+    return result, time.perf_counter() - start_time
+
+
+def execute_arrays_numpy(
+    directions: np.ndarray, steps: np.ndarray, x: int, y: int
+) -> Tuple[int, float]:
+    """
+    `execute_commands_numpy` for commands already decoded into direction code
+    and steps arrays, e.g. by `app.wire_format.decode_path`. The arrays can be
+    read-only views of any integer type: the steps are widened to int64 so
+    that the positions cannot overflow.
+
+    Returns:
+        Tuple[int, float]: A tuple containing the number of unique points visited and the
+                           duration of the execution in seconds.
+    """
+    start_time = time.perf_counter()
+    result = count_visited_arrays(directions, steps.astype(np.int64), x, y)
+    return result, time.perf_counter() - start_time
@@ -1,6 +1,6 @@
 import time
 import logging
-from typing import List, Tuple, Dict
+from typing import List, Set, Tuple, Dict
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("RobotCleaningService")
@@ -27,11 +27,24 @@ def execute_commands_v1(
         and the duration of execution in seconds.
     """
 
-    visited = set()
-    visited.add((x, y))
+    start_time = time.perf_counter()
+    visited = visited_cells(commands, x, y)
+    duration = time.perf_counter() - start_time
+    logger.debug(f"Visited {len(visited)} unique cells in {duration} seconds")
+    logger.debug(f"Visited cells: {visited}")
+    return len(visited), duration
 
-    start_time = time.time()
 
+def visited_cells(
+    commands: List[Dict[str, int]], x: int, y: int
+) -> Set[Tuple[int, int]]:
+    """
+    Walks the commands one step at a time, keeping every cell visited.
+
+    Returns:
+        Set[Tuple[int, int]]: Every (x, y) cell visited, the start included.
+    """
+    visited = {(x, y)}
     for command in commands:  # O(commands x steps)
         direction = command["direction"]
         steps = command["steps"]
@@ -46,8 +59,4 @@ def execute_commands_v1(
             elif direction == "west":
                 x -= 1
             visited.add((x, y))
-
-    duration = time.time() - start_time
-    logger.debug(f"Visited {len(visited)} unique cells in {duration} seconds")
-    logger.debug(f"Visited cells: {visited}")
-    return len(visited), duration
+    return visited
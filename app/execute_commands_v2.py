@@ -1,14 +1,22 @@
-from flask_inputs import Inputs
-from flask_inputs.validators import JsonSchema
+from array import array
+from bisect import bisect_left, bisect_right
 import time
 import logging
-from typing import List, Tuple, Dict
+from typing import List, Tuple, Dict, Iterator, Sequence
+
+import numpy as np
+
+from app import instrumentation
+from app.execute_commands_numpy import segment_order
+from app.instrumentation import CROSSINGS, SEGMENTS, Trace
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("RobotCleaningService")
 
 
 class Line:
+    __slots__ = ("constant", "start", "end")
+
     def __init__(self, constant: int, start: int, end: int):
         self.constant = constant
         self.start = start
@@ -34,6 +42,44 @@ class Line:
         return f"Line(constant={self.constant}, start={self.start}, end={self.end})"
 
 
+class SegmentStore:
+    """
+    Struct-of-arrays container for lines: the constants, starts and ends are
+    kept in three `array('q')` columns instead of one `Line` object per
+    segment. Indexing or iterating returns `Line` views, which is meant for
+    tests and debugging only.
+    """
+
+    def __init__(self):
+        self.constants = array("q")
+        self.starts = array("q")
+        self.ends = array("q")
+
+    def append(self, constant: int, start: int, end: int):
+        self.constants.append(constant)
+        self.starts.append(start)
+        self.ends.append(end)
+
+    def sorted_order(self) -> np.ndarray:
+        """
+        Returns the segment indexes ordered by (constant, start), sorted by
+        NumPy on views of the key columns, see `segment_order`.
+        """
+        return segment_order(
+            np.frombuffer(self.constants, dtype=np.int64),
+            np.frombuffer(self.starts, dtype=np.int64),
+        )
+
+    def __len__(self) -> int:
+        return len(self.constants)
+
+    def __getitem__(self, index: int) -> Line:
+        return Line(self.constants[index], self.starts[index], self.ends[index])
+
+    def __iter__(self) -> Iterator[Line]:
+        return map(Line, self.constants, self.starts, self.ends)
+
+
 def create_lines(
     x: int, y: int, commands: List[Dict[str, int]]
 ) -> Tuple[List[Line], List[Line]]:
@@ -114,6 +160,78 @@ def count_points(lines: List[Line]) -> int:
     return count
 
 
+def create_segment_stores(
+    x: int, y: int, commands: List[Dict[str, int]]
+) -> Tuple[SegmentStore, SegmentStore]:
+    """
+    Same as `create_lines`, but appends the segments to two `SegmentStore`
+    columns instead of creating a `Line` per command.
+
+    Returns:
+        Tuple[SegmentStore, SegmentStore]: The horizontal and the vertical segments.
+    """
+
+    horizontal_segments = SegmentStore()
+    vertical_segments = SegmentStore()
+    current_x, current_y = x, y
+
+    for command in commands:  # O(n)
+        direction = command["direction"]
+        distance = command["steps"]
+
+        if direction == "north":
+            new_y = current_y + distance
+            vertical_segments.append(current_x, current_y, new_y)
+            current_y = new_y
+        elif direction == "south":
+            new_y = current_y - distance
+            vertical_segments.append(current_x, new_y, current_y)
+            current_y = new_y
+        elif direction == "east":
+            new_x = current_x + distance
+            horizontal_segments.append(current_y, current_x, new_x)
+            current_x = new_x
+        elif direction == "west":
+            new_x = current_x - distance
+            horizontal_segments.append(current_y, new_x, current_x)
+            current_x = new_x
+
+    return horizontal_segments, vertical_segments
+
+
+def merge_segment_store(segments: SegmentStore) -> SegmentStore:
+    """
+    Same as `merge_segments`, working on the columns of a `SegmentStore`.
+
+    Returns:
+        SegmentStore: The merged segments, sorted by (constant, start).
+    """
+    constants, starts, ends = segments.constants, segments.starts, segments.ends
+    merged = SegmentStore()
+    if not constants:
+        return merged
+
+    order = segments.sorted_order().tolist()  # O(nlogn)
+    first = order[0]
+    last_constant, last_start, last_end = constants[first], starts[first], ends[first]
+
+    for index in order:  # O(n)
+        constant, start, end = constants[index], starts[index], ends[index]
+        if constant == last_constant and start <= last_end:
+            if end > last_end:
+                last_end = end
+        else:
+            merged.append(last_constant, last_start, last_end)
+            last_constant, last_start, last_end = constant, start, end
+    merged.append(last_constant, last_start, last_end)
+
+    return merged
+
+
+def count_store_points(segments: SegmentStore) -> int:
+    return sum(segments.ends) - sum(segments.starts) + len(segments)
+
+
 def calculate_crossings(
     vertical_lines: List[Line], horizontal_lines: List[Line]
 ) -> int:
@@ -127,6 +245,102 @@ def calculate_crossings(
     return count
 
 
+class FenwickTree:
+    """
+    Binary indexed tree storing how many horizontal lines are active at each
+    (compressed) y coordinate during the sweep in `calculate_crossings_sweep`.
+    """
+
+    def __init__(self, size: int):
+        self.tree = [0] * (size + 1)
+
+    def add(self, index: int, value: int):
+        tree = self.tree
+        while index < len(tree):
+            tree[index] += value
+            index += index & -index
+
+    def prefix_sum(self, index: int) -> int:
+        tree = self.tree
+        total = 0
+        while index > 0:
+            total += tree[index]
+            index -= index & -index
+        return total
+
+
+def calculate_crossings_sweep(
+    vertical_lines: List[Line], horizontal_lines: List[Line]
+) -> int:
+    """
+    Counts the crossings between vertical and horizontal lines with a sweep
+    along the x axis. Drop-in replacement for `calculate_crossings`.
+    time complexity: O(nlogn)
+    space complexity: O(n)
+
+    Returns:
+        int: The number of (vertical, horizontal) pairs that share a point.
+    """
+    return sweep_crossings(
+        [line.constant for line in vertical_lines],
+        [line.start for line in vertical_lines],
+        [line.end for line in vertical_lines],
+        [line.constant for line in horizontal_lines],
+        [line.start for line in horizontal_lines],
+        [line.end for line in horizontal_lines],
+    )
+
+
+def sweep_crossings(
+    v_constants: Sequence[int],
+    v_starts: Sequence[int],
+    v_ends: Sequence[int],
+    h_constants: Sequence[int],
+    h_starts: Sequence[int],
+    h_ends: Sequence[int],
+) -> int:
+    """
+    Sweep line behind `calculate_crossings_sweep`, on the columns of the lines.
+
+    Vertical lines are visited by increasing x. Before each one, the horizontal
+    lines starting at or before its x enter the sweep and the ones ending before
+    it leave; the vertical line then counts the active horizontal lines whose
+    constant lies between its start and end using a Fenwick tree over the
+    compressed y coordinates.
+
+    Returns:
+        int: The number of (vertical, horizontal) pairs that share a point.
+    """
+    if not v_constants or not h_constants:
+        return 0
+
+    y_values = sorted(set(h_constants))
+    y_rank = {y: rank for rank, y in enumerate(y_values, start=1)}
+
+    # O(nlogn)
+    opening = sorted(range(len(h_starts)), key=h_starts.__getitem__)
+    closing = sorted(range(len(h_ends)), key=h_ends.__getitem__)
+    queries = sorted(range(len(v_constants)), key=v_constants.__getitem__)
+
+    active = FenwickTree(len(y_values))
+    opened = closed = 0
+    count = 0
+    for index in queries:  # O(nlogn)
+        x = v_constants[index]
+        while opened < len(opening) and h_starts[opening[opened]] <= x:
+            active.add(y_rank[h_constants[opening[opened]]], 1)
+            opened += 1
+        while closed < len(closing) and h_ends[closing[closed]] < x:
+            active.add(y_rank[h_constants[closing[closed]]], -1)
+            closed += 1
+
+        first = bisect_left(y_values, v_starts[index])
+        last = bisect_right(y_values, v_ends[index])
+        if first < last:
+            count += active.prefix_sum(last) - active.prefix_sum(first)
+    return count
+
+
 def execute_commands_v2(
     commands: List[Dict[str, int]], x: int, y: int
 ) -> Tuple[int, float]:
@@ -147,25 +361,47 @@ def execute_commands_v2(
                            duration of the execution in seconds.
     """
 
-    start_time = time.time()
+    start_time = time.perf_counter()
+    trace = Trace("v2") if instrumentation.ENABLED else None
 
     if not commands:
-        return 1, time.time() - start_time
+        return 1, time.perf_counter() - start_time
 
     # computes the segments
-    horizontal_lines, vertical_lines = create_lines(x, y, commands)
+    horizontal_segments, vertical_segments = create_segment_stores(x, y, commands)
+    if trace is not None:
+        trace.stage("create_lines")
 
     # merge segments
-    normalized_horizontal_lines = merge_segments(horizontal_lines)
-    normalized_vertical_lines = merge_segments(vertical_lines)
+    horizontal = merge_segment_store(horizontal_segments)
+    vertical = merge_segment_store(vertical_segments)
+    if trace is not None:
+        trace.stage("merge_segments")
 
     # calculate number of points
-    horizontal_points = count_points(normalized_horizontal_lines)
-    vertical_points = count_points(normalized_vertical_lines)
+    horizontal_points = count_store_points(horizontal)
+    vertical_points = count_store_points(vertical)
+    if trace is not None:
+        trace.stage("count_points")
 
     # detect intersections
-    crossings = calculate_crossings(
-        normalized_vertical_lines, normalized_horizontal_lines
+    crossings = sweep_crossings(
+        vertical.constants,
+        vertical.starts,
+        vertical.ends,
+        horizontal.constants,
+        horizontal.starts,
+        horizontal.ends,
     )
+    if trace is not None:
+        trace.stage("calculate_crossings")
+        SEGMENTS.observe(
+            ("v2", "before_merge"), len(horizontal_segments) + len(vertical_segments)
+        )
+        SEGMENTS.observe(("v2", "after_merge"), len(horizontal) + len(vertical))
+        CROSSINGS.observe(("v2",), crossings)
+
     # return the number of points and duration
-    return (horizontal_points + vertical_points - crossings), time.time() - start_time
+    return (
+        horizontal_points + vertical_points - crossings
+    ), time.perf_counter() - start_time
@@ -0,0 +1,226 @@
+import atexit
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+from app import instrumentation
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger("RobotCleaningService")
+
+
+class BackendBusyError(Exception):
+    """Raised when the execution queue is full and the job was not accepted."""
+
+
+class ExecutionTimeoutError(Exception):
+    """Raised when a job did not finish within the backend timeout."""
+
+
+Job = Tuple[Callable[..., Any], Tuple[Any, ...]]
+
+
+def run_jobs(jobs: Sequence[Job]) -> List[Any]:
+    """
+    Runs the jobs one after the other.
+
+    Returns:
+        List[Any]: The result of every job, in order, or the exception it raised.
+    """
+    outcomes = []
+    for fn, args in jobs:
+        try:
+            outcomes.append(fn(*args))
+        except Exception as e:
+            outcomes.append(e)
+    return outcomes
+
+
+class InlineBackend:
+    """Runs the algorithm in the calling thread. Used by default and in tests."""
+
+    def run(self, fn: Callable[..., Any], *args: Any, size: int = 0) -> Any:
+        return fn(*args)
+
+    def run_many(
+        self, jobs: Sequence[Job], sizes: Optional[Sequence[int]] = None
+    ) -> List[Any]:
+        return run_jobs(jobs)
+
+    def shutdown(self):
+        pass
+
+
+class ProcessPoolBackend:
+    """
+    Runs the algorithm in a pool of warm worker processes, so CPU-bound paths
+    do not hold the GIL of the process serving the requests.
+
+    At most `workers + queue_size` jobs are accepted at a time; further jobs
+    are rejected with `BackendBusyError` instead of waiting. A job that takes
+    longer than `timeout` seconds raises `ExecutionTimeoutError` for the
+    caller, but keeps its slot until the worker is done with it. Jobs with a
+    `size` up to `inline_max_size` are cheaper than the round trip to a worker
+    and run in the calling thread, so they never queue behind large paths.
+    """
+
+    def __init__(
+        self, workers: int, queue_size: int, timeout: float, inline_max_size: int = 0
+    ):
+        self.workers = workers
+        self.timeout = timeout
+        self.inline_max_size = inline_max_size
+        self.executor = ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+        )
+        self.slots = threading.BoundedSemaphore(workers + queue_size)
+
+    def warm_up(self):
+        """Starts every worker and imports the algorithms before the first request."""
+        futures = [self.executor.submit(_import_engines) for _ in range(self.workers)]
+        for future in futures:
+            future.result()
+
+    def run(self, fn: Callable[..., Any], *args: Any, size: int = 0) -> Any:
+        if size <= self.inline_max_size:
+            return fn(*args)
+        if not self.slots.acquire(blocking=False):
+            raise BackendBusyError("Execution queue is full")
+        try:
+            future, drained = self._submit(fn, args)
+        except BaseException:
+            self.slots.release()
+            raise
+        future.add_done_callback(lambda _: self.slots.release())
+
+        try:
+            return self._result(future, drained, self.timeout)
+        except TimeoutError:
+            future.cancel()
+            raise ExecutionTimeoutError(
+                f"Execution did not finish within {self.timeout} seconds"
+            )
+
+    def run_many(
+        self, jobs: Sequence[Job], sizes: Optional[Sequence[int]] = None
+    ) -> List[Any]:
+        """
+        Runs a batch of jobs. The jobs up to `inline_max_size` run in the
+        calling thread; the others are spread over at most `workers` chunks
+        of similar total size, each taking one slot and one round trip to a
+        worker. The batch is rejected with `BackendBusyError` when not every
+        chunk gets a slot.
+
+        Returns:
+            List[Any]: The result of every job, in order, or the exception it
+            raised (`ExecutionTimeoutError` for the chunks that timed out).
+        """
+        sizes = sizes if sizes is not None else [0] * len(jobs)
+        outcomes: List[Any] = [None] * len(jobs)
+
+        remote = [
+            index for index in range(len(jobs)) if sizes[index] > self.inline_max_size
+        ]
+        chunks: List[List[int]] = [[] for _ in range(min(self.workers, len(remote)))]
+        loads = [0] * len(chunks)
+        for index in sorted(remote, key=lambda index: -sizes[index]):  # O(n log(n))
+            lightest = loads.index(min(loads))
+            chunks[lightest].append(index)
+            loads[lightest] += sizes[index]
+
+        acquired = 0
+        while acquired < len(chunks) and self.slots.acquire(blocking=False):
+            acquired += 1
+        if acquired < len(chunks):
+            for _ in range(acquired):
+                self.slots.release()
+            raise BackendBusyError("Execution queue is full")
+
+        futures = []
+        for chunk_number, chunk in enumerate(chunks):
+            try:
+                future, drained = self._submit(
+                    run_jobs, ([jobs[index] for index in chunk],)
+                )
+            except BaseException:
+                for _ in range(len(chunks) - chunk_number):
+                    self.slots.release()
+                raise
+            future.add_done_callback(lambda _: self.slots.release())
+            futures.append((future, drained))
+
+        local = [
+            index for index in range(len(jobs)) if sizes[index] <= self.inline_max_size
+        ]
+        for index, outcome in zip(local, run_jobs([jobs[index] for index in local])):
+            outcomes[index] = outcome
+
+        deadline = time.monotonic() + self.timeout
+        for chunk, (future, drained) in zip(chunks, futures):
+            try:
+                chunk_outcomes = self._result(
+                    future, drained, max(0.0, deadline - time.monotonic())
+                )
+            except TimeoutError:
+                future.cancel()
+                chunk_outcomes = [
+                    ExecutionTimeoutError(
+                        f"Execution did not finish within {self.timeout} seconds"
+                    )
+                ] * len(chunk)
+            for index, outcome in zip(chunk, chunk_outcomes):
+                outcomes[index] = outcome
+        return outcomes
+
+    def _submit(self, fn: Callable[..., Any], args: Tuple[Any, ...]):
+        # with the instrumentation on, the workers send their histograms back
+        # with every result
+        if instrumentation.ENABLED:
+            return self.executor.submit(instrumentation.run_and_drain, fn, args), True
+        return self.executor.submit(fn, *args), False
+
+    def _result(self, future, drained: bool, timeout: float) -> Any:
+        result = future.result(timeout=timeout)
+        if drained:
+            result, histograms = result
+            instrumentation.REGISTRY.merge(histograms)
+        return result
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _import_engines():
+    import app.engines  # noqa: F401
+
+
+def create_execution_backend():
+    """
+    Builds the execution backend from the environment:
+        EXECUTION_BACKEND: "inline" (default) or "process"
+        EXECUTION_WORKERS: number of worker processes (default: CPU count)
+        EXECUTION_QUEUE_SIZE: jobs accepted on top of the running ones (default: 2 x workers)
+        EXECUTION_TIMEOUT: seconds to wait for a job (default: 30)
+        EXECUTION_INLINE_MAX_COMMANDS: paths up to this size run inline (default: 100)
+    """
+    name = os.getenv("EXECUTION_BACKEND", "inline")
+    if name == "inline":
+        return InlineBackend()
+    if name != "process":
+        raise ValueError(f"Unknown execution backend '{name}'")
+
+    workers = int(os.getenv("EXECUTION_WORKERS", os.cpu_count() or 1))
+    backend = ProcessPoolBackend(
+        workers=workers,
+        queue_size=int(os.getenv("EXECUTION_QUEUE_SIZE", 2 * workers)),
+        timeout=float(os.getenv("EXECUTION_TIMEOUT", 30)),
+        inline_max_size=int(os.getenv("EXECUTION_INLINE_MAX_COMMANDS", 100)),
+    )
+    backend.warm_up()
+    atexit.register(backend.shutdown)
+    logger.info(f"Started process pool execution backend with {workers} workers")
+    return backend
@@ -0,0 +1,95 @@
+import time
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from app.execute_commands_numpy import (
+    Segments,
+    commands_to_arrays,
+    count_crossings_arrays,
+    count_segment_points,
+    create_segments,
+    merge_segment_arrays,
+)
+
+# the direction codes and steps of a path, and its start position
+FleetPath = Tuple[np.ndarray, np.ndarray, int, int]
+
+
+def fleet_segments(paths: Sequence[FleetPath]) -> Tuple[Segments, Segments]:
+    """
+    The horizontal and vertical segments of all the paths together. Every
+    start position is added as a one-cell horizontal segment, so the cell of
+    a robot that does not move is counted too.
+    time complexity: O(S), S being the total number of commands
+
+    Returns:
+        Tuple[Segments, Segments]: The (constant, start, end) arrays of the
+                                   horizontal and the vertical segments.
+    """
+    xs = np.array([x for _, _, x, _ in paths], dtype=np.int64)
+    ys = np.array([y for _, _, _, y in paths], dtype=np.int64)
+    horizontal, vertical = [(ys, xs, xs)], []
+    for directions, steps, x, y in paths:  # O(robots)
+        path_horizontal, path_vertical = create_segments(
+            x, y, directions, steps.astype(np.int64)
+        )
+        horizontal.append(path_horizontal)
+        vertical.append(path_vertical)
+    return (
+        tuple(np.concatenate(arrays) for arrays in zip(*horizontal)),
+        tuple(np.concatenate(arrays) for arrays in zip(*vertical)),
+    )
+
+
+def count_fleet_arrays(paths: Sequence[FleetPath]) -> int:
+    """
+    Counts the unique points visited by all the paths together: the segments
+    of every robot are merged as if one robot had walked them all, so a cell
+    cleaned by several robots is counted once.
+    time complexity: O(SlogS)
+
+    Returns:
+        int: The number of unique points visited by the fleet.
+    """
+    if not paths:
+        return 0
+
+    horizontal, vertical = fleet_segments(paths)
+    horizontal = merge_segment_arrays(*horizontal)
+    vertical = merge_segment_arrays(*vertical)
+
+    horizontal_points = count_segment_points(horizontal[1], horizontal[2])
+    vertical_points = count_segment_points(vertical[1], vertical[2])
+    crossings = count_crossings_arrays(vertical, horizontal)
+    return horizontal_points + vertical_points - crossings
+
+
+def execute_fleet_numpy(paths: Sequence[FleetPath]) -> Tuple[int, float]:
+    """
+    Fleet coverage of paths given as direction code and steps arrays.
+
+    Returns:
+        Tuple[int, float]: The number of unique points visited by the fleet
+                           and the duration of the execution in seconds.
+    """
+    start_time = time.perf_counter()
+    result = count_fleet_arrays(paths)
+    return result, time.perf_counter() - start_time
+
+
+def execute_fleet_commands(
+    robots: Sequence[Tuple[List[Dict[str, int]], int, int]]
+) -> Tuple[int, float]:
+    """
+    Fleet coverage of robots given, like `execute_commands_v2`, as their
+    commands and start position.
+
+    Returns:
+        Tuple[int, float]: The number of unique points visited by the fleet
+                           and the duration of the execution in seconds.
+    """
+    start_time = time.perf_counter()
+    paths = [(*commands_to_arrays(commands), x, y) for commands, x, y in robots]
+    result = count_fleet_arrays(paths)
+    return result, time.perf_counter() - start_time
@@ -0,0 +1,149 @@
+"""
+The enter-path request shared by the Flask (`app.main`) and the ASGI
+(`app.asgi`) front ends: parsing the body, the result cache, the engine,
+the path archive, the log line and the mapping of errors to responses. The
+front ends only read the request, store the execution and write the
+response.
+"""
+import logging
+import time
+from functools import partial
+from typing import Any, Callable, Dict, NamedTuple, Optional, Tuple
+
+from app.engines import select_engine
+from app.execute_commands_numpy import execute_arrays_numpy
+from app.execution_backend import BackendBusyError, ExecutionTimeoutError
+from app.path_archive import encode_commands_archive, encode_path_archive
+from app.result_cache import cache_key, records_cache_key
+from app.validation import parse_enter_path
+from app.wire_format import CONTENT_TYPE as WIRE_CONTENT_TYPE, decode_path
+
+logger = logging.getLogger("RobotCleaningService")
+
+
+class PathRun(NamedTuple):
+    result: int
+    duration: float
+    # None for a cached result
+    engine: Optional[str]
+    # the X-Cache header, None when the cache is disabled
+    cache_status: Optional[str]
+
+
+def is_binary(mimetype: str) -> bool:
+    return mimetype == WIRE_CONTENT_TYPE
+
+
+def parse_path(binary: bool, read_body: Callable[[], bytes], read_json: Callable):
+    """
+    Returns:
+        The path of a binary body (see `app.wire_format`) or of a JSON body.
+
+    Raises:
+        InvalidInputError: When the body is not a valid path.
+    """
+    if binary:
+        return decode_path(read_body())
+    return parse_enter_path(read_json())
+
+
+def cached_result(result_cache, compute_key, *args):
+    """
+    Looks a path up in the result cache, under the key `compute_key(*args)`.
+
+    Returns:
+        Tuple[Optional[bytes], Optional[int], float]: The cache key (None when
+        the cache is disabled), the cached result or None, and the lookup time.
+    """
+    if result_cache is None:
+        return None, None, 0.0
+    start_time = time.perf_counter()
+    key = compute_key(*args)
+    result = result_cache.get(key)
+    return key, result, time.perf_counter() - start_time
+
+
+def run_path(
+    path, binary: bool, result_cache, engine_selector, execution_backend
+) -> PathRun:
+    """
+    The result of a path, from the result cache or from the engine picked for
+    it on the execution backend.
+    """
+    if binary:
+        key, result, duration = cached_result(
+            result_cache, records_cache_key, path.commands
+        )
+    else:
+        key, result, duration = cached_result(
+            result_cache, cache_key, path.normalized, path.width
+        )
+    cache_status, engine = None, None
+    if key is not None:
+        cache_status = "MISS" if result is None else "HIT"
+
+    if result is None:
+        if binary:
+            # the decoded arrays go to the NumPy engine as they are
+            engine = "numpy"
+            fn, args = execute_arrays_numpy, (path.directions, path.steps)
+        else:
+            engine, fn = select_engine(engine_selector, path.normalized, path.width)
+            args = (path.normalized,)
+        result, duration = execution_backend.run(
+            fn, *args, path.x, path.y, size=len(path.commands)
+        )
+        if key is not None:
+            result_cache.put(key, result)
+    return PathRun(result, duration, engine, cache_status)
+
+
+def path_archive(path, binary: bool) -> Callable[[], Dict[str, Any]]:
+    """The archive callable of `ExecutionQueryService.add_execution`."""
+    if binary:
+        return partial(encode_path_archive, path.x, path.y, path.directions, path.steps)
+    return partial(encode_commands_archive, path.x, path.y, path.normalized)
+
+
+def log_execution(path, binary: bool, run: PathRun):
+    if binary:
+        logger.info(
+            f"Successfully executed {len(path.commands)} binary commands "
+            f"with engine {run.engine} in {run.duration:.6f} seconds"
+        )
+    else:
+        logger.info(
+            f"Successfully executed {len(path.commands)} commands "
+            f"({path.normalization.output_commands} after normalization, "
+            f"{path.normalization.reduction:.0%} fewer) with engine {run.engine} "
+            f"in {run.duration:.6f} seconds"
+        )
+
+
+def execution_body(path, run: PathRun, execution) -> Dict[str, Any]:
+    return {
+        "result": run.result,
+        "commands": len(path.commands),
+        "duration": run.duration,
+        "timestamp": execution.timestamp,
+        "engine": run.engine,
+    }
+
+
+def error_body(error: Exception) -> Tuple[Dict[str, str], int]:
+    """
+    Returns:
+        Tuple[Dict[str, str], int]: The body and status code answering a path
+        that could not be executed or stored.
+    """
+    if isinstance(error, BackendBusyError):
+        logger.warning("Execution queue is full, rejecting request")
+        return {"error": "Service busy, try again later"}, 503
+    if isinstance(error, ExecutionTimeoutError):
+        logger.error(f"Execution timed out: {error}")
+        return {"error": "Execution timed out"}, 504
+    if isinstance(error, MemoryError):
+        logger.critical("MemoryError occurred")
+    else:
+        logger.error(f"An unexpected error occurred: {error}")
+    return {"error": "Internal server error"}, 500
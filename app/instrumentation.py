@@ -0,0 +1,224 @@
+import os
+import threading
+import time
+from bisect import bisect_left
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+# INSTRUMENTATION=1 records the stage timings and sizes of the algorithms;
+# when off, an execution only pays one attribute lookup per stage
+ENABLED = os.getenv("INSTRUMENTATION", "0") == "1"
+
+# seconds, from 10 microseconds to 10 seconds
+TIME_BUCKETS = (
+    1e-5,
+    2.5e-5,
+    1e-4,
+    2.5e-4,
+    1e-3,
+    2.5e-3,
+    1e-2,
+    2.5e-2,
+    0.1,
+    0.25,
+    1.0,
+    2.5,
+    10.0,
+)
+SIZE_BUCKETS = (0, 1, 10, 100, 1000, 10000, 100000, 1000000)
+
+# per label values: the count of every bucket, +Inf last, and the sum
+Series = Dict[Tuple[str, ...], List[Any]]
+# name, "counter" or "gauge", documentation and value of a metric
+Sample = Tuple[str, str, str, float]
+
+
+class Histogram:
+    """
+    Thread-safe histogram with fixed buckets and one series per combination of
+    label values, rendered in the Prometheus text format. The series of two
+    processes can be merged, see `run_and_drain`.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        buckets: Sequence[float],
+        label_names: Tuple[str, ...],
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(buckets)
+        self.label_names = label_names
+        self.series: Series = {}
+        self.lock = threading.Lock()
+
+    def observe(self, labels: Tuple[str, ...], value: float):
+        index = bisect_left(self.buckets, value)  # O(log(buckets))
+        with self.lock:
+            series = self.series.get(labels)
+            if series is None:
+                series = self.series[labels] = [[0] * (len(self.buckets) + 1), 0]
+            series[0][index] += 1
+            series[1] += value
+
+    def drain(self) -> Series:
+        """Returns the series and starts new ones."""
+        with self.lock:
+            series, self.series = self.series, {}
+        return series
+
+    def merge(self, series: Series):
+        with self.lock:
+            for labels, (counts, total) in series.items():
+                mine = self.series.get(labels)
+                if mine is None:
+                    self.series[labels] = [list(counts), total]
+                    continue
+                for index, count in enumerate(counts):
+                    mine[0][index] += count
+                mine[1] += total
+
+    def render(self) -> List[str]:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} histogram",
+        ]
+        with self.lock:
+            series = sorted(
+                (labels, list(counts), total)
+                for labels, (counts, total) in self.series.items()
+            )
+        for labels, counts, total in series:
+            pairs = [
+                f'{name}="{_escape(value)}"'
+                for name, value in zip(self.label_names, labels)
+            ]
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(float(bound))
+                bucket_labels = ",".join(pairs + [f'le="{le}"'])
+                lines.append(f"{self.name}_bucket{{{bucket_labels}}} {cumulative}")
+            suffix = f"{{{','.join(pairs)}}}" if pairs else ""
+            lines.append(f"{self.name}_sum{suffix} {float(total)!r}")
+            lines.append(f"{self.name}_count{suffix} {cumulative}")
+        return lines
+
+
+class Registry:
+    """
+    The histograms served by the /metrics endpoint, and the collectors of
+    the counters and gauges read at every scrape.
+    """
+
+    def __init__(self):
+        self.histograms: Dict[str, Histogram] = {}
+        self.collectors: Dict[str, Callable[[], Sequence[Sample]]] = {}
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        buckets: Sequence[float],
+        label_names: Tuple[str, ...],
+    ) -> Histogram:
+        histogram = Histogram(name, documentation, buckets, label_names)
+        self.histograms[name] = histogram
+        return histogram
+
+    def collector(self, name: str, collect: Callable[[], Sequence[Sample]]):
+        """Registers `collect`, or replaces the collector of the same name."""
+        self.collectors[name] = collect
+
+    def drain(self) -> Dict[str, Series]:
+        return {name: h.drain() for name, h in self.histograms.items()}
+
+    def merge(self, state: Dict[str, Series]):
+        for name, series in state.items():
+            self.histograms[name].merge(series)
+
+    def render(self) -> str:
+        lines = []
+        for histogram in self.histograms.values():
+            lines.extend(histogram.render())
+        body = "\n".join(lines) + "\n"
+        for collect in list(self.collectors.values()):
+            body += render_samples(collect())
+        return body
+
+
+REGISTRY = Registry()
+STAGE_SECONDS = REGISTRY.histogram(
+    "robot_engine_stage_seconds",
+    "Time spent in each stage of an engine.",
+    TIME_BUCKETS,
+    ("engine", "stage"),
+)
+SEGMENTS = REGISTRY.histogram(
+    "robot_engine_segments",
+    "Segments of a path, before and after merging the overlapping ones.",
+    SIZE_BUCKETS,
+    ("engine", "phase"),
+)
+CROSSINGS = REGISTRY.histogram(
+    "robot_engine_crossings",
+    "Crossings between the horizontal and the vertical segments of a path.",
+    SIZE_BUCKETS,
+    ("engine",),
+)
+
+POOL_CHECKOUT_SECONDS = REGISTRY.histogram(
+    "robot_db_pool_checkout_seconds",
+    "Time to check a connection out of the database pool, by outcome.",
+    TIME_BUCKETS,
+    ("outcome",),
+)
+
+
+class Trace:
+    """
+    Times the consecutive stages of one execution with `perf_counter_ns`:
+    every call to `stage` records the time since the previous call (or since
+    the trace was created) under the name of the stage that just ended.
+    """
+
+    __slots__ = ("engine", "last")
+
+    def __init__(self, engine: str):
+        self.engine = engine
+        self.last = time.perf_counter_ns()
+
+    def stage(self, name: str):
+        now = time.perf_counter_ns()
+        STAGE_SECONDS.observe((self.engine, name), (now - self.last) / 1e9)
+        self.last = now
+
+
+def run_and_drain(fn: Callable[..., Any], args: Tuple[Any, ...]) -> Tuple[Any, Any]:
+    """
+    Runs `fn(*args)` in a worker process of the execution backend.
+
+    Returns:
+        Tuple[Any, Any]: The result and the histograms recorded meanwhile, for
+        the serving process to `REGISTRY.merge`.
+    """
+    result = fn(*args)
+    return result, REGISTRY.drain()
+
+
+def render_samples(samples: Sequence[Sample]) -> str:
+    """
+    Counters and gauges without labels, given as (name, type, documentation,
+    value), in the Prometheus text format.
+    """
+    lines = []
+    for name, kind, documentation, value in samples:
+        lines.append(f"# HELP {name} {documentation}")
+        lines.append(f"# TYPE {name} {kind}")
+        lines.append(f"{name} {value}")
+    return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
@@ -1,17 +1,81 @@
-from flask import request, jsonify
-from flask_inputs import Inputs
-from flask_inputs.validators import JsonSchema
-from app import create_app, db
-from app.execute_commands_v2 import execute_commands_v2
+from flask import Response, request, jsonify, stream_with_context
+from app import create_app, get_db
+from app.coverage_index import execute_coverage_queries
+from app.engine_selector import create_engine_selector
+from app.engines import select_engine
+from app.execute_commands_numpy import commands_to_arrays
+from app.fleet_coverage import execute_fleet_numpy
+from app.instrumentation import REGISTRY, render_samples
+from app.execution_backend import (
+    BackendBusyError,
+    ExecutionTimeoutError,
+    create_execution_backend,
+)
+from app.handlers import (
+    cached_result,
+    error_body,
+    execution_body,
+    is_binary,
+    log_execution,
+    parse_path,
+    path_archive,
+    run_path,
+)
+from app.path_archive import encode_commands_archive, path_archive_enabled
+from app.result_cache import cache_key, create_result_cache
+from app.serialization import execution_item, stream_json_array
+from app.validation import (
+    InvalidInputError,
+    parse_coverage_queries,
+    parse_enter_paths,
+    parse_executions_page,
+    parse_fleet_coverage,
+    parse_stats_query,
+)
+from functools import lru_cache, partial
+import click
 import logging
 
-from app.db_queries import ExecutionQueryService
-
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("RobotCleaningService")
 
-app = create_app(db)
-db_service = ExecutionQueryService(db)
+app = create_app()
+execution_backend = create_execution_backend()
+result_cache = create_result_cache()
+engine_selector = create_engine_selector()
+archive_paths = path_archive_enabled()
+
+
+@lru_cache(maxsize=None)
+def get_db_service():
+    """
+    The query service, built by the first request that uses the database:
+    `get_db()` registers the database, and SQLAlchemy, on the application.
+    """
+    from app.db_pool import pool_samples
+    from app.db_queries import (
+        ExecutionQueryService,
+        create_rollup_buffer,
+        create_write_buffer,
+    )
+
+    db = get_db()
+    # the gauges of the pool join /metrics with the database
+    REGISTRY.collector("db_pool", lambda: pool_samples(db.get_engine(app).pool))
+    write_buffer = create_write_buffer(app, db)
+    return ExecutionQueryService(
+        db, write_buffer, create_rollup_buffer(app, db, write_buffer)
+    )
+
+
+@app.cli.command("rebuild-rollups")
+@click.option("--batch-size", default=10000, help="Executions read per query.")
+def rebuild_rollups(batch_size):
+    """Recompute the stats rollups from the execution table."""
+    from app.db_queries import ExecutionQueryService
+
+    ExecutionQueryService(get_db()).rebuild_rollups(batch_size)
+    click.echo("Rebuilt the execution rollups")
 
 
 @app.route("/health", methods=["GET"])
@@ -21,53 +85,223 @@ def health():
 
 @app.route("/robot-cleaning-service/get-last-executions", methods=["GET"])
 def get_last_executions():
+    """
+    Streams a page of the most recent executions as a JSON array. The
+    `cursor` of the last item is the `before` parameter of the next page.
+    """
     # for testing purposes
-    executions = db_service.get_last_executions()
+    try:
+        before, limit = parse_executions_page(request.args)
+    except InvalidInputError as e:
+        return jsonify({"error": e.errors}), 400
+
+    try:
+        executions = get_db_service().iter_last_executions(before, limit)
+    except Exception as e:
+        logger.error(f"An unexpected error occurred: {e}")
+        return jsonify({"error": "Internal server error"}), 500
+    return Response(
+        stream_with_context(stream_json_array(map(execution_item, executions))),
+        mimetype="application/json",
+    )
+
+
+@app.route("/robot-cleaning-service/stats", methods=["GET"])
+def stats():
+    """
+    Execution statistics per minute or per hour, read from the rollup tables
+    maintained with every insert of executions.
+    """
+    try:
+        resolution, since, until = parse_stats_query(request.args)
+    except InvalidInputError as e:
+        return jsonify({"error": e.errors}), 400
+    try:
+        buckets = get_db_service().get_stats(resolution, since, until)
+    except Exception as e:
+        logger.error(f"An unexpected error occurred: {e}")
+        return jsonify({"error": "Internal server error"}), 500
+
+    for bucket in buckets:
+        bucket["start"] = bucket["start"].isoformat()
     return jsonify(
-        [
-            {
-                "result": execution.result,
-                "commands": execution.commands,
-                "duration": execution.duration,
-                "timestamp": execution.timestamp,
-            }
-            for execution in executions
-        ]
+        {
+            "resolution": resolution,
+            "since": since.isoformat(),
+            "until": until.isoformat(),
+            "buckets": buckets,
+        }
     )
 
 
+@app.route("/metrics", methods=["GET"])
+def metrics():
+    """
+    The histograms and collectors of `app.instrumentation` in the Prometheus
+    text format, with the database pool once a request used it, and the
+    counters of the result cache when it is enabled. The engine histograms
+    stay empty unless INSTRUMENTATION=1.
+    """
+    body = REGISTRY.render()
+    if result_cache is not None:
+        body += render_samples(result_cache.metrics())
+    return Response(body, mimetype="text/plain; version=0.0.4")
+
+
 @app.route("/robot-cleaning-service/enter-path", methods=["POST"])
 def enter_path():
     try:
-        inputs = EnterPathInput(request)
-        if not inputs.validate():
+        binary = is_binary(request.mimetype)
+        try:
+            path = parse_path(
+                binary, partial(request.get_data, cache=False), request.get_json
+            )
+        except InvalidInputError as e:
             logger.error("Input validation failed")
-            return jsonify({"error": inputs.errors}), 400
+            return jsonify({"error": e.errors}), 400
+
+        run = run_path(path, binary, result_cache, engine_selector, execution_backend)
+        execution = get_db_service().add_execution(
+            len(path.commands),
+            run.result,
+            run.duration,
+            archive=path_archive(path, binary) if archive_paths else None,
+        )
+        log_execution(path, binary, run)
 
-        data = request.get_json()
-        start = data["start"]
-        commands = data["commmands"]
+        response = jsonify(execution_body(path, run, execution))
+        if run.cache_status is not None:
+            response.headers["X-Cache"] = run.cache_status
+        return response, 201
+    except Exception as e:
+        body, status = error_body(e)
+        return jsonify(body), status
 
-        result, duration = execute_commands_v2(commands, start["x"], start["y"])
 
-        execution = db_service.add_execution(len(commands), result, duration)
+@app.route("/robot-cleaning-service/enter-paths", methods=["POST"])
+def enter_paths():
+    """
+    Runs a batch of paths in one request. Every job is validated like an
+    enter-path body, and the valid ones run in parallel on the execution
+    backend. Their executions are stored with a single INSERT. The response
+    lists, in the order of the jobs, either the result or the error of each.
+    """
+    try:
+        try:
+            jobs = parse_enter_paths(request.get_json(silent=True))
+        except InvalidInputError as e:
+            logger.error("Batch validation failed")
+            return jsonify({"error": e.errors}), 400
 
-        db.session.add(execution)
-        db.session.commit()
+        responses = [None] * len(jobs)
+        executed = {}
+        pending, backend_jobs, sizes = [], [], []
+        for index, job in enumerate(jobs):  # O(jobs)
+            if isinstance(job, InvalidInputError):
+                responses[index] = {"status": 400, "error": job.errors}
+                continue
+            key, result, duration = cached_result(
+                result_cache, cache_key, job.normalized, job.width
+            )
+            if result is not None:
+                executed[index] = (result, duration, None)
+                continue
+            engine, fn = select_engine(engine_selector, job.normalized, job.width)
+            pending.append((index, key, engine))
+            backend_jobs.append((fn, (job.normalized, job.x, job.y)))
+            sizes.append(len(job.normalized))
 
-        logger.info(f"Successfully executed {len(commands)} commands")
+        outcomes = execution_backend.run_many(backend_jobs, sizes)
+        for (index, key, engine), outcome in zip(pending, outcomes):
+            if isinstance(outcome, ExecutionTimeoutError):
+                logger.error(f"Job {index} timed out: {outcome}")
+                responses[index] = {"status": 504, "error": "Execution timed out"}
+            elif isinstance(outcome, Exception):
+                logger.error(f"Job {index} failed: {outcome!r}")
+                responses[index] = {"status": 500, "error": "Internal server error"}
+            else:
+                result, duration = outcome
+                if key is not None:
+                    result_cache.put(key, result)
+                executed[index] = (result, duration, engine)
 
+        indexes = sorted(executed)
+        archives = None
+        if archive_paths:
+            archives = [
+                partial(
+                    encode_commands_archive,
+                    jobs[index].x,
+                    jobs[index].y,
+                    jobs[index].normalized,
+                )
+                for index in indexes
+            ]
+        rows = get_db_service().add_executions(
+            [(len(jobs[index].commands), *executed[index][:2]) for index in indexes],
+            archives,
+        )
+        for index, row in zip(indexes, rows):
+            responses[index] = {
+                "status": 201,
+                "result": row["result"],
+                "commands": row["commands"],
+                "duration": row["duration"],
+                "timestamp": row["timestamp"],
+                "engine": executed[index][2],
+            }
+
+        logger.info(f"Successfully executed {len(rows)} of {len(jobs)} paths")
+        return jsonify({"results": responses}), 201
+    except BackendBusyError:
+        logger.warning("Execution queue is full, rejecting batch")
+        return jsonify({"error": "Service busy, try again later"}), 503
+    except Exception as e:
+        logger.error(f"An unexpected error occurred: {e}")
+        return jsonify({"error": "Internal server error"}), 500
+
+
+@app.route("/robot-cleaning-service/fleet-coverage", methods=["POST"])
+def fleet_coverage():
+    """
+    Counts the cells cleaned by a fleet of robots together, each with its own
+    start and commands, so that a cell cleaned by several robots is counted
+    once. Nothing is stored.
+    """
+    try:
+        try:
+            robots = parse_fleet_coverage(request.get_json(silent=True))
+        except InvalidInputError as e:
+            logger.error("Fleet validation failed")
+            return jsonify({"error": e.errors}), 400
+
+        # the robots are parsed into arrays, cheaper to send to a worker
+        commands = sum(len(robot.steps) for robot in robots)
+        result, duration = execution_backend.run(
+            execute_fleet_numpy, robots, size=commands
+        )
+
+        logger.info(
+            f"Successfully computed the coverage of {len(robots)} robots "
+            f"({commands} commands) in {duration:.6f} seconds"
+        )
         return (
             jsonify(
                 {
                     "result": result,
-                    "commands": len(commands),
+                    "robots": len(robots),
+                    "commands": commands,
                     "duration": duration,
-                    "timestamp": execution.timestamp,
                 }
             ),
-            201,
+            200,
         )
+    except BackendBusyError:
+        logger.warning("Execution queue is full, rejecting fleet")
+        return jsonify({"error": "Service busy, try again later"}), 503
+    except ExecutionTimeoutError as e:
+        logger.error(f"Execution timed out: {e}")
+        return jsonify({"error": "Execution timed out"}), 504
     except MemoryError:
         logger.critical("MemoryError occurred")
         return jsonify({"error": "Internal server error"}), 500
@@ -76,45 +310,58 @@ def enter_path():
         return jsonify({"error": "Internal server error"}), 500
 
 
-class EnterPathInput(Inputs):
-    json = [
-        JsonSchema(
-            schema={
-                "type": "object",
-                "properties": {
-                    "start": {
-                        "type": "object",
-                        "properties": {
-                            "x": {
-                                "type": "integer",
-                                "minimum": -100000,
-                                "maximum": 100000,
-                            },
-                            "y": {
-                                "type": "integer",
-                                "minimum": -100000,
-                                "maximum": 100000,
-                            },
-                        },
-                        "required": ["x", "y"],
-                    },
-                    "commmands": {
-                        "type": "array",
-                        "items": {
-                            "type": "object",
-                            "properties": {
-                                "direction": {
-                                    "type": "string",
-                                    "enum": ["north", "south", "east", "west"],
-                                },
-                                "steps": {"type": "integer", "minimum": 0},
-                            },
-                            "required": ["direction", "steps"],
-                        },
-                        "maxItems": 10000,
-                    },
-                },
-                "required": ["start", "commmands"],
-            }
+@app.route("/robot-cleaning-service/coverage-queries", methods=["POST"])
+def coverage_queries():
+    """
+    Answers a batch of "was this cell cleaned?" and "how many cells of this
+    rectangle were cleaned?" queries on a path, from the index of its merged
+    lines. Nothing is stored.
+    """
+    try:
+        try:
+            path, points, rectangles = parse_coverage_queries(
+                request.get_json(silent=True)
+            )
+        except InvalidInputError as e:
+            logger.error("Coverage queries validation failed")
+            return jsonify({"error": e.errors}), 400
+
+        result, visited, counts, duration = execution_backend.run(
+            execute_coverage_queries,
+            *commands_to_arrays(path.normalized),
+            path.x,
+            path.y,
+            points,
+            rectangles,
+            size=len(path.normalized) + len(points) + len(rectangles),
         )
-    ]
+
+        logger.info(
+            f"Successfully answered {len(points)} point and {len(rectangles)} "
+            f"rectangle queries on {len(path.commands)} commands in "
+            f"{duration:.6f} seconds"
+        )
+        return (
+            jsonify(
+                {
+                    "result": result,
+                    "visited": visited.tolist(),
+                    "counts": counts,
+                    "commands": len(path.commands),
+                    "duration": duration,
+                }
+            ),
+            200,
+        )
+    except BackendBusyError:
+        logger.warning("Execution queue is full, rejecting coverage queries")
+        return jsonify({"error": "Service busy, try again later"}), 503
+    except ExecutionTimeoutError as e:
+        logger.error(f"Execution timed out: {e}")
+        return jsonify({"error": "Execution timed out"}), 504
+    except MemoryError:
+        logger.critical("MemoryError occurred")
+        return jsonify({"error": "Internal server error"}), 500
+    except Exception as e:
+        logger.error(f"An unexpected error occurred: {e}")
+        return jsonify({"error": "Internal server error"}), 500
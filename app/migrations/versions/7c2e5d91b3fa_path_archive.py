@@ -0,0 +1,38 @@
+"""Path archive.
+
+Revision ID: 7c2e5d91b3fa
+Revises: 4a4933950036
+Create Date: 2026-10-18 10:12:41.518230
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "7c2e5d91b3fa"
+down_revision = "4a4933950036"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table("execution") as batch_op:
+        batch_op.add_column(sa.Column("path", sa.LargeBinary(), nullable=True))
+        batch_op.add_column(sa.Column("start_x", sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column("start_y", sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column("min_x", sa.BigInteger(), nullable=True))
+        batch_op.add_column(sa.Column("min_y", sa.BigInteger(), nullable=True))
+        batch_op.add_column(sa.Column("max_x", sa.BigInteger(), nullable=True))
+        batch_op.add_column(sa.Column("max_y", sa.BigInteger(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table("execution") as batch_op:
+        batch_op.drop_column("max_y")
+        batch_op.drop_column("max_x")
+        batch_op.drop_column("min_y")
+        batch_op.drop_column("min_x")
+        batch_op.drop_column("start_y")
+        batch_op.drop_column("start_x")
+        batch_op.drop_column("path")
@@ -0,0 +1,29 @@
+"""Execution timestamp index.
+
+Revision ID: b81f04c6d2e7
+Revises: 7c2e5d91b3fa
+Create Date: 2026-10-18 11:03:27.904615
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "b81f04c6d2e7"
+down_revision = "7c2e5d91b3fa"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # backs the (timestamp, id) keyset pagination of get-last-executions
+    op.create_index(
+        "ix_execution_timestamp_id",
+        "execution",
+        [sa.text("timestamp DESC"), sa.text("id DESC")],
+    )
+
+
+def downgrade():
+    op.drop_index("ix_execution_timestamp_id", table_name="execution")
@@ -0,0 +1,42 @@
+"""Execution rollups.
+
+Revision ID: e4a9c7310b58
+Revises: b81f04c6d2e7
+Create Date: 2026-10-18 11:48:02.361774
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "e4a9c7310b58"
+down_revision = "b81f04c6d2e7"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "execution_rollup",
+        sa.Column("resolution", sa.String(length=6), nullable=False),
+        sa.Column("bucket_start", sa.DateTime(), nullable=False),
+        sa.Column("executions", sa.BigInteger(), nullable=False),
+        sa.Column("total_commands", sa.BigInteger(), nullable=False),
+        sa.Column("total_result", sa.BigInteger(), nullable=False),
+        sa.Column("total_duration", sa.Float(), nullable=False),
+        sa.PrimaryKeyConstraint("resolution", "bucket_start"),
+    )
+    op.create_table(
+        "execution_duration_histogram",
+        sa.Column("resolution", sa.String(length=6), nullable=False),
+        sa.Column("bucket_start", sa.DateTime(), nullable=False),
+        sa.Column("bin", sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column("executions", sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint("resolution", "bucket_start", "bin"),
+    )
+
+
+def downgrade():
+    op.drop_table("execution_duration_histogram")
+    op.drop_table("execution_rollup")
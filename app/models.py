@@ -1,4 +1,4 @@
-from . import db
+from app.database import db
 import datetime
 
 
@@ -8,3 +8,35 @@ class Execution(db.Model):
     commands = db.Column(db.Integer, nullable=False)
     result = db.Column(db.Integer, nullable=False)
     duration = db.Column(db.Float, nullable=False)
+    # optional path archive, see app/path_archive.py
+    path = db.deferred(db.Column(db.LargeBinary, nullable=True))
+    start_x = db.Column(db.Integer, nullable=True)
+    start_y = db.Column(db.Integer, nullable=True)
+    min_x = db.Column(db.BigInteger, nullable=True)
+    min_y = db.Column(db.BigInteger, nullable=True)
+    max_x = db.Column(db.BigInteger, nullable=True)
+    max_y = db.Column(db.BigInteger, nullable=True)
+
+    __table_args__ = (
+        db.Index("ix_execution_timestamp_id", timestamp.desc(), id.desc()),
+    )
+
+
+class ExecutionRollup(db.Model):
+    """Totals of the executions of one minute or one hour, see app/rollups.py."""
+
+    resolution = db.Column(db.String(6), primary_key=True)
+    bucket_start = db.Column(db.DateTime, primary_key=True)
+    executions = db.Column(db.BigInteger, nullable=False)
+    total_commands = db.Column(db.BigInteger, nullable=False)
+    total_result = db.Column(db.BigInteger, nullable=False)
+    total_duration = db.Column(db.Float, nullable=False)
+
+
+class ExecutionDurationHistogram(db.Model):
+    """Executions per logarithmic duration bin of one minute or one hour."""
+
+    resolution = db.Column(db.String(6), primary_key=True)
+    bucket_start = db.Column(db.DateTime, primary_key=True)
+    bin = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    executions = db.Column(db.BigInteger, nullable=False)
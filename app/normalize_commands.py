@@ -0,0 +1,97 @@
+from typing import Iterable, List, Tuple, Dict, NamedTuple
+
+# axis and sign of every direction: 0 moves along x, 1 along y
+MOVES = {"north": (1, 1), "south": (1, -1), "east": (0, 1), "west": (0, -1)}
+DIRECTIONS = {(1, 1): "north", (1, -1): "south", (0, 1): "east", (0, -1): "west"}
+
+
+class NormalizationStats(NamedTuple):
+    input_commands: int
+    output_commands: int
+
+    @property
+    def reduction(self) -> float:
+        """Fraction of the commands removed by the normalization."""
+        if not self.input_commands:
+            return 0.0
+        return 1 - self.output_commands / self.input_commands
+
+
+def normalize_commands(
+    commands: List[Dict[str, int]]
+) -> Tuple[List[Dict[str, int]], NormalizationStats]:
+    """
+    Rewrites the commands into at most as many commands visiting exactly the
+    same cells and ending at the same position, so that `create_lines` works
+    on fewer lines.
+    time complexity: O(n)
+
+    Commands with zero steps are dropped. Every maximal run of commands along
+    the same axis (e.g. north 5, north 3, south 4) stays on one line, so it
+    only visits the cells between the lowest and the highest position it
+    reaches. The run is replaced by at most three moves covering that range
+    and ending where the run ended. Fusing consecutive commands in the same
+    direction is the special case of a run moving one way.
+
+    Returns:
+        Tuple[List[Dict[str, int]], NormalizationStats]: The normalized commands
+        and how much the input shrank.
+    """
+    normalized = normalize_moves(
+        MOVES[command["direction"]] + (command["steps"],) for command in commands
+    )
+    return normalized, NormalizationStats(len(commands), len(normalized))
+
+
+def normalize_moves(moves: Iterable[Tuple[int, int, int]]) -> List[Dict[str, int]]:
+    """
+    `normalize_commands` over (axis, sign, steps) moves, see `MOVES`. The moves
+    are consumed lazily, so a generator can validate or convert the commands
+    in the same pass.
+
+    Returns:
+        List[Dict[str, int]]: The normalized commands.
+    """
+    normalized = []
+    run_axis = None
+    position = low = high = 0
+
+    for axis, sign, steps in moves:  # O(n)
+        if steps == 0:
+            continue
+        if axis != run_axis:
+            if run_axis is not None:
+                normalized.extend(_cover_run(run_axis, position, low, high))
+            run_axis = axis
+            position = low = high = 0
+        position += sign * steps
+        low = min(low, position)
+        high = max(high, position)
+
+    if run_axis is not None:
+        normalized.extend(_cover_run(run_axis, position, low, high))
+
+    return normalized
+
+
+def _cover_run(axis: int, end: int, low: int, high: int) -> List[Dict[str, int]]:
+    """
+    Shortest of 0 -> high -> low -> end and 0 -> low -> high -> end, positions
+    being relative to the start of the run.
+    """
+    candidates = []
+    for stops in ((high, low, end), (low, high, end)):
+        moves = []
+        position = 0
+        for stop in stops:
+            if stop != position:
+                sign = 1 if stop > position else -1
+                moves.append(
+                    {
+                        "direction": DIRECTIONS[(axis, sign)],
+                        "steps": abs(stop - position),
+                    }
+                )
+                position = stop
+        candidates.append(moves)
+    return min(candidates, key=len)
@@ -0,0 +1,102 @@
+import os
+import struct
+import zlib
+from typing import Any, Dict, Iterator, List, NamedTuple
+
+import numpy as np
+
+from app.execute_commands_numpy import (
+    DIRECTION_CODES,
+    EAST,
+    NORTH,
+    SOUTH,
+    WEST,
+    commands_to_arrays,
+)
+
+FORMAT_VERSION = 1
+# format version, start x, start y and number of moves
+HEADER = struct.Struct("<BiiI")
+DIRECTION_NAMES = {code: name for name, code in DIRECTION_CODES.items()}
+
+
+class ArchivedPath(NamedTuple):
+    x: int
+    y: int
+    directions: np.ndarray
+    steps: np.ndarray
+
+    def commands(self) -> Iterator[Dict[str, int]]:
+        """Yields the archived moves as enter-path commands."""
+        for direction, steps in zip(self.directions.tolist(), self.steps.tolist()):
+            yield {"direction": DIRECTION_NAMES[direction], "steps": steps}
+
+
+def encode_path_archive(
+    x: int, y: int, directions: np.ndarray, steps: np.ndarray
+) -> Dict[str, Any]:
+    """
+    Compresses a path into the archive columns of `Execution`.
+    time complexity: O(n), in NumPy
+
+    Every move is the delta between two consecutive positions, stored as a
+    uint64 code `steps << 2 | direction`. The codes are byte-shuffled (all
+    first bytes, then all second bytes, ...) so that the zero high bytes of
+    small deltas form long runs, and the result is compressed with zlib.
+
+    Returns:
+        Dict[str, Any]: The `path` blob, the start position and the bounding box.
+    """
+    steps = steps.astype(np.int64)
+    codes = (steps.astype(np.uint64) << np.uint64(2)) | directions.astype(np.uint64)
+    shuffled = codes.astype("<u8").view(np.uint8).reshape(-1, 8).T.tobytes()
+    blob = zlib.compress(HEADER.pack(FORMAT_VERSION, x, y, len(codes)) + shuffled)
+
+    xs = x + np.cumsum(
+        np.where(directions == EAST, steps, 0) - np.where(directions == WEST, steps, 0)
+    )
+    ys = y + np.cumsum(
+        np.where(directions == NORTH, steps, 0)
+        - np.where(directions == SOUTH, steps, 0)
+    )
+    return {
+        "path": blob,
+        "start_x": x,
+        "start_y": y,
+        "min_x": min(x, int(xs.min())) if len(xs) else x,
+        "min_y": min(y, int(ys.min())) if len(ys) else y,
+        "max_x": max(x, int(xs.max())) if len(xs) else x,
+        "max_y": max(y, int(ys.max())) if len(ys) else y,
+    }
+
+
+def encode_commands_archive(
+    x: int, y: int, commands: List[Dict[str, int]]
+) -> Dict[str, Any]:
+    """`encode_path_archive` for a list of command dictionaries."""
+    directions, steps = commands_to_arrays(commands)
+    return encode_path_archive(x, y, directions, steps)
+
+
+def decode_path_archive(blob: bytes) -> ArchivedPath:
+    """
+    Returns:
+        ArchivedPath: The start position and the moves of an archived path.
+    """
+    data = zlib.decompress(blob)
+    version, x, y, count = HEADER.unpack_from(data)
+    if version != FORMAT_VERSION:
+        raise ValueError(f"Unknown path archive format version {version}")
+    shuffled = np.frombuffer(data, dtype=np.uint8, offset=HEADER.size)
+    codes = shuffled.reshape(8, count).T.copy().view("<u8").ravel()
+    return ArchivedPath(
+        x,
+        y,
+        (codes & np.uint64(3)).astype(np.int64),
+        (codes >> np.uint64(2)).astype(np.int64),
+    )
+
+
+def path_archive_enabled() -> bool:
+    """PATH_ARCHIVE=1 stores the normalized path of every execution."""
+    return os.getenv("PATH_ARCHIVE", "0") == "1"
@@ -0,0 +1,194 @@
+from bisect import bisect_left, bisect_right, insort
+from typing import List, Tuple, Dict
+
+from app.execute_commands_v2 import Line
+
+
+class IntervalSet:
+    """
+    Sorted, disjoint closed intervals covering the visited cells of one line.
+    Contiguous intervals are merged, so each cell is covered at most once.
+    """
+
+    def __init__(self):
+        self.starts: List[int] = []
+        self.ends: List[int] = []
+
+    def covers(self, value: int) -> bool:
+        index = bisect_right(self.starts, value) - 1
+        return index >= 0 and self.ends[index] >= value
+
+    def add(self, start: int, end: int) -> List[Tuple[int, int]]:
+        """
+        Adds the interval [start, end] to the set.
+        time complexity: O(logn + k) for k intervals absorbed by the new one
+
+        Returns:
+            List[Tuple[int, int]]: The parts of [start, end] that were not
+                                   covered before.
+        """
+        starts, ends = self.starts, self.ends
+        first = bisect_left(ends, start - 1)
+        last = bisect_right(starts, end + 1)
+
+        uncovered = []
+        position = start
+        for index in range(first, last):
+            if starts[index] > position:
+                uncovered.append((position, starts[index] - 1))
+            position = max(position, ends[index] + 1)
+        if position <= end:
+            uncovered.append((position, end))
+
+        if first < last:
+            start = min(start, starts[first])
+            end = max(end, ends[last - 1])
+        starts[first:last] = [start]
+        ends[first:last] = [end]
+        return uncovered
+
+    def lines(self, constant: int) -> List[Line]:
+        return [
+            Line(constant, start, end) for start, end in zip(self.starts, self.ends)
+        ]
+
+
+class StabbingIndex:
+    """
+    Intervals of the lines of one axis, each stored with the constant of its
+    line, to count the lines that cover a position. An interval is split
+    into the aligned power-of-two blocks that exactly cover it, at most two
+    per level, and every block keeps the sorted constants of its intervals.
+    A position lies in one block per level, so a count only reads the lines
+    that cover the position, whatever the number of lines around it.
+    The intervals of one constant must not overlap.
+    """
+
+    def __init__(self):
+        # per level: the first position of a block >> level -> its constants
+        self.levels: List[Dict[int, List[int]]] = []
+
+    def add(self, constant: int, start: int, end: int):
+        """
+        Adds the interval [start, end] of the line `constant`.
+        time complexity: O(logl * logn), l being the length of the interval
+        """
+        low, high, level = start, end + 1, 0
+        while low < high:
+            if level == len(self.levels):
+                self.levels.append({})
+            blocks = self.levels[level]
+            if low & 1:
+                insort(blocks.setdefault(low, []), constant)
+                low += 1
+            if high & 1:
+                high -= 1
+                insort(blocks.setdefault(high, []), constant)
+            low >>= 1
+            high >>= 1
+            level += 1
+
+    def count(self, position: int, low: int, high: int) -> int:
+        """
+        Counts the intervals covering `position` whose constant is in
+        [low, high].
+        time complexity: O(L * logn), L being the number of levels
+        """
+        total = 0
+        for level, blocks in enumerate(self.levels):
+            constants = blocks.get(position >> level)
+            if constants:
+                total += bisect_right(constants, high) - bisect_left(constants, low)
+        return total
+
+
+class PathSession:
+    """
+    Incremental version of `execute_commands_v2` for paths that arrive in
+    batches. The merged horizontal and vertical lines are kept per constant
+    in `IntervalSet`s, so each new command only pays for the cells it adds:
+    the cells of the new segment that were not covered on its own line,
+    minus the ones already covered by perpendicular lines. Those are counted
+    by a `StabbingIndex` of the newly covered parts of every line.
+
+    Example:
+        session = PathSession(0, 0)
+        session.extend(first_batch)
+        visited = session.extend(second_batch)
+    """
+
+    def __init__(self, x: int, y: int):
+        self.x = x
+        self.y = y
+        self.commands = 0
+        self.visited = 0
+        self.horizontal: Dict[int, IntervalSet] = {}
+        self.vertical: Dict[int, IntervalSet] = {}
+        # the horizontal parts by x, the vertical parts by y
+        self.horizontal_index = StabbingIndex()
+        self.vertical_index = StabbingIndex()
+
+        # the start position is visited even without commands
+        self._add_vertical(x, y, y)
+
+    def extend(self, commands: List[Dict[str, int]]) -> int:
+        """
+        Moves the robot through a new batch of commands.
+
+        Returns:
+            int: The number of unique points visited since the session started.
+        """
+        for command in commands:  # O(n)
+            direction = command["direction"]
+            distance = command["steps"]
+
+            if direction == "north":
+                self._add_vertical(self.x, self.y, self.y + distance)
+                self.y += distance
+            elif direction == "south":
+                self._add_vertical(self.x, self.y - distance, self.y)
+                self.y -= distance
+            elif direction == "east":
+                self._add_horizontal(self.y, self.x, self.x + distance)
+                self.x += distance
+            elif direction == "west":
+                self._add_horizontal(self.y, self.x - distance, self.x)
+                self.x -= distance
+
+        self.commands += len(commands)
+        return self.visited
+
+    def horizontal_lines(self) -> List[Line]:
+        return [
+            line
+            for row in sorted(self.horizontal)
+            for line in self.horizontal[row].lines(row)
+        ]
+
+    def vertical_lines(self) -> List[Line]:
+        return [
+            line
+            for column in sorted(self.vertical)
+            for line in self.vertical[column].lines(column)
+        ]
+
+    def _add_horizontal(self, y: int, start: int, end: int):
+        intervals = self.horizontal.get(y)
+        if intervals is None:
+            intervals = self.horizontal[y] = IntervalSet()
+
+        # the uncovered parts never overlap the parts indexed before
+        for first, last in intervals.add(start, end):
+            crossings = self.vertical_index.count(y, first, last)
+            self.visited += last - first + 1 - crossings
+            self.horizontal_index.add(y, first, last)
+
+    def _add_vertical(self, x: int, start: int, end: int):
+        intervals = self.vertical.get(x)
+        if intervals is None:
+            intervals = self.vertical[x] = IntervalSet()
+
+        for first, last in intervals.add(start, end):
+            crossings = self.horizontal_index.count(x, first, last)
+            self.visited += last - first + 1 - crossings
+            self.vertical_index.add(x, first, last)
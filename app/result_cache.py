@@ -0,0 +1,189 @@
+import hashlib
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import List, Tuple, Dict, Optional
+
+from app.normalize_commands import normalize_commands
+
+logger = logging.getLogger("RobotCleaningService")
+
+
+def canonicalize_commands(commands: List[Dict[str, int]]) -> List[Tuple[str, int]]:
+    """
+    Rewrites the commands into a canonical form visiting the same cells, see
+    `normalize_commands`. The start position is not part of it, since the
+    number of visited cells does not depend on it.
+
+    Returns:
+        List[Tuple[str, int]]: The canonical (direction, steps) moves.
+    """
+    normalized, _ = normalize_commands(commands)
+    return [(command["direction"], command["steps"]) for command in normalized]
+
+
+def cache_key(normalized: List[Dict[str, int]], width: int = 1) -> bytes:
+    """
+    Hashes commands already normalized by `normalize_commands` (the
+    `normalized` of a parsed path), and the brush width when it is not 1,
+    into a 16-byte key. The commands are hashed as they are, so paths
+    visiting the same cells share a key through their normalized form.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    if width != 1:
+        digest.update(f"w{width};".encode())
+    for command in normalized:
+        digest.update(f"{command['direction'][0]}{command['steps']},".encode())
+    return digest.digest()
+
+
+def records_cache_key(records) -> bytes:
+    """
+    Hashes the commands of a binary path (see `app.wire_format`) into a
+    16-byte key. The records are hashed as they are, without normalization,
+    under their own prefix, so they never share entries with `cache_key`.
+    """
+    digest = hashlib.blake2b(records, digest_size=16, person=b"x-robot-path")
+    return digest.digest()
+
+
+class InMemoryStore:
+    """
+    In-process stand-in for a shared key-value store (e.g. Redis) behind the
+    result cache. Any object with the same `get`/`set` methods can be used.
+    """
+
+    def __init__(self):
+        self.values: Dict[bytes, int] = {}
+        self.lock = threading.Lock()
+
+    def get(self, key: bytes) -> Optional[int]:
+        with self.lock:
+            return self.values.get(key)
+
+    def set(self, key: bytes, value: int):
+        with self.lock:
+            self.values[key] = value
+
+
+class ResultCache:
+    """
+    Thread-safe LRU cache of path results keyed by `cache_key`. Every entry
+    is a 16-byte key and an int, so memory is bounded by `max_entries`.
+    On a local miss the optional shared store is consulted, and results are
+    written to both.
+    """
+
+    def __init__(self, max_entries: int, shared_store=None):
+        self.max_entries = max_entries
+        self.shared_store = shared_store
+        self.entries: "OrderedDict[bytes, int]" = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: bytes) -> Optional[int]:
+        with self.lock:
+            value = self.entries.get(key)
+            if value is not None:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return value
+
+        if self.shared_store is not None:
+            value = self.shared_store.get(key)
+            if value is not None:
+                self._store(key, value)
+                with self.lock:
+                    self.hits += 1
+                return value
+
+        with self.lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: bytes, value: int):
+        self._store(key, value)
+        if self.shared_store is not None:
+            self.shared_store.set(key, value)
+
+    def stats(self) -> Dict[str, int]:
+        with self.lock:
+            return {
+                "entries": len(self.entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+    def metrics(self) -> List[Tuple[str, str, str, int]]:
+        """
+        Returns:
+            List[Tuple[str, str, str, int]]: The `stats` as the samples of
+            `app.instrumentation.render_samples`.
+        """
+        stats = self.stats()
+        return [
+            (
+                "robot_result_cache_hits_total",
+                "counter",
+                "Path results served by the result cache.",
+                stats["hits"],
+            ),
+            (
+                "robot_result_cache_misses_total",
+                "counter",
+                "Path results looked up and not found in the result cache.",
+                stats["misses"],
+            ),
+            (
+                "robot_result_cache_evictions_total",
+                "counter",
+                "Path results evicted from the result cache when it was full.",
+                stats["evictions"],
+            ),
+            (
+                "robot_result_cache_entries",
+                "gauge",
+                "Path results in the result cache.",
+                stats["entries"],
+            ),
+            (
+                "robot_result_cache_max_entries",
+                "gauge",
+                "Capacity of the result cache.",
+                stats["max_entries"],
+            ),
+        ]
+
+    def _store(self, key: bytes, value: int):
+        with self.lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+
+def create_result_cache():
+    """
+    Builds the result cache from the environment:
+        RESULT_CACHE_SIZE: maximum number of cached paths, 0 disables the cache (default: 0)
+        RESULT_CACHE_SHARED_STORE: "memory" adds the in-process shared store stand-in
+    """
+    max_entries = int(os.getenv("RESULT_CACHE_SIZE", 0))
+    if max_entries <= 0:
+        return None
+
+    shared_store = None
+    shared_store_name = os.getenv("RESULT_CACHE_SHARED_STORE")
+    if shared_store_name == "memory":
+        shared_store = InMemoryStore()
+    elif shared_store_name:
+        raise ValueError(f"Unknown result cache shared store '{shared_store_name}'")
+
+    logger.info(f"Caching up to {max_entries} path results")
+    return ResultCache(max_entries, shared_store)
@@ -0,0 +1,136 @@
+import datetime
+import math
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Tuple
+
+# the stats resolutions and the width of their buckets
+RESOLUTIONS = {
+    "minute": datetime.timedelta(minutes=1),
+    "hour": datetime.timedelta(hours=1),
+}
+
+# durations are counted in logarithmic bins: 8 per doubling from 1 microsecond,
+# so a percentile read from the histogram is within 4.5% of the exact one
+BINS_PER_OCTAVE = 8
+MIN_DURATION = 1e-6
+PERCENTILES = (50, 95, 99)
+
+ROLLUP_SUMS = ("executions", "total_commands", "total_result", "total_duration")
+
+
+def bucket_start(timestamp: datetime.datetime, resolution: str) -> datetime.datetime:
+    if resolution == "minute":
+        return timestamp.replace(second=0, microsecond=0)
+    return timestamp.replace(minute=0, second=0, microsecond=0)
+
+
+def duration_bin(duration: float) -> int:
+    if duration <= MIN_DURATION:
+        return 0
+    return int(math.log2(duration / MIN_DURATION) * BINS_PER_OCTAVE)
+
+
+def bin_duration(bin: int) -> float:
+    """The geometric middle of a duration bin."""
+    return MIN_DURATION * 2 ** ((bin + 0.5) / BINS_PER_OCTAVE)
+
+
+def aggregate(
+    rows: Iterable[Dict[str, Any]]
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Sums execution rows into the rollup and histogram increments of their
+    minute and hour buckets.
+    time complexity: O(n)
+
+    Returns:
+        Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]: The rollup and the
+        histogram rows to add, sorted by primary key.
+    """
+    rollups = defaultdict(lambda: [0, 0, 0, 0.0])
+    histogram = defaultdict(int)
+    for row in rows:  # O(n)
+        bin = duration_bin(row["duration"])
+        for resolution in RESOLUTIONS:
+            start = bucket_start(row["timestamp"], resolution)
+            totals = rollups[(resolution, start)]
+            totals[0] += 1
+            totals[1] += row["commands"]
+            totals[2] += row["result"]
+            totals[3] += row["duration"]
+            histogram[(resolution, start, bin)] += 1
+
+    rollup_rows = [
+        dict(
+            resolution=resolution, bucket_start=start, **dict(zip(ROLLUP_SUMS, totals))
+        )
+        for (resolution, start), totals in sorted(rollups.items())
+    ]
+    histogram_rows = [
+        dict(resolution=resolution, bucket_start=start, bin=bin, executions=count)
+        for (resolution, start, bin), count in sorted(histogram.items())
+    ]
+    return rollup_rows, histogram_rows
+
+
+def apply_rollups(session, rows: Iterable[Dict[str, Any]]):
+    """
+    Adds execution rows to the rollup tables, in the session's transaction,
+    so that the rollups are committed with the executions. Rows are upserted
+    in primary key order, which keeps concurrent flushes from deadlocking.
+    """
+    # the models, and SQLAlchemy, are only needed once there is a database
+    from app.models import ExecutionDurationHistogram, ExecutionRollup
+
+    rollup_rows, histogram_rows = aggregate(rows)
+    if not rollup_rows:
+        return
+    _upsert(session, ExecutionRollup.__table__, rollup_rows, ROLLUP_SUMS)
+    _upsert(
+        session, ExecutionDurationHistogram.__table__, histogram_rows, ("executions",)
+    )
+
+
+def _upsert(session, table, rows: List[Dict[str, Any]], sums: Tuple[str, ...]):
+    keys = [column.name for column in table.primary_key.columns]
+    dialect = session.connection().dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert
+        statement = insert(table).values(rows)
+        statement = statement.on_conflict_do_update(
+            index_elements=keys,
+            set_={name: table.c[name] + statement.excluded[name] for name in sums},
+        )
+        session.execute(statement)
+        return
+
+    # other databases: update the existing buckets, insert the new ones
+    from sqlalchemy import and_
+
+    for row in rows:
+        key = and_(*(table.c[name] == row[name] for name in keys))
+        updated = session.execute(
+            table.update()
+            .where(key)
+            .values({name: table.c[name] + row[name] for name in sums})
+        )
+        if updated.rowcount == 0:
+            session.execute(table.insert().values(row))
+
+
+def percentile(histogram: Dict[int, int], total: int, q: float) -> float:
+    """
+    Returns:
+        float: The duration below which `q` percent of the executions of the
+        histogram finished, read from the middle of its bin.
+    """
+    rank = q / 100 * total
+    seen = 0
+    for bin in sorted(histogram):
+        seen += histogram[bin]
+        if seen >= rank:
+            return bin_duration(bin)
+    return bin_duration(max(histogram))
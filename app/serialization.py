@@ -0,0 +1,56 @@
+import datetime
+import json
+from typing import Any, Dict, Iterable, Iterator
+
+from werkzeug.http import http_date
+
+
+def execution_item(execution) -> Dict[str, Any]:
+    """
+    Returns:
+        Dict[str, Any]: An execution of get-last-executions, with the `cursor`
+        of the page that follows it.
+    """
+    timestamp = execution.timestamp
+    return {
+        "id": execution.id,
+        "result": execution.result,
+        "commands": execution.commands,
+        "duration": execution.duration,
+        "timestamp": http_date(timestamp) if timestamp is not None else None,
+        "cursor": (
+            f"{timestamp.isoformat()},{execution.id}" if timestamp is not None else None
+        ),
+    }
+
+
+def stream_json_array(items: Iterable[Any], chunk_size: int = 500) -> Iterator[str]:
+    """Yields the JSON array of `items` in chunks of `chunk_size` items."""
+    yield "["
+    chunk = []
+    separator = ""
+    for item in items:
+        chunk.append(json.dumps(item))
+        if len(chunk) == chunk_size:
+            yield separator + ",".join(chunk)
+            chunk, separator = [], ","
+    if chunk:
+        yield separator + ",".join(chunk)
+    yield "]"
+
+
+def dumps(data: Any) -> bytes:
+    """
+    Serializes `data` like Flask's `jsonify`: compact, sorted keys, a trailing
+    newline and datetimes as HTTP dates, so both front ends answer the same
+    bytes.
+    """
+    return (
+        json.dumps(data, default=_default, separators=(",", ":"), sort_keys=True) + "\n"
+    ).encode()
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, datetime.datetime):
+        return http_date(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
@@ -0,0 +1,186 @@
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+from app import get_db
+from app.asgi import create_asgi_app
+from app.main import app
+
+db = get_db()
+
+SQUARE = {
+    "start": {"x": 0, "y": 0},
+    "commmands": [
+        {"direction": "north", "steps": 2},
+        {"direction": "east", "steps": 2},
+        {"direction": "south", "steps": 2},
+        {"direction": "west", "steps": 2},
+    ],
+}
+
+
+def call(asgi_app, method, path, body=b"", query=b"", content_type=None):
+    """Sends one request to the ASGI application, in process."""
+    messages = [{"type": "http.request", "body": body, "more_body": False}]
+    sent = []
+
+    async def receive():
+        return messages.pop(0) if messages else {"type": "http.disconnect"}
+
+    async def send(message):
+        sent.append(message)
+
+    headers = []
+    if content_type is not None:
+        headers.append((b"content-type", content_type.encode()))
+    scope = {
+        "type": "http",
+        "method": method,
+        "path": path,
+        "query_string": query,
+        "headers": headers,
+    }
+    asyncio.run(asgi_app(scope, receive, send))
+    start, response_body = sent
+    return (
+        start["status"],
+        {name.decode(): value.decode() for name, value in start["headers"]},
+        response_body["body"],
+    )
+
+
+class TestASGI(unittest.TestCase):
+    def setUp(self):
+        """Point both front ends to a temporary SQLite database."""
+        handle, self.path = tempfile.mkstemp(suffix=".db")
+        os.close(handle)
+        uri = f"sqlite:///{self.path}"
+        self.asgi_app = create_asgi_app(uri)
+        db.Model.metadata.create_all(self.asgi_app.database.engine)
+        self.config = patch.dict(app.config, {"SQLALCHEMY_DATABASE_URI": uri})
+        self.config.start()
+        self.client = app.test_client()
+
+    def tearDown(self):
+        self.config.stop()
+        self.asgi_app.close()
+        with app.app_context():
+            db.engine.dispose()
+        os.remove(self.path)
+
+    def enter_path(self, data, content_type="application/json"):
+        return call(
+            self.asgi_app,
+            "POST",
+            "/robot-cleaning-service/enter-path",
+            json.dumps(data).encode(),
+            content_type=content_type,
+        )
+
+    def test_health(self):
+        status, headers, body = call(self.asgi_app, "GET", "/health")
+        self.assertEqual(status, 200)
+        self.assertEqual(headers["content-type"], "application/json")
+        self.assertEqual(body, self.client.get("/health").data)
+
+    def test_enter_path(self):
+        status, _, body = self.enter_path(SQUARE)
+        self.assertEqual(status, 201)
+        data = json.loads(body)
+        self.assertEqual(data["result"], 8)
+        self.assertEqual(data["commands"], 4)
+        self.assertIn("GMT", data["timestamp"])
+
+        flask_response = self.client.post(
+            "/robot-cleaning-service/enter-path", json=SQUARE
+        )
+        self.assertEqual(flask_response.status_code, 201)
+        self.assertEqual(sorted(data), sorted(flask_response.get_json()))
+        self.assertEqual(data["result"], flask_response.get_json()["result"])
+        self.assertEqual(data["engine"], flask_response.get_json()["engine"])
+
+    def test_errors_match_flask(self):
+        for data, content_type in [
+            ({"start": {"x": 0}, "commands": []}, "application/json"),
+            (SQUARE, "text/plain"),
+        ]:
+            status, _, body = self.enter_path(data, content_type)
+            flask_response = self.client.post(
+                "/robot-cleaning-service/enter-path",
+                data=json.dumps(data),
+                content_type=content_type,
+            )
+            self.assertEqual(status, 400)
+            self.assertEqual((status, body), (400, flask_response.data))
+
+        status, _, body = call(
+            self.asgi_app,
+            "POST",
+            "/robot-cleaning-service/enter-path",
+            b"{",
+            content_type="application/json",
+        )
+        self.assertEqual(
+            (status, json.loads(body)), (500, {"error": "Internal server error"})
+        )
+
+    def test_get_last_executions(self):
+        for _ in range(3):
+            self.enter_path(SQUARE)
+        status, _, body = call(
+            self.asgi_app,
+            "GET",
+            "/robot-cleaning-service/get-last-executions",
+            query=b"limit=2",
+        )
+        self.assertEqual(status, 200)
+        self.assertEqual(
+            body,
+            self.client.get(
+                "/robot-cleaning-service/get-last-executions",
+                query_string={"limit": 2},
+            ).data,
+        )
+        self.assertEqual(len(json.loads(body)), 2)
+
+        status, _, body = call(
+            self.asgi_app,
+            "GET",
+            "/robot-cleaning-service/get-last-executions",
+            query=b"limit=0",
+        )
+        self.assertEqual(status, 400)
+
+    def test_unknown_routes(self):
+        self.assertEqual(call(self.asgi_app, "GET", "/unknown")[0], 404)
+        self.assertEqual(
+            call(self.asgi_app, "GET", "/robot-cleaning-service/enter-path")[0], 405
+        )
+
+    def test_cache_header(self):
+        with patch.object(self.asgi_app, "result_cache", None):
+            _, headers, _ = self.enter_path(SQUARE)
+        self.assertNotIn("x-cache", headers)
+
+    def test_lifespan(self):
+        messages = [{"type": "lifespan.startup"}, {"type": "lifespan.shutdown"}]
+        sent = []
+
+        async def receive():
+            return messages.pop(0)
+
+        async def send(message):
+            sent.append(message["type"])
+
+        with patch.object(self.asgi_app, "close") as close:
+            asyncio.run(self.asgi_app({"type": "lifespan"}, receive, send))
+        close.assert_called_once()
+        self.assertEqual(
+            sent, ["lifespan.startup.complete", "lifespan.shutdown.complete"]
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,119 @@
+import unittest
+from app.engines import ENGINES
+from app.execute_commands_v2 import (
+    create_segment_stores,
+    merge_segment_store,
+    sweep_crossings,
+)
+from app.tests.performance_tests.benchmark import (
+    WORKLOADS,
+    cases,
+    compare,
+    measure,
+    summarize,
+)
+from app.tests.performance_tests.workloads import adversarial_grid, spiral_path
+
+
+def results(**medians):
+    return {
+        "benchmarks": [
+            {"name": name, "stats": summarize(durations)}
+            for name, durations in medians.items()
+        ]
+    }
+
+
+class TestWorkloads(unittest.TestCase):
+    def test_spiral(self):
+        self.assertEqual(
+            [(command["direction"], command["steps"]) for command in spiral_path(5)],
+            [("east", 1), ("north", 1), ("west", 2), ("south", 2), ("east", 3)],
+        )
+
+    def test_engines_agree(self):
+        for commands in [
+            spiral_path(50, 3),
+            adversarial_grid(7),
+            adversarial_grid(8, 3),
+        ]:
+            results = {
+                name: engine(commands, 0, 0)[0] for name, engine in ENGINES.items()
+            }
+            self.assertEqual(len(set(results.values())), 1, results)
+
+    def test_adversarial_grid(self):
+        horizontal, vertical = create_segment_stores(0, 0, adversarial_grid(10))
+        horizontal = merge_segment_store(horizontal)
+        vertical = merge_segment_store(vertical)
+        crossings = sweep_crossings(
+            vertical.constants,
+            vertical.starts,
+            vertical.ends,
+            horizontal.constants,
+            horizontal.starts,
+            horizontal.ends,
+        )
+        self.assertGreaterEqual(crossings, 10 * 10)
+
+
+class TestBenchmark(unittest.TestCase):
+    def test_summarize(self):
+        stats = summarize([5.0, 1.0, 3.0, 2.0, 4.0])
+        self.assertEqual(stats["median"], 3.0)
+        self.assertEqual((stats["q1"], stats["q3"], stats["iqr"]), (2.0, 4.0, 2.0))
+        self.assertEqual((stats["min"], stats["max"], stats["mean"]), (1.0, 5.0, 3.0))
+        self.assertEqual(stats["rounds"], 5)
+        self.assertEqual(summarize([1.0])["iqr"], 0)
+
+    def test_measure(self):
+        calls = []
+        durations = measure(
+            lambda: calls.append(None), warmup_rounds=2, rounds=3, min_round_time=0
+        )
+        self.assertEqual(len(durations), 3)
+        # the warm-up, the round that sets the number of calls, the rounds
+        self.assertEqual(len(calls), 6)
+
+    def test_cases(self):
+        names = [
+            case.name for case in cases(list(ENGINES), list(WORKLOADS), quick=True)
+        ]
+        self.assertIn("v2/spiral/100", names)
+        self.assertIn("bitmap/adversarial-grid/10", names)
+        self.assertEqual(len(names), len(set(names)))
+
+    def test_compare(self):
+        baseline = results(
+            **{
+                "v2/a/1": [1.0, 1.0, 1.0],
+                "v2/b/1": [1.0, 1.0, 1.0],
+                "v2/c/1": [1.0, 1.1, 2.0],
+                "v2/d/1": [1.0, 1.0, 1.0],
+            }
+        )
+        current = results(
+            **{
+                # slower and outside the noise
+                "v2/a/1": [1.5, 1.5, 1.5],
+                # slower, within the threshold
+                "v2/b/1": [1.05, 1.05, 1.05],
+                # slower, within the noise of the baseline
+                "v2/c/1": [1.2, 1.5, 1.8],
+                # faster
+                "v2/d/1": [0.5, 0.5, 0.5],
+                # not in the baseline
+                "v2/e/1": [9.0, 9.0, 9.0],
+            }
+        )
+        rows, regressions = compare(baseline, current, threshold=0.1)
+        self.assertEqual(regressions, ["v2/a/1"])
+        self.assertEqual(
+            [row["name"] for row in rows], ["v2/a/1", "v2/b/1", "v2/c/1", "v2/d/1"]
+        )
+        self.assertAlmostEqual(rows[0]["change"], 0.5)
+        self.assertAlmostEqual(rows[3]["change"], -0.5)
+
+
+if __name__ == "__main__":
+    unittest.main()
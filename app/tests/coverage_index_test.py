@@ -0,0 +1,225 @@
+import random
+import unittest
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+from flask import json
+
+from app.coverage_index import ActiveCounters, CoverageIndex, SWEEP_MIN_RECTANGLES
+from app.execute_commands_v1 import visited_cells
+from app.execution_backend import BackendBusyError
+from app.main import app
+from app.validation import InvalidInputError, parse_coverage_queries
+
+DIRECTIONS = ["north", "south", "east", "west"]
+
+
+def random_path(rng):
+    commands = [
+        {"direction": rng.choice(DIRECTIONS), "steps": rng.randint(0, 6)}
+        for _ in range(rng.randint(0, 12))
+    ]
+    return commands, rng.randint(-5, 5), rng.randint(-5, 5)
+
+
+class TestCoverageIndex(unittest.TestCase):
+    def test_matches_the_visited_points(self):
+        rng = random.Random(0)
+        for _ in range(300):
+            commands, x, y = random_path(rng)
+            points = visited_cells(commands, x, y)
+            index = CoverageIndex.from_commands(commands, x, y)
+            self.assertEqual(len(index), len(points))
+
+            xs = [rng.randint(-15, 15) for _ in range(50)]
+            ys = [rng.randint(-15, 15) for _ in range(50)]
+            self.assertEqual(
+                index.contains(xs, ys).tolist(),
+                [point in points for point in zip(xs, ys)],
+            )
+            for _ in range(10):
+                x1, y1, x2, y2 = (rng.randint(-15, 15) for _ in range(4))
+                expected = sum(
+                    min(x1, x2) <= px <= max(x1, x2)
+                    and min(y1, y2) <= py <= max(y1, y2)
+                    for px, py in points
+                )
+                self.assertEqual(index.count(x1, y1, x2, y2), expected)
+
+    def test_crossings_are_counted_once(self):
+        commands = [
+            {"direction": "east", "steps": 4},
+            {"direction": "north", "steps": 2},
+            {"direction": "west", "steps": 2},
+            {"direction": "south", "steps": 4},
+        ]
+        index = CoverageIndex.from_commands(commands, 0, 0)
+        self.assertEqual(len(index), 12)
+        self.assertEqual(index.count(0, 0, 4, 0), 5)
+        self.assertEqual(index.count(2, -2, 2, 2), 5)
+        self.assertEqual(index.count(-10, -10, 10, 10), 12)
+        self.assertEqual(index.count(5, 5, 6, 6), 0)
+
+    def test_path_without_moves(self):
+        index = CoverageIndex.from_commands([], 3, 4)
+        self.assertEqual(len(index), 1)
+        self.assertEqual(index.contains([3, 3], [4, 5]).tolist(), [True, False])
+
+    def test_coordinates_too_far_apart_for_a_combined_key(self):
+        far = 2**33
+        commands = [
+            {"direction": "east", "steps": far},
+            {"direction": "north", "steps": far},
+            {"direction": "east", "steps": 1},
+        ]
+        index = CoverageIndex.from_commands(commands, 0, 0)
+        self.assertEqual(
+            index.contains([5, 5, far, far + 1, far + 2], [0, 1, 5, far, far]).tolist(),
+            [True, False, True, True, False],
+        )
+        self.assertEqual(index.count(far - 1, far - 1, far + 1, far + 1), 3)
+        self.assertEqual(
+            index.count_rectangles(
+                [[far - 1, far - 1, far + 1, far + 1]] * SWEEP_MIN_RECTANGLES
+            ).tolist(),
+            [3] * SWEEP_MIN_RECTANGLES,
+        )
+
+    def test_count_rectangles(self):
+        rng = random.Random(1)
+        for _ in range(200):
+            commands, x, y = random_path(rng)
+            points = visited_cells(commands, x, y)
+            index = CoverageIndex.from_commands(commands, x, y)
+            corners = [
+                [rng.randint(-15, 15) for _ in range(4)]
+                for _ in range(rng.choice([3, 2 * SWEEP_MIN_RECTANGLES]))
+            ]
+            corners.append([2**63 - 1, -(2**63), -(2**63), 2**63 - 1])
+            expected = [
+                sum(
+                    min(x1, x2) <= px <= max(x1, x2)
+                    and min(y1, y2) <= py <= max(y1, y2)
+                    for px, py in points
+                )
+                for x1, y1, x2, y2 in corners
+            ]
+            self.assertEqual(index.count_rectangles(corners).tolist(), expected)
+        self.assertEqual(index.count_rectangles(np.empty((0, 4))).tolist(), [])
+
+
+class TestActiveCounters(unittest.TestCase):
+    def test_matches_brute_force(self):
+        rng = random.Random(0)
+        for size in (1, 2, 7, 16, 33):
+            counters = ActiveCounters(size)
+            active, values = [0] * size, [0] * size
+            for _ in range(300):
+                first = rng.randint(0, size)
+                last = rng.randint(first, size)
+                operation = rng.random()
+                if operation < 0.3:
+                    leaf = rng.randrange(size)
+                    active[leaf] = 1 - active[leaf]
+                    counters.set_active(leaf, active[leaf])
+                elif operation < 0.6:
+                    counters.add(first, last)
+                    for leaf in range(first, last):
+                        values[leaf] += active[leaf]
+                else:
+                    self.assertEqual(counters.sum(first, last), sum(values[first:last]))
+
+
+class TestParseCoverageQueries(unittest.TestCase):
+    path = {"start": {"x": 0, "y": 0}, "commmands": []}
+
+    def test_queries(self):
+        path, points, rectangles = parse_coverage_queries(
+            {**self.path, "points": [[1, 2], [3.0, -4]], "rectangles": [[0, 0, 1, 1]]}
+        )
+        self.assertEqual((path.x, path.y), (0, 0))
+        self.assertEqual(points.tolist(), [[1, 2], [3, -4]])
+        self.assertEqual(points.dtype, np.int64)
+        self.assertEqual(rectangles.shape, (1, 4))
+
+        _, points, rectangles = parse_coverage_queries(self.path)
+        self.assertEqual((points.shape, rectangles.shape), ((0, 2), (0, 4)))
+
+    def test_invalid(self):
+        for queries, message in [
+            ({"points": [[1, 2, 3]]}, "[1, 2, 3] is too long"),
+            ({"points": [[1, 2], [1]]}, "[1] is too short"),
+            ({"points": [[1, 2.5]]}, "2.5 is not of type 'integer'"),
+            ({"points": [[1, "2"]]}, "'2' is not of type 'integer'"),
+            ({"rectangles": {}}, "{} is not of type 'array'"),
+        ]:
+            with self.assertRaises(InvalidInputError) as context:
+                parse_coverage_queries({**self.path, **queries})
+            self.assertEqual(context.exception.errors, [message])
+
+        with self.assertRaises(InvalidInputError) as context:
+            parse_coverage_queries({"points": [[1, 2]]})
+        self.assertEqual(context.exception.errors, ["'start' is a required property"])
+
+
+class TestCoverageQueriesEndpoint(unittest.TestCase):
+    def setUp(self):
+        self.client = app.test_client()
+
+    def post(self, data):
+        return self.client.post(
+            "/robot-cleaning-service/coverage-queries",
+            data=json.dumps(data),
+            content_type="application/json",
+        )
+
+    def test_coverage_queries(self):
+        response = self.post(
+            {
+                "start": {"x": 0, "y": 0},
+                "commmands": [
+                    {"direction": "east", "steps": 4},
+                    {"direction": "north", "steps": 2},
+                ],
+                "points": [[0, 0], [4, 1], [1, 1]],
+                "rectangles": [[0, 0, 4, 0], [3, 0, 4, 2]],
+            }
+        )
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.data)
+        self.assertEqual(data["result"], 7)
+        self.assertEqual(data["visited"], [True, True, False])
+        self.assertEqual(data["counts"], [5, 4])
+        self.assertEqual(data["commands"], 2)
+        self.assertIn("duration", data)
+
+    def test_invalid_queries(self):
+        response = self.post(
+            {"start": {"x": 0, "y": 0}, "commmands": [], "points": [[0]]}
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_rectangles_size_the_execution(self):
+        backend = MagicMock()
+        backend.run.return_value = (1, np.zeros(0, dtype=bool), [1, 1], 0.0)
+        with patch("app.main.execution_backend", backend):
+            response = self.post(
+                {
+                    "start": {"x": 0, "y": 0},
+                    "commmands": [{"direction": "east", "steps": 1}],
+                    "rectangles": [[0, 0, 1, 1], [0, 0, 2, 2]],
+                }
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(backend.run.call_args.kwargs["size"], 3)
+
+    def test_busy(self):
+        backend = MagicMock()
+        backend.run.side_effect = BackendBusyError("Execution queue is full")
+        with patch("app.main.execution_backend", backend):
+            response = self.post({"start": {"x": 0, "y": 0}, "commmands": []})
+        self.assertEqual(response.status_code, 503)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,198 @@
+import os
+import sqlite3
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+from sqlalchemy import exc
+from sqlalchemy.engine.url import make_url
+from sqlalchemy.pool import NullPool, StaticPool
+from app import get_db
+from app.db_pool import (
+    InstrumentedQueuePool,
+    create_engine_options,
+    dialect_engine_options,
+    pool_metrics,
+    pool_samples,
+)
+from app.main import app
+
+db = get_db()
+
+
+class TestEngineOptions(unittest.TestCase):
+    def test_defaults(self):
+        with patch.dict(os.environ, {}, clear=True):
+            options = create_engine_options()
+        self.assertEqual(
+            options,
+            {
+                "pool_recycle": 1800,
+                "pool_pre_ping": True,
+                "poolclass": InstrumentedQueuePool,
+                "pool_size": 10,
+                "max_overflow": 20,
+                "pool_timeout": 30.0,
+            },
+        )
+
+    def test_environment(self):
+        environment = {
+            "DATABASE_POOL_SIZE": "4",
+            "DATABASE_MAX_OVERFLOW": "2",
+            "DATABASE_POOL_TIMEOUT": "1.5",
+            "DATABASE_POOL_RECYCLE": "-1",
+            "DATABASE_POOL_PRE_PING": "0",
+            "DATABASE_STATEMENT_TIMEOUT": "5000",
+        }
+        with patch.dict(os.environ, environment, clear=True):
+            options = create_engine_options()
+        self.assertEqual(options["pool_size"], 4)
+        self.assertEqual(options["max_overflow"], 2)
+        self.assertEqual(options["pool_timeout"], 1.5)
+        self.assertEqual(options["pool_recycle"], -1)
+        self.assertFalse(options["pool_pre_ping"])
+        self.assertEqual(
+            options["connect_args"], {"options": "-c statement_timeout=5000"}
+        )
+
+    def test_pooling_disabled(self):
+        with patch.dict(os.environ, {"DATABASE_POOL_SIZE": "0"}, clear=True):
+            options = create_engine_options()
+        self.assertIs(options["poolclass"], NullPool)
+        self.assertNotIn("pool_size", options)
+
+    def test_postgresql_keeps_statement_timeout(self):
+        with patch.dict(os.environ, {"DATABASE_STATEMENT_TIMEOUT": "100"}):
+            options = create_engine_options()
+        adapted = dialect_engine_options(
+            make_url("postgresql://user:password@db:5432/robot_service"), options
+        )
+        self.assertEqual(adapted, options)
+
+    def test_sqlite_file(self):
+        with patch.dict(os.environ, {"DATABASE_STATEMENT_TIMEOUT": "100"}):
+            options = create_engine_options()
+        adapted = dialect_engine_options(make_url("sqlite:////tmp/test.db"), options)
+        self.assertIs(adapted["poolclass"], InstrumentedQueuePool)
+        self.assertEqual(adapted["connect_args"], {"check_same_thread": False})
+        self.assertIn("options", options["connect_args"])
+
+    def test_sqlite_in_memory(self):
+        adapted = dialect_engine_options(make_url("sqlite://"), create_engine_options())
+        self.assertIs(adapted["poolclass"], StaticPool)
+        for name in ("pool_size", "max_overflow", "pool_timeout"):
+            self.assertNotIn(name, adapted)
+
+
+class TestInstrumentedQueuePool(unittest.TestCase):
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp(suffix=".db")
+        os.close(handle)
+        self.pool = InstrumentedQueuePool(
+            lambda: sqlite3.connect(self.path, check_same_thread=False),
+            pool_size=1,
+            max_overflow=1,
+            timeout=0.05,
+        )
+
+    def tearDown(self):
+        self.pool.dispose()
+        os.remove(self.path)
+
+    def test_counts_checkouts(self):
+        first = self.pool.connect()
+        second = self.pool.connect()
+        metrics = pool_metrics(self.pool)
+        self.assertEqual(metrics["checked_out"], 2)
+        self.assertEqual(metrics["overflow"], 1)
+        self.assertEqual(metrics["peak_checked_out"], 2)
+        first.close()
+        second.close()
+
+        metrics = pool_metrics(self.pool)
+        self.assertEqual(metrics["pool"], "InstrumentedQueuePool")
+        self.assertEqual(metrics["checked_out"], 0)
+        self.assertEqual(metrics["checked_in"], 1)
+        self.assertEqual(metrics["checkouts"], 2)
+        self.assertEqual(metrics["timeouts"], 0)
+        self.assertGreater(metrics["wait_seconds_total"], 0)
+        self.assertLessEqual(metrics["wait_seconds_max"], metrics["wait_seconds_total"])
+
+    def test_counts_timeouts(self):
+        connections = [self.pool.connect(), self.pool.connect()]
+        with self.assertRaises(exc.TimeoutError):
+            self.pool.connect()
+        metrics = pool_metrics(self.pool)
+        self.assertEqual(metrics["timeouts"], 1)
+        self.assertGreaterEqual(metrics["wait_seconds_max"], 0.05)
+        for connection in connections:
+            connection.close()
+
+    def test_waits_for_a_returned_connection(self):
+        connections = [self.pool.connect(), self.pool.connect()]
+        release = threading.Timer(0.01, connections[0].close)
+        release.start()
+        self.pool._timeout = 5
+        connection = self.pool.connect()
+        release.join()
+        self.assertGreaterEqual(pool_metrics(self.pool)["wait_seconds_max"], 0.01)
+        connection.close()
+        connections[1].close()
+
+    def test_other_pools(self):
+        self.assertEqual(pool_metrics(StaticPool(lambda: None)), {"pool": "StaticPool"})
+        self.assertEqual(pool_samples(StaticPool(lambda: None)), [])
+
+    def test_samples(self):
+        self.pool.connect().close()
+        samples = {name: value for name, _, _, value in pool_samples(self.pool)}
+        self.assertEqual(samples["robot_db_pool_size"], 1)
+        self.assertEqual(samples["robot_db_pool_checked_out"], 0)
+        self.assertEqual(samples["robot_db_pool_peak_checked_out"], 1)
+
+
+class TestPoolMetricsEndpoint(unittest.TestCase):
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp(suffix=".db")
+        os.close(handle)
+        self.config = patch.dict(
+            app.config, {"SQLALCHEMY_DATABASE_URI": f"sqlite:///{self.path}"}
+        )
+        self.config.start()
+        self.client = app.test_client()
+        with app.app_context():
+            db.create_all()
+
+    def tearDown(self):
+        with app.app_context():
+            db.engine.dispose()
+        self.config.stop()
+        os.remove(self.path)
+
+    def test_pool_metrics(self):
+        self.assertEqual(
+            self.client.get("/robot-cleaning-service/get-last-executions").status_code,
+            200,
+        )
+        response = self.client.get("/metrics")
+        self.assertEqual(response.status_code, 200)
+        body = response.get_data(as_text=True)
+        self.assertIn("# TYPE robot_db_pool_checkout_seconds histogram", body)
+        self.assertIn("robot_db_pool_size 10\n", body)
+        self.assertIn("robot_db_pool_checked_out 0\n", body)
+        checkouts = [
+            line
+            for line in body.splitlines()
+            if line.startswith(
+                'robot_db_pool_checkout_seconds_count{outcome="checkout"}'
+            )
+        ]
+        self.assertGreaterEqual(int(checkouts[0].split()[-1]), 1)
+        self.assertEqual(
+            self.client.get("/robot-cleaning-service/pool-metrics").status_code, 404
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
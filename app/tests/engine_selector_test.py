@@ -0,0 +1,67 @@
+import unittest
+from app.engine_selector import EngineSelector, PathFeatures
+from app.execute_commands_numpy import MAX_ARRAY_STEPS
+
+COSTS = {
+    "v1": {"per_step": 1e-6},
+    "v2": {"per_command": 4e-6},
+    "numpy": {"fixed": 4e-4, "per_command": 5e-7},
+}
+
+
+class TestPathFeatures(unittest.TestCase):
+    def test_from_commands(self):
+        features = PathFeatures.from_commands(
+            [{"direction": "north", "steps": 3}, {"direction": "east", "steps": 5}]
+        )
+        self.assertEqual(features, PathFeatures(2, 8, 4.0))
+        self.assertEqual(PathFeatures.from_commands([]), PathFeatures(0, 0, 0.0))
+
+
+class TestEngineSelector(unittest.TestCase):
+    def test_selects_lowest_predicted_cost(self):
+        selector = EngineSelector(COSTS, v1_max_steps=10**9)
+        short_steps = [{"direction": "north", "steps": 1}] * 10
+        long_steps = [{"direction": "north", "steps": 100000}] * 10
+        many_commands = [{"direction": "north", "steps": 100000}] * 10000
+
+        self.assertEqual(selector.select(short_steps), "v1")
+        self.assertEqual(selector.select(long_steps), "v2")
+        self.assertEqual(selector.select(many_commands), "numpy")
+
+    def test_refuses_v1_over_memory_budget(self):
+        selector = EngineSelector({"v1": {"per_step": 0.0}, "v2": COSTS["v2"]}, 100)
+        self.assertEqual(selector.select([{"direction": "north", "steps": 100}]), "v1")
+        self.assertEqual(selector.select([{"direction": "north", "steps": 101}]), "v2")
+
+        fixed = EngineSelector(COSTS, v1_max_steps=100, engine="v1")
+        self.assertEqual(fixed.select([{"direction": "north", "steps": 101}]), "v2")
+
+    def test_refuses_array_engines_beyond_int64(self):
+        selector = EngineSelector(COSTS, v1_max_steps=100)
+        many_commands = [{"direction": "north", "steps": 1}] * 10000
+        self.assertEqual(selector.select(many_commands), "numpy")
+        huge_steps = many_commands + [{"direction": "north", "steps": MAX_ARRAY_STEPS}]
+        self.assertEqual(selector.select(huge_steps), "v2")
+
+        fixed = EngineSelector(COSTS, v1_max_steps=10**9, engine="numpy")
+        self.assertEqual(fixed.select(huge_steps), "v2")
+
+    def test_fixed_engine(self):
+        selector = EngineSelector(COSTS, v1_max_steps=10**9, engine="numpy")
+        self.assertEqual(selector.select([{"direction": "north", "steps": 1}]), "numpy")
+
+    def test_unknown_engine(self):
+        with self.assertRaises(ValueError):
+            EngineSelector({"v3": {}}, v1_max_steps=0)
+        with self.assertRaises(ValueError):
+            EngineSelector(COSTS, v1_max_steps=0, engine="v3")
+
+    def test_bundled_config(self):
+        selector = EngineSelector.from_config()
+        self.assertEqual(set(selector.costs), {"v1", "v2", "numpy"})
+        self.assertGreater(selector.v1_max_steps, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
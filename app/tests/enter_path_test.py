@@ -1,7 +1,10 @@
 import unittest
 from unittest.mock import patch, MagicMock
 from app.main import app
-from app.execute_commands_v2 import execute_commands_v2
+from app.engine_selector import EngineSelector
+from app.execution_backend import BackendBusyError
+from app.result_cache import ResultCache
+from app.wire_format import CONTENT_TYPE, encode_path
 from flask import json
 
 
@@ -24,8 +27,23 @@ class TestEnterPathEndpoint(unittest.TestCase):
         data = json.loads(response.data)
         self.assertIn("error", data)
 
-    @patch("app.main.execute_commands_v2", side_effect=MemoryError)
-    def test_enter_path_memory_error(self, mock_execute_commands):
+    def test_enter_path_steps_beyond_the_array_engines(self):
+        payload = {
+            "start": {"x": 0, "y": 0},
+            "commmands": [{"direction": "north", "steps": 2**64}],
+        }
+        response = self.app.post(
+            "/robot-cleaning-service/enter-path",
+            data=json.dumps(payload),
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 400)
+
+    @patch.dict(
+        "app.engines.ENGINES",
+        {name: MagicMock(side_effect=MemoryError) for name in ("v1", "v2", "numpy")},
+    )
+    def test_enter_path_memory_error(self):
         payload = {
             "start": {"x": 0, "y": 0},
             "commmands": [{"direction": "north", "steps": 1}],
@@ -40,7 +58,25 @@ class TestEnterPathEndpoint(unittest.TestCase):
         self.assertIn("error", data)
         self.assertEqual(data["error"], "Internal server error")
 
-    @patch("app.main.db.session.add", side_effect=Exception("DB error"))
+    @patch("app.main.execution_backend.run", side_effect=BackendBusyError)
+    def test_enter_path_backend_busy(self, mock_run):
+        payload = {
+            "start": {"x": 0, "y": 0},
+            "commmands": [{"direction": "north", "steps": 1}],
+        }
+        response = self.app.post(
+            "/robot-cleaning-service/enter-path",
+            data=json.dumps(payload),
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 503)
+        data = json.loads(response.data)
+        self.assertIn("error", data)
+
+    @patch(
+        "app.db_queries.ExecutionQueryService.add_execution",
+        side_effect=Exception("DB error"),
+    )
     def test_enter_path_db_error(self, mock_db):
         payload = {
             "start": {"x": 0, "y": 0},
@@ -57,8 +93,7 @@ class TestEnterPathEndpoint(unittest.TestCase):
         self.assertEqual(data["error"], "Internal server error")
 
     @patch("app.db_queries.ExecutionQueryService.add_execution")
-    @patch("app.main.db")
-    def test_enter_path_empty_commands(self, _, mock_execution):
+    def test_enter_path_empty_commands(self, mock_execution):
         mock_execution.return_value = MagicMock(timestamp="2023-01-01T00:00:00Z")
         payload = {"start": {"x": 0, "y": 0}, "commmands": []}
         response = self.app.post(
@@ -71,8 +106,7 @@ class TestEnterPathEndpoint(unittest.TestCase):
         self.assertEqual(data["result"], 1)  # Only the start position
 
     @patch("app.db_queries.ExecutionQueryService.add_execution")
-    @patch("app.main.db")
-    def test_enter_path_successful(self, _, mock_execution):
+    def test_enter_path_successful(self, mock_execution):
         mock_execution.return_value = MagicMock(timestamp="2023-01-01T00:00:00Z")
         payload = {
             "start": {"x": 0, "y": 0},
@@ -90,6 +124,119 @@ class TestEnterPathEndpoint(unittest.TestCase):
         data = json.loads(response.data)
         self.assertIn("result", data)
         self.assertEqual(data["result"], 3)
+        self.assertIn(data["engine"], ("v1", "v2", "numpy"))
+
+    @patch("app.db_queries.ExecutionQueryService.add_execution")
+    def test_enter_path_fixed_engine(self, mock_execution):
+        mock_execution.return_value = MagicMock(timestamp="2023-01-01T00:00:00Z")
+        payload = {
+            "start": {"x": 0, "y": 0},
+            "commmands": [{"direction": "north", "steps": 100000}] * 100,
+        }
+        selector = EngineSelector.from_config(engine="v1")
+        selector.v1_max_steps = 1000
+        with patch("app.main.engine_selector", selector):
+            response = self.app.post(
+                "/robot-cleaning-service/enter-path",
+                data=json.dumps(payload),
+                content_type="application/json",
+            )
+        self.assertEqual(response.status_code, 201)
+        data = json.loads(response.data)
+        self.assertEqual(data["result"], 10000001)
+        self.assertEqual(data["engine"], "v2")
+
+    @patch("app.db_queries.ExecutionQueryService.add_execution")
+    def test_enter_path_cache(self, mock_execution):
+        mock_execution.return_value = MagicMock(timestamp="2023-01-01T00:00:00Z")
+        first = {
+            "start": {"x": 0, "y": 0},
+            "commmands": [
+                {"direction": "north", "steps": 1},
+                {"direction": "north", "steps": 1},
+                {"direction": "east", "steps": 1},
+            ],
+        }
+        translated = {
+            "start": {"x": 5, "y": -3},
+            "commmands": [
+                {"direction": "north", "steps": 2},
+                {"direction": "east", "steps": 0},
+                {"direction": "east", "steps": 1},
+            ],
+        }
+        with patch("app.main.result_cache", ResultCache(max_entries=10)):
+            response = self.app.post(
+                "/robot-cleaning-service/enter-path",
+                data=json.dumps(first),
+                content_type="application/json",
+            )
+            self.assertEqual(response.status_code, 201)
+            self.assertEqual(response.headers["X-Cache"], "MISS")
+            self.assertEqual(json.loads(response.data)["result"], 4)
+
+            with patch("app.main.engine_selector") as mock_selector:
+                response = self.app.post(
+                    "/robot-cleaning-service/enter-path",
+                    data=json.dumps(translated),
+                    content_type="application/json",
+                )
+                mock_selector.select.assert_not_called()
+            self.assertEqual(response.status_code, 201)
+            self.assertEqual(response.headers["X-Cache"], "HIT")
+            self.assertEqual(json.loads(response.data)["result"], 4)
+
+    @patch("app.db_queries.ExecutionQueryService.add_execution")
+    def test_enter_path_width(self, mock_execution):
+        mock_execution.return_value = MagicMock(timestamp="2023-01-01T00:00:00Z")
+        payload = {
+            "start": {"x": 0, "y": 0},
+            "commmands": [{"direction": "east", "steps": 9}],
+        }
+        with patch("app.main.result_cache", ResultCache(max_entries=10)):
+            # a width of 1 keeps the engine of the selector
+            for width, result, cache, footprint in [
+                (1, 10, "MISS", False),
+                (3, 36, "MISS", True),
+                (3, 36, "HIT", False),
+            ]:
+                response = self.app.post(
+                    "/robot-cleaning-service/enter-path",
+                    data=json.dumps({**payload, "width": width}),
+                    content_type="application/json",
+                )
+                self.assertEqual(response.status_code, 201)
+                data = json.loads(response.data)
+                self.assertEqual(data["result"], result)
+                self.assertEqual(data["engine"] == "footprint", footprint)
+                self.assertEqual(response.headers["X-Cache"], cache)
+
+    @patch("app.db_queries.ExecutionQueryService.add_execution")
+    def test_enter_path_binary(self, mock_execution):
+        mock_execution.return_value = MagicMock(timestamp="2023-01-01T00:00:00Z")
+        commands = [
+            {"direction": "east", "steps": 2},
+            {"direction": "north", "steps": 1},
+        ]
+        response = self.app.post(
+            "/robot-cleaning-service/enter-path",
+            data=encode_path(10, 22, commands),
+            content_type=CONTENT_TYPE,
+        )
+        self.assertEqual(response.status_code, 201)
+        data = json.loads(response.data)
+        self.assertEqual(data["result"], 4)
+        self.assertEqual(data["commands"], 2)
+        self.assertEqual(data["engine"], "numpy")
+
+    def test_enter_path_binary_invalid_input(self):
+        response = self.app.post(
+            "/robot-cleaning-service/enter-path",
+            data=b"\x00" * 9,
+            content_type=CONTENT_TYPE,
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("error", json.loads(response.data))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,102 @@
+import datetime
+import unittest
+from unittest.mock import patch, MagicMock
+from app.main import app
+from app.execution_backend import BackendBusyError
+from flask import json
+
+
+def stored_rows(executions, archives=None):
+    timestamp = datetime.datetime(2023, 1, 1)
+    return [
+        {
+            "timestamp": timestamp,
+            "commands": commands,
+            "result": result,
+            "duration": duration,
+        }
+        for commands, result, duration in executions
+    ]
+
+
+@patch("app.db_queries.ExecutionQueryService.add_executions", side_effect=stored_rows)
+class TestEnterPathsEndpoint(unittest.TestCase):
+    def setUp(self):
+        self.app = app.test_client()
+        self.app.testing = True
+
+    def post(self, payload):
+        return self.app.post(
+            "/robot-cleaning-service/enter-paths",
+            data=json.dumps(payload),
+            content_type="application/json",
+        )
+
+    def test_enter_paths_successful(self, mock_add):
+        payload = [
+            {"start": {"x": 0, "y": 0}, "commmands": []},
+            {
+                "start": {"x": 10, "y": 22},
+                "commmands": [
+                    {"direction": "east", "steps": 2},
+                    {"direction": "north", "steps": 1},
+                ],
+            },
+        ]
+        response = self.post(payload)
+        self.assertEqual(response.status_code, 201)
+        results = json.loads(response.data)["results"]
+        self.assertEqual([item["result"] for item in results], [1, 4])
+        self.assertEqual([item["commands"] for item in results], [0, 2])
+        self.assertEqual([item["status"] for item in results], [201, 201])
+        mock_add.assert_called_once()
+
+    def test_enter_paths_invalid_job(self, mock_add):
+        payload = [
+            {"start": {"x": 0, "y": 0}, "commmands": [{"direction": "up", "steps": 1}]},
+            {
+                "start": {"x": 0, "y": 0},
+                "commmands": [{"direction": "north", "steps": 1}],
+            },
+            {"commmands": []},
+        ]
+        response = self.post(payload)
+        self.assertEqual(response.status_code, 201)
+        results = json.loads(response.data)["results"]
+        self.assertEqual([item["status"] for item in results], [400, 201, 400])
+        self.assertIn("error", results[0])
+        self.assertEqual(results[1]["result"], 2)
+        self.assertEqual(len(mock_add.call_args[0][0]), 1)
+
+    def test_enter_paths_invalid_batch(self, mock_add):
+        for payload in ({"start": {"x": 0, "y": 0}, "commmands": []}, [{}] * 1001):
+            response = self.post(payload)
+            self.assertEqual(response.status_code, 400)
+            self.assertIn("error", json.loads(response.data))
+        mock_add.assert_not_called()
+
+    @patch.dict(
+        "app.engines.ENGINES",
+        {name: MagicMock(side_effect=MemoryError) for name in ("v1", "v2", "numpy")},
+    )
+    def test_enter_paths_job_error(self, mock_add):
+        payload = [
+            {
+                "start": {"x": 0, "y": 0},
+                "commmands": [{"direction": "north", "steps": 1}],
+            }
+        ]
+        response = self.post(payload)
+        self.assertEqual(response.status_code, 201)
+        results = json.loads(response.data)["results"]
+        self.assertEqual(results[0], {"status": 500, "error": "Internal server error"})
+
+    @patch("app.main.execution_backend.run_many", side_effect=BackendBusyError)
+    def test_enter_paths_backend_busy(self, mock_run, mock_add):
+        payload = [{"start": {"x": 0, "y": 0}, "commmands": []}]
+        response = self.post(payload)
+        self.assertEqual(response.status_code, 503)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,106 @@
+import random
+import unittest
+import numpy as np
+from app.execute_commands_v1 import execute_commands_v1
+from app.execute_commands_numpy import execute_commands_numpy
+from app.execute_commands_bitmap import (
+    SPAN_BYTES,
+    TiledBitmap,
+    bounding_box,
+    execute_commands_bitmap,
+)
+from app.tests.performance_tests.workloads import random_walk
+
+
+class TestExecuteCommandsBitmap(unittest.TestCase):
+    def test_bounding_box(self):
+        commands = [
+            {"direction": "north", "steps": 2},
+            {"direction": "west", "steps": 5},
+            {"direction": "south", "steps": 4},
+            {"direction": "east", "steps": 1},
+        ]
+        self.assertEqual(bounding_box(commands, 10, 22), (5, 20, 10, 24))
+
+    def test_execute_commands_no_steps(self):
+        result, duration = execute_commands_bitmap(
+            [{"direction": "north", "steps": 0}], 0, 0
+        )
+        self.assertEqual(result, 1)
+        self.assertIsNotNone(duration)
+        self.assertEqual(execute_commands_bitmap([], 3, 3)[0], 1)
+
+    def test_execute_commands_teeth(self):
+        commands = [
+            {"direction": "east", "steps": 2},
+            {"direction": "north", "steps": 4},
+            {"direction": "east", "steps": 2},
+            {"direction": "south", "steps": 4},
+            {"direction": "east", "steps": 2},
+            {"direction": "north", "steps": 2},
+            {"direction": "west", "steps": 8},
+        ]
+        self.assertEqual(execute_commands_bitmap(commands, 0, 0)[0], 23)
+
+    def test_matches_v1_dense_and_tiled(self):
+        rng = random.Random(9)
+        directions = ["north", "south", "east", "west"]
+        for _ in range(100):
+            commands = [
+                {"direction": rng.choice(directions), "steps": rng.randint(0, 600)}
+                for _ in range(rng.randint(0, 20))
+            ]
+            x, y = rng.randint(-300, 300), rng.randint(-300, 300)
+            expected = execute_commands_v1(commands, x, y)[0]
+            self.assertEqual(execute_commands_bitmap(commands, x, y)[0], expected)
+            self.assertEqual(
+                execute_commands_bitmap(
+                    commands, x, y, memory_budget=2**16, tile_size=8
+                )[0],
+                expected,
+            )
+
+    def test_tiled_bitmap_memory_budget(self):
+        bitmap = TiledBitmap(memory_budget=2 * SPAN_BYTES, tile_size=16)
+        bitmap.mark_horizontal(0, -16, 15)
+        self.assertEqual(bitmap.count(), 32)
+        with self.assertRaises(MemoryError):
+            bitmap.mark_vertical(0, 0, 16)
+
+    def test_tiled_bitmap_dense_tiles(self):
+        bitmap = TiledBitmap(memory_budget=2**20, tile_size=4)
+        # the lines of a tile are kept until more lines than its side cross it
+        for row in range(3):
+            bitmap.mark_horizontal(row, 0, 2)
+        self.assertIsInstance(bitmap.tiles[(0, 0)], tuple)
+        bitmap.mark_vertical(3, 0, 3)
+        bitmap.mark_vertical(0, 0, 3)
+        self.assertIsInstance(bitmap.tiles[(0, 0)], np.ndarray)
+        bitmap.mark_horizontal(3, 0, 5)
+        self.assertEqual(bitmap.count(), 18)
+
+    def test_millions_of_steps(self):
+        commands = []
+        for _ in range(100):
+            commands.extend(
+                [
+                    {"direction": "north", "steps": 100000},
+                    {"direction": "east", "steps": 1},
+                    {"direction": "south", "steps": 100000},
+                    {"direction": "east", "steps": 1},
+                ]
+            )
+        result, _ = execute_commands_bitmap(commands, 0, 0)
+        self.assertEqual(result, 200 * 100001 + 1)
+
+    def test_millions_of_steps_sparse(self):
+        # long lines scattered far beyond the dense bitmap's budget
+        commands = random_walk(1000, 20000, seed=2)
+        self.assertEqual(
+            execute_commands_bitmap(commands, 0, 0)[0],
+            execute_commands_numpy(commands, 0, 0)[0],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
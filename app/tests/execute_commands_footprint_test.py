@@ -0,0 +1,102 @@
+import random
+import unittest
+
+import numpy as np
+
+from app.execute_commands_footprint import (
+    execute_commands_footprint,
+    footprint_offsets,
+    union_area,
+)
+from app.execute_commands_numpy import execute_commands_numpy
+from app.execute_commands_v1 import visited_cells
+from app.tests.performance_tests.workloads import (
+    adversarial_grid,
+    random_walk,
+    realistic_path,
+)
+
+DIRECTIONS = ["north", "south", "east", "west"]
+
+
+def brush_cells(commands, x, y, width):
+    before, after = footprint_offsets(width)
+    return {
+        (px + i, py + j)
+        for px, py in visited_cells(commands, x, y)
+        for i in range(-before, after + 1)
+        for j in range(-before, after + 1)
+    }
+
+
+def rectangles(*boxes):
+    return tuple(np.array(values, dtype=np.int64) for values in zip(*boxes))
+
+
+class TestUnionArea(unittest.TestCase):
+    def test_union_area(self):
+        self.assertEqual(union_area(rectangles((0, 2, 0, 3))), 6)
+        # overlapping, nested and touching rectangles
+        self.assertEqual(union_area(rectangles((0, 4, 0, 4), (2, 6, 2, 6))), 28)
+        self.assertEqual(union_area(rectangles((0, 4, 0, 4), (1, 2, 1, 2))), 16)
+        self.assertEqual(union_area(rectangles((0, 1, 0, 1), (1, 2, 0, 1))), 2)
+
+    def test_matches_cell_count(self):
+        rng = random.Random(3)
+        for _ in range(200):
+            boxes = []
+            for _ in range(rng.randint(1, 8)):
+                x1, y1 = rng.randint(-5, 5), rng.randint(-5, 5)
+                boxes.append((x1, x1 + rng.randint(1, 5), y1, y1 + rng.randint(1, 5)))
+            cells = {
+                (x, y)
+                for x1, x2, y1, y2 in boxes
+                for x in range(x1, x2)
+                for y in range(y1, y2)
+            }
+            self.assertEqual(union_area(rectangles(*boxes)), len(cells), boxes)
+
+
+class TestExecuteCommandsFootprint(unittest.TestCase):
+    def test_footprint_offsets(self):
+        self.assertEqual(footprint_offsets(1), (0, 0))
+        self.assertEqual(footprint_offsets(3), (1, 1))
+        self.assertEqual(footprint_offsets(4), (1, 2))
+
+    def test_matches_brush_cells(self):
+        rng = random.Random(0)
+        for _ in range(500):
+            commands = [
+                {"direction": rng.choice(DIRECTIONS), "steps": rng.randint(0, 6)}
+                for _ in range(rng.randint(0, 12))
+            ]
+            x, y, width = rng.randint(-5, 5), rng.randint(-5, 5), rng.randint(1, 5)
+            expected = len(brush_cells(commands, x, y, width))
+            result, _ = execute_commands_footprint(commands, x, y, width)
+            self.assertEqual(result, expected, (commands, x, y, width))
+
+    def test_width_one_matches_unit_cells(self):
+        for commands in [
+            random_walk(2000, 10),
+            random_walk(2000, 1000, seed=1),
+            realistic_path(200, 100),
+            adversarial_grid(50),
+        ]:
+            self.assertEqual(
+                execute_commands_footprint(commands, 3, -4)[0],
+                execute_commands_numpy(commands, 3, -4)[0],
+            )
+
+    def test_band(self):
+        # a 3-wide brush going east 9 steps cleans a 12 x 3 band
+        commands = [{"direction": "east", "steps": 9}]
+        self.assertEqual(execute_commands_footprint(commands, 0, 0, 3)[0], 36)
+        self.assertEqual(execute_commands_footprint([], 0, 0, 3)[0], 9)
+        # going back along the next row only adds one row
+        commands.append({"direction": "north", "steps": 1})
+        commands.append({"direction": "west", "steps": 9})
+        self.assertEqual(execute_commands_footprint(commands, 0, 0, 3)[0], 48)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,164 @@
+import random
+import unittest
+
+import numpy as np
+
+from app.engines import get_engine
+from app.execute_commands_v1 import execute_commands_v1
+from app.execute_commands_v2 import (
+    Line,
+    calculate_crossings,
+    create_lines,
+    execute_commands_v2,
+    merge_segments,
+)
+from app.execute_commands_numpy import (
+    commands_to_arrays,
+    count_crossings_arrays,
+    count_segment_points,
+    create_segments,
+    execute_commands_numpy,
+    merge_segment_arrays,
+)
+
+
+def to_arrays(lines):
+    return (
+        np.array([line.constant for line in lines], dtype=np.int64),
+        np.array([line.start for line in lines], dtype=np.int64),
+        np.array([line.end for line in lines], dtype=np.int64),
+    )
+
+
+def to_lines(segments):
+    return [Line(*map(int, segment)) for segment in zip(*segments)]
+
+
+class TestExecuteCommandsNumpy(unittest.TestCase):
+    # create_segments
+    def test_create_segments(self):
+        commands = [
+            {"direction": "north", "steps": 2},
+            {"direction": "east", "steps": 2},
+            {"direction": "south", "steps": 2},
+            {"direction": "west", "steps": 2},
+        ]
+        horizontal, vertical = create_segments(0, 0, *commands_to_arrays(commands))
+        horizontal_lines, vertical_lines = create_lines(0, 0, commands)
+
+        self.assertEqual(to_lines(horizontal), horizontal_lines)
+        self.assertEqual(to_lines(vertical), vertical_lines)
+
+    # merge_segment_arrays
+    def test_merge_segment_arrays(self):
+        lines = [Line(0, 2, 4), Line(1, 0, 2), Line(0, 0, 2), Line(0, 6, 7)]
+        merged = merge_segment_arrays(*to_arrays(lines))
+        self.assertEqual(to_lines(merged), merge_segments(lines))
+        self.assertEqual(count_segment_points(merged[1], merged[2]), 10)
+
+    def test_merge_segment_arrays_wide_ends(self):
+        # constants times the span of the ends do not fit a combined key
+        rng = random.Random(5)
+        lines = []
+        for _ in range(10000):
+            start = rng.randint(0, 10**15)
+            lines.append(
+                Line(rng.randint(0, 5000), start, start + rng.randint(0, 10**15))
+            )
+        merged = merge_segment_arrays(*to_arrays(lines))
+        self.assertEqual(to_lines(merged), merge_segments(lines))
+
+    # count_crossings_arrays
+    def test_count_crossings_arrays(self):
+        vertical_lines = [Line(0, 0, 4), Line(2, 2, 4)]
+        horizontal_lines = [Line(2, -2, 2), Line(4, 0, 2)]
+        self.assertEqual(
+            count_crossings_arrays(
+                to_arrays(vertical_lines), to_arrays(horizontal_lines)
+            ),
+            4,
+        )
+        self.assertEqual(
+            count_crossings_arrays(to_arrays([]), to_arrays(horizontal_lines)), 0
+        )
+
+    def test_count_crossings_arrays_matches_calculate_crossings(self):
+        rng = random.Random(7)
+        for _ in range(50):
+            lines = []
+            for _ in range(rng.randint(1, 60)):
+                start = rng.randint(-10, 10)
+                lines.append(
+                    Line(rng.randint(-10, 10), start, start + rng.randint(0, 8))
+                )
+            vertical_lines, horizontal_lines = lines[::2], lines[1::2]
+            self.assertEqual(
+                count_crossings_arrays(
+                    to_arrays(vertical_lines), to_arrays(horizontal_lines)
+                ),
+                calculate_crossings(vertical_lines, horizontal_lines),
+            )
+
+    # execute_commands_numpy
+    def test_execute_commands_no_commands(self):
+        result, duration = execute_commands_numpy([], 0, 0)
+        self.assertEqual(result, 1)
+        self.assertIsNotNone(duration)
+
+    def test_execute_commands_no_steps(self):
+        result, _ = execute_commands_numpy([{"direction": "north", "steps": 0}], 0, 0)
+        self.assertEqual(result, 1)
+
+    def test_execute_commands_teeth(self):
+        commands = [
+            {"direction": "east", "steps": 2},
+            {"direction": "north", "steps": 4},
+            {"direction": "east", "steps": 2},
+            {"direction": "south", "steps": 4},
+            {"direction": "east", "steps": 2},
+            {"direction": "north", "steps": 2},
+            {"direction": "west", "steps": 8},
+        ]
+        result, _ = execute_commands_numpy(commands, 0, 0)
+        self.assertEqual(result, 23)
+
+    def test_execute_commands_matches_v1(self):
+        rng = random.Random(3)
+        directions = ["north", "south", "east", "west"]
+        for _ in range(200):
+            commands = [
+                {"direction": rng.choice(directions), "steps": rng.randint(0, 6)}
+                for _ in range(rng.randint(0, 40))
+            ]
+            x, y = rng.randint(-5, 5), rng.randint(-5, 5)
+            self.assertEqual(
+                execute_commands_numpy(commands, x, y)[0],
+                execute_commands_v1(commands, x, y)[0],
+            )
+
+    def test_execute_commands_large_input(self):
+        commands = [{"direction": "north", "steps": 100000} for _ in range(10000)]
+        result, _ = execute_commands_numpy(commands, 0, 0)
+        self.assertEqual(result, 10000 * 100000 + 1)
+
+    def test_execute_commands_large_steps(self):
+        rng = random.Random(7)
+        directions = ["north", "south", "east", "west"]
+        commands = [
+            {"direction": rng.choice(directions), "steps": rng.randint(0, 10**12)}
+            for _ in range(10000)
+        ]
+        self.assertEqual(
+            execute_commands_numpy(commands, 0, 0)[0],
+            execute_commands_v2(commands, 0, 0)[0],
+        )
+
+    # get_engine
+    def test_get_engine(self):
+        self.assertIs(get_engine("numpy"), execute_commands_numpy)
+        with self.assertRaises(ValueError):
+            get_engine("unknown")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,10 +1,17 @@
+import random
 import unittest
+from app.execute_commands_v1 import execute_commands_v1
 from app.execute_commands_v2 import (
     Line,
+    SegmentStore,
     calculate_crossings,
+    calculate_crossings_sweep,
     count_points,
+    count_store_points,
     create_lines,
+    create_segment_stores,
     execute_commands_v2,
+    merge_segment_store,
     merge_segments,
 )
 
@@ -60,6 +67,40 @@ class TestExecuteCommands(unittest.TestCase):
         self.assertEqual(merged[0].start, 0)
         self.assertEqual(merged[0].end, 4)
 
+    # SegmentStore
+    def test_create_segment_stores(self):
+        commands = [
+            {"direction": "north", "steps": 2},
+            {"direction": "east", "steps": 2},
+            {"direction": "south", "steps": 2},
+            {"direction": "west", "steps": 2},
+            {"direction": "north", "steps": 2},
+        ]
+        horizontal, vertical = create_segment_stores(0, 0, commands)
+        horizontal_lines, vertical_lines = create_lines(0, 0, commands)
+
+        self.assertEqual(list(horizontal), horizontal_lines)
+        self.assertEqual(list(vertical), vertical_lines)
+        self.assertEqual(vertical[1], Line(2, 0, 2))
+
+    def test_merge_segment_store(self):
+        lines = [Line(1, 0, 2), Line(0, 2, 4), Line(0, 0, 2), Line(0, 6, 7)]
+        segments = SegmentStore()
+        for line in lines:
+            segments.append(line.constant, line.start, line.end)
+
+        merged = merge_segment_store(segments)
+        self.assertEqual(list(merged), merge_segments(lines))
+        self.assertEqual(count_store_points(merged), 10)
+        self.assertEqual(len(merge_segment_store(SegmentStore())), 0)
+
+    def test_sorted_order(self):
+        segments = SegmentStore()
+        for line in [Line(1, 0, 2), Line(0, 2, 4), Line(-3, 9, 9), Line(0, -5, 2)]:
+            segments.append(line.constant, line.start, line.end)
+        self.assertEqual(segments.sorted_order().tolist(), [2, 3, 1, 0])
+        self.assertEqual(len(SegmentStore().sorted_order()), 0)
+
     def test_count_points(self):
         self.assertEqual(
             count_points(
@@ -77,6 +118,28 @@ class TestExecuteCommands(unittest.TestCase):
         horizontal_lines = [Line(2, -2, 2), Line(4, 0, 2)]
         self.assertEqual(calculate_crossings(vertical_lines, horizontal_lines), 4)
 
+    def test_count_crossings_sweep(self):
+        vertical_lines = [Line(0, 0, 4), Line(2, 2, 4)]
+        horizontal_lines = [Line(2, -2, 2), Line(4, 0, 2)]
+        self.assertEqual(calculate_crossings_sweep(vertical_lines, horizontal_lines), 4)
+        self.assertEqual(calculate_crossings_sweep([], horizontal_lines), 0)
+        self.assertEqual(calculate_crossings_sweep(vertical_lines, []), 0)
+
+    def test_count_crossings_sweep_matches_calculate_crossings(self):
+        rng = random.Random(42)
+        for _ in range(50):
+            lines = []
+            for _ in range(60):
+                start = rng.randint(-10, 10)
+                lines.append(
+                    Line(rng.randint(-10, 10), start, start + rng.randint(0, 8))
+                )
+            vertical_lines, horizontal_lines = lines[:30], lines[30:]
+            self.assertEqual(
+                calculate_crossings_sweep(vertical_lines, horizontal_lines),
+                calculate_crossings(vertical_lines, horizontal_lines),
+            )
+
     # execute_commands_v2
     def test_execute_commands_no_steps(self):
         commands = [
@@ -173,6 +236,22 @@ class TestExecuteCommands(unittest.TestCase):
         self.assertEqual(result, 23)
         self.assertIsNotNone(duration)
 
+    def test_execute_commands_large_teeth(self):
+        commands = []
+        for _ in range(2500):
+            commands.extend(
+                [
+                    {"direction": "east", "steps": 1},
+                    {"direction": "south", "steps": 1},
+                    {"direction": "east", "steps": 1},
+                    {"direction": "north", "steps": 1},
+                ]
+            )
+        x, y = 0, 0
+        result, duration = execute_commands_v2(commands, x, y)
+        self.assertEqual(result, execute_commands_v1(commands, x, y)[0])
+        self.assertLess(duration, 1)
+
 
 if __name__ == "__main__":
     unittest.main()
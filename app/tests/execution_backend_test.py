@@ -0,0 +1,125 @@
+import threading
+import time
+import unittest
+from app.execute_commands_v2 import execute_commands_v2
+from app.execution_backend import (
+    BackendBusyError,
+    ExecutionTimeoutError,
+    InlineBackend,
+    ProcessPoolBackend,
+)
+
+
+class TestInlineBackend(unittest.TestCase):
+    def test_run(self):
+        commands = [{"direction": "north", "steps": 1}]
+        result, _ = InlineBackend().run(execute_commands_v2, commands, 0, 0)
+        self.assertEqual(result, 2)
+
+    def test_run_many(self):
+        outcomes = InlineBackend().run_many(
+            [
+                (execute_commands_v2, ([{"direction": "north", "steps": 1}], 0, 0)),
+                (divmod, (1, 0)),
+            ]
+        )
+        self.assertEqual(outcomes[0][0], 2)
+        self.assertIsInstance(outcomes[1], ZeroDivisionError)
+
+
+class TestProcessPoolBackend(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.backend = ProcessPoolBackend(
+            workers=1, queue_size=0, timeout=0.5, inline_max_size=10
+        )
+        cls.backend.warm_up()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.backend.shutdown()
+
+    def wait_for_free_slot(self):
+        # slots are released by a callback once the worker is done
+        for _ in range(100):
+            if self.backend.slots.acquire(blocking=False):
+                self.backend.slots.release()
+                return
+            time.sleep(0.05)
+
+    def test_run(self):
+        self.wait_for_free_slot()
+        commands = [
+            {"direction": "east", "steps": 2},
+            {"direction": "north", "steps": 1},
+        ]
+        result, _ = self.backend.run(execute_commands_v2, commands, 10, 22, size=11)
+        self.assertEqual(result, 4)
+
+    def test_small_jobs_run_inline(self):
+        self.wait_for_free_slot()
+        worker = threading.Thread(
+            target=self.backend.run, args=(time.sleep, 0.3), kwargs={"size": 11}
+        )
+        worker.start()
+        time.sleep(0.05)
+        try:
+            commands = [{"direction": "north", "steps": 1}]
+            result, _ = self.backend.run(execute_commands_v2, commands, 0, 0, size=1)
+            self.assertEqual(result, 2)
+        finally:
+            worker.join()
+
+    def test_timeout(self):
+        self.wait_for_free_slot()
+        with self.assertRaises(ExecutionTimeoutError):
+            self.backend.run(time.sleep, 1, size=11)
+
+    def test_busy(self):
+        self.wait_for_free_slot()
+        worker = threading.Thread(
+            target=self.backend.run, args=(time.sleep, 0.3), kwargs={"size": 11}
+        )
+        worker.start()
+        time.sleep(0.05)
+        try:
+            with self.assertRaises(BackendBusyError):
+                self.backend.run(time.sleep, 0, size=11)
+        finally:
+            worker.join()
+
+    def test_run_many(self):
+        self.wait_for_free_slot()
+        jobs = [
+            (execute_commands_v2, ([{"direction": "east", "steps": steps}], 0, 0))
+            for steps in range(5)
+        ]
+        jobs.append((divmod, (1, 0)))
+        outcomes = self.backend.run_many(jobs, sizes=[1, 11, 12, 1, 13, 20])
+        self.assertEqual([outcome[0] for outcome in outcomes[:5]], [1, 2, 3, 4, 5])
+        self.assertIsInstance(outcomes[5], ZeroDivisionError)
+
+    def test_run_many_timeout(self):
+        self.wait_for_free_slot()
+        outcomes = self.backend.run_many(
+            [(time.sleep, (1,)), (divmod, (7, 2))], sizes=[11, 1]
+        )
+        self.assertIsInstance(outcomes[0], ExecutionTimeoutError)
+        self.assertEqual(outcomes[1], (3, 1))
+
+    def test_run_many_busy(self):
+        self.wait_for_free_slot()
+        worker = threading.Thread(
+            target=self.backend.run, args=(time.sleep, 0.3), kwargs={"size": 11}
+        )
+        worker.start()
+        time.sleep(0.05)
+        try:
+            with self.assertRaises(BackendBusyError):
+                self.backend.run_many([(time.sleep, (0,))], sizes=[11])
+        finally:
+            worker.join()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,180 @@
+import random
+import unittest
+from unittest.mock import MagicMock, patch
+from flask import json
+from app.execution_backend import BackendBusyError
+from app.fleet_coverage import count_fleet_arrays, execute_fleet_commands
+from app.execute_commands_numpy import commands_to_arrays
+from app.execute_commands_v1 import visited_cells
+from app.main import app
+from app.validation import (
+    MAX_FLEET_ROBOTS,
+    MAX_STEPS,
+    InvalidInputError,
+    parse_fleet_coverage,
+    parse_fleet_robot,
+)
+
+DIRECTIONS = ["north", "south", "east", "west"]
+
+
+def random_robot(rng):
+    commands = [
+        {
+            "direction": rng.choice(DIRECTIONS),
+            "steps": rng.randint(0, 6),
+        }
+        for _ in range(rng.randint(0, 12))
+    ]
+    return commands, rng.randint(-5, 5), rng.randint(-5, 5)
+
+
+class TestFleetCoverage(unittest.TestCase):
+    def test_matches_the_union_of_point_sets(self):
+        rng = random.Random(0)
+        for _ in range(300):
+            robots = [random_robot(rng) for _ in range(rng.randint(1, 5))]
+            expected = set().union(*(visited_cells(*robot) for robot in robots))
+            self.assertEqual(execute_fleet_commands(robots)[0], len(expected), robots)
+
+    def test_overlaps_are_counted_once(self):
+        line = [{"direction": "east", "steps": 9}]
+        self.assertEqual(execute_fleet_commands([(line, 0, 0)] * 3)[0], 10)
+        # a second robot crossing the line in its middle
+        cross = [{"direction": "north", "steps": 4}]
+        self.assertEqual(execute_fleet_commands([(line, 0, 0), (cross, 5, -2)])[0], 14)
+
+    def test_robots_that_do_not_move(self):
+        self.assertEqual(execute_fleet_commands([([], 0, 0), ([], 0, 0)])[0], 1)
+        self.assertEqual(execute_fleet_commands([([], 0, 0), ([], 3, 4)])[0], 2)
+        self.assertEqual(count_fleet_arrays([]), 0)
+
+    def test_narrow_steps_arrays(self):
+        directions, steps = commands_to_arrays([{"direction": "east", "steps": 100}])
+        paths = [(directions, steps.astype("uint8"), 0, 0)]
+        self.assertEqual(count_fleet_arrays(paths), 101)
+
+
+class TestParseFleetCoverage(unittest.TestCase):
+    def test_robots(self):
+        robots = parse_fleet_coverage(
+            {
+                "robots": [
+                    {"start": {"x": 1, "y": 2}, "commmands": []},
+                    {
+                        "start": {"x": 0, "y": 0},
+                        "commmands": [{"direction": "north", "steps": 1}],
+                    },
+                ]
+            }
+        )
+        self.assertEqual([(robot.x, robot.y) for robot in robots], [(1, 2), (0, 0)])
+        self.assertEqual(robots[1].directions.tolist(), [0])
+        self.assertEqual(robots[1].steps.tolist(), [1])
+
+    def test_robot_arrays_match_the_commands(self):
+        rng = random.Random(1)
+        for _ in range(50):
+            commands, x, y = random_robot(rng)
+            robot = parse_fleet_robot(
+                {"start": {"x": x, "y": y}, "commmands": commands}
+            )
+            directions, steps = commands_to_arrays(commands)
+            self.assertEqual(robot.directions.tolist(), directions.tolist())
+            self.assertEqual(robot.steps.tolist(), steps.tolist())
+            self.assertEqual((robot.x, robot.y), (x, y))
+
+    def test_robot_steps_like_enter_path(self):
+        def robot(steps):
+            return {
+                "start": {"x": 0, "y": 0},
+                "commmands": [
+                    {"direction": "east", "steps": 1},
+                    {"direction": "north", "steps": steps},
+                ],
+            }
+
+        self.assertEqual(parse_fleet_robot(robot(2.0)).steps.tolist(), [1, 2])
+        for steps in [True, 2.5, "2", -1, MAX_STEPS + 1, 10**30, None]:
+            with self.assertRaises(InvalidInputError):
+                parse_fleet_robot(robot(steps))
+        for command in [1, "east", [], {"direction": "up", "steps": 1}]:
+            with self.assertRaises(InvalidInputError):
+                parse_fleet_robot({"start": {"x": 0, "y": 0}, "commmands": [command]})
+
+    def test_invalid(self):
+        for data in [
+            None,
+            [],
+            {},
+            {"robots": []},
+            {"robots": [1]},
+            {"robots": [{"start": {"x": 0, "y": 0}, "commmands": []}] * 101},
+        ]:
+            with self.assertRaises(InvalidInputError):
+                parse_fleet_coverage(data)
+        self.assertEqual(MAX_FLEET_ROBOTS, 100)
+
+    def test_errors_name_the_robot(self):
+        with self.assertRaises(InvalidInputError) as context:
+            parse_fleet_coverage(
+                {
+                    "robots": [
+                        {"start": {"x": 0, "y": 0}, "commmands": []},
+                        {"start": {"x": 0}, "commmands": []},
+                    ]
+                }
+            )
+        self.assertEqual(len(context.exception.errors), 1)
+        self.assertTrue(context.exception.errors[0].startswith("robots[1]: "))
+
+
+class TestFleetCoverageEndpoint(unittest.TestCase):
+    def setUp(self):
+        self.client = app.test_client()
+
+    def post(self, data):
+        return self.client.post(
+            "/robot-cleaning-service/fleet-coverage",
+            data=json.dumps(data),
+            content_type="application/json",
+        )
+
+    def test_fleet_coverage(self):
+        response = self.post(
+            {
+                "robots": [
+                    {
+                        "start": {"x": 0, "y": 0},
+                        "commmands": [{"direction": "east", "steps": 9}],
+                    },
+                    {
+                        "start": {"x": 5, "y": -2},
+                        "commmands": [{"direction": "north", "steps": 4}],
+                    },
+                ]
+            }
+        )
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.data)
+        self.assertEqual(data["result"], 14)
+        self.assertEqual((data["robots"], data["commands"]), (2, 2))
+        self.assertIn("duration", data)
+
+    def test_invalid_robot(self):
+        response = self.post({"robots": [{"start": {"x": 0, "y": 0}}]})
+        self.assertEqual(response.status_code, 400)
+        self.assertTrue(json.loads(response.data)["error"][0].startswith("robots[0]"))
+
+    def test_busy(self):
+        backend = MagicMock()
+        backend.run.side_effect = BackendBusyError("Execution queue is full")
+        with patch("app.main.execution_backend", backend):
+            response = self.post(
+                {"robots": [{"start": {"x": 0, "y": 0}, "commmands": []}]}
+            )
+        self.assertEqual(response.status_code, 503)
+
+
+if __name__ == "__main__":
+    unittest.main()
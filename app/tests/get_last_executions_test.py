@@ -0,0 +1,120 @@
+import datetime
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+from flask import json
+from app import get_db
+from app.db_queries import ExecutionQueryService
+from app.main import app
+from app.validation import InvalidInputError, parse_executions_page
+
+db = get_db()
+
+
+class TestParseExecutionsPage(unittest.TestCase):
+    def test_defaults(self):
+        self.assertEqual(parse_executions_page({}), (None, 100))
+
+    def test_cursor(self):
+        before, limit = parse_executions_page(
+            {"before": "2023-01-01T10:00:00.250000,42", "limit": "5"}
+        )
+        self.assertEqual(before, (datetime.datetime(2023, 1, 1, 10, 0, 0, 250000), 42))
+        self.assertEqual(limit, 5)
+
+    def test_invalid(self):
+        for args in [
+            {"before": "yesterday"},
+            {"before": "2023-01-01,x"},
+            {"limit": "0"},
+            {"limit": "a"},
+            {"limit": "10001"},
+        ]:
+            with self.assertRaises(InvalidInputError):
+                parse_executions_page(args)
+
+
+class TestGetLastExecutions(unittest.TestCase):
+    def setUp(self):
+        """Point the application to a temporary SQLite database."""
+        handle, self.path = tempfile.mkstemp(suffix=".db")
+        os.close(handle)
+        self.config = patch.dict(
+            app.config, {"SQLALCHEMY_DATABASE_URI": f"sqlite:///{self.path}"}
+        )
+        self.config.start()
+        self.client = app.test_client()
+        self.service = ExecutionQueryService(db)
+        with app.app_context():
+            db.create_all()
+            start = datetime.datetime(2023, 1, 1)
+            # two executions per timestamp, so the id breaks the ties
+            self.service.insert_executions(
+                [
+                    {
+                        "timestamp": start + datetime.timedelta(seconds=index // 2),
+                        "commands": index,
+                        "result": index,
+                        "duration": 0.1,
+                    }
+                    for index in range(25)
+                ]
+            )
+
+    def tearDown(self):
+        self.config.stop()
+        os.remove(self.path)
+
+    def get(self, **args):
+        response = self.client.get(
+            "/robot-cleaning-service/get-last-executions", query_string=args
+        )
+        return response.status_code, json.loads(response.data)
+
+    def test_first_page(self):
+        status, items = self.get()
+        self.assertEqual(status, 200)
+        self.assertEqual([item["result"] for item in items], list(range(24, -1, -1)))
+        self.assertEqual(items[0]["timestamp"], "Sun, 01 Jan 2023 00:00:12 GMT")
+        self.assertEqual(items[0]["cursor"], f"2023-01-01T00:00:12,{items[0]['id']}")
+
+    def test_pages(self):
+        results, before = [], None
+        while True:
+            args = {"limit": 4}
+            if before:
+                args["before"] = before
+            status, items = self.get(**args)
+            self.assertEqual(status, 200)
+            if not items:
+                break
+            results.extend(item["result"] for item in items)
+            before = items[-1]["cursor"]
+        self.assertEqual(results, list(range(24, -1, -1)))
+
+    def test_service_rows(self):
+        with app.app_context():
+            rows = self.service.get_last_executions(limit=3)
+            self.assertEqual([row.result for row in rows], [24, 23, 22])
+            rows = self.service.get_last_executions(
+                before=(rows[-1].timestamp, rows[-1].id)
+            )
+            self.assertEqual(rows[0].result, 21)
+
+    def test_database_error(self):
+        # the error is an error response, not a 200 cut off by the stream
+        unreachable = "sqlite:////nonexistent/directory/executions.db"
+        with patch.dict(app.config, {"SQLALCHEMY_DATABASE_URI": unreachable}):
+            status, data = self.get()
+        self.assertEqual(status, 500)
+        self.assertEqual(data, {"error": "Internal server error"})
+
+    def test_invalid_parameters(self):
+        status, data = self.get(limit=-1)
+        self.assertEqual(status, 400)
+        self.assertIn("error", data)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,54 @@
+import unittest
+from unittest.mock import MagicMock
+
+from app.execution_backend import BackendBusyError, ExecutionTimeoutError
+from app.handlers import cached_result, error_body, run_path
+from app.result_cache import ResultCache, cache_key
+from app.validation import parse_enter_path
+
+PATH = {
+    "start": {"x": 0, "y": 0},
+    "commmands": [{"direction": "east", "steps": 2}],
+}
+
+
+class TestHandlers(unittest.TestCase):
+    def test_error_body(self):
+        self.assertEqual(
+            error_body(BackendBusyError("full")),
+            ({"error": "Service busy, try again later"}, 503),
+        )
+        self.assertEqual(
+            error_body(ExecutionTimeoutError("late")),
+            ({"error": "Execution timed out"}, 504),
+        )
+        for error in (MemoryError(), ValueError("boom")):
+            self.assertEqual(
+                error_body(error), ({"error": "Internal server error"}, 500)
+            )
+
+    def test_cached_result_without_cache(self):
+        self.assertEqual(cached_result(None, cache_key, []), (None, None, 0.0))
+
+    def test_run_path(self):
+        path = parse_enter_path(PATH)
+        backend = MagicMock()
+        backend.run.return_value = (3, 0.5)
+        selector = MagicMock()
+        selector.select.return_value = "v2"
+        result_cache = ResultCache(max_entries=10)
+
+        run = run_path(path, False, result_cache, selector, backend)
+        self.assertEqual((run.result, run.engine, run.cache_status), (3, "v2", "MISS"))
+        self.assertEqual(backend.run.call_args.kwargs["size"], 1)
+
+        run = run_path(path, False, result_cache, selector, backend)
+        self.assertEqual((run.result, run.engine, run.cache_status), (3, None, "HIT"))
+        self.assertEqual(backend.run.call_count, 1)
+
+        run = run_path(path, False, None, selector, backend)
+        self.assertIsNone(run.cache_status)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,118 @@
+import asyncio
+import os
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+from werkzeug.serving import make_server
+from app import get_db
+from app.main import app
+from app.tests.performance_tests.http_load import (
+    HTTPConnection,
+    parse_mix,
+    payload_classes,
+    percentile,
+    report,
+    run_load,
+)
+
+db = get_db()
+
+
+class TestHelpers(unittest.TestCase):
+    def test_parse_mix(self):
+        self.assertEqual(parse_mix("small=70, large=30"), {"small": 70, "large": 30})
+        self.assertEqual(parse_mix("small"), {"small": 1})
+        with self.assertRaises(ValueError):
+            parse_mix("small=-1")
+
+    def test_percentile(self):
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 99), 99)
+        self.assertEqual(percentile([7], 99), 7)
+
+    def test_report(self):
+        results = report(
+            {"small": [(0.001, 201), (0.003, 201)], "large": [(0.01, 503)]},
+            {"large": 2},
+            elapsed=2.0,
+        )
+        small, large, total = (
+            results["classes"][name] for name in ("small", "large", "total")
+        )
+        self.assertEqual(small["requests"], 2)
+        self.assertEqual(small["rps"], 1.0)
+        self.assertEqual(small["p50_ms"], 1.0)
+        self.assertEqual(small["max_ms"], 3.0)
+        self.assertEqual((large["failures"], large["errors"]), (1, 2))
+        self.assertEqual(
+            (total["requests"], total["failures"], total["errors"]), (3, 1, 2)
+        )
+
+
+class TestRunLoad(unittest.TestCase):
+    """Runs the load test against the application served by werkzeug in a thread."""
+
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp(suffix=".db")
+        os.close(handle)
+        self.config = patch.dict(
+            app.config, {"SQLALCHEMY_DATABASE_URI": f"sqlite:///{self.path}"}
+        )
+        self.config.start()
+        with app.app_context():
+            db.create_all()
+        self.server = make_server("127.0.0.1", 0, app, threaded=True)
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.start()
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.thread.join()
+        with app.app_context():
+            db.engine.dispose()
+        self.config.stop()
+        os.remove(self.path)
+
+    def test_keep_alive_and_chunked_responses(self):
+        async def requests():
+            connection = HTTPConnection("127.0.0.1", self.server.server_port)
+            try:
+                health = await connection.request("GET", "/health")
+                executions = await connection.request(
+                    "GET", "/robot-cleaning-service/get-last-executions"
+                )
+            finally:
+                await connection.close()
+            return health, executions
+
+        health, executions = asyncio.run(requests())
+        self.assertEqual(health, (200, b'{"status":"healthy"}\n'))
+        self.assertEqual(executions, (200, b"[]"))
+
+    def test_run_load(self):
+        payloads = payload_classes()
+        results = asyncio.run(
+            run_load(
+                self.url,
+                payloads,
+                {name: 1 for name in payloads},
+                concurrency=4,
+                requests=40,
+            )
+        )
+        total = results["classes"]["total"]
+        self.assertEqual(total["requests"], 40)
+        self.assertEqual((total["failures"], total["errors"]), (0, 0))
+        self.assertEqual(set(results["classes"]), set(payloads) | {"total"})
+        self.assertLessEqual(total["p50_ms"], total["p99_ms"])
+        with app.app_context():
+            self.assertGreaterEqual(
+                db.session.execute("SELECT COUNT(*) FROM execution").scalar(), 40
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
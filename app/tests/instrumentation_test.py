@@ -0,0 +1,175 @@
+import os
+import unittest
+from unittest.mock import patch
+from app import instrumentation
+from app.execute_commands_v2 import execute_commands_v2
+from app.execution_backend import ProcessPoolBackend
+from app.instrumentation import (
+    CROSSINGS,
+    REGISTRY,
+    SEGMENTS,
+    STAGE_SECONDS,
+    Histogram,
+    Registry,
+    Trace,
+)
+from app.main import app
+from app.result_cache import ResultCache
+
+V2_STAGES = ["calculate_crossings", "count_points", "create_lines", "merge_segments"]
+
+# a square walked twice, then a line crossing two of its sides
+COMMANDS = [
+    {"direction": "north", "steps": 2},
+    {"direction": "east", "steps": 2},
+    {"direction": "south", "steps": 2},
+    {"direction": "west", "steps": 2},
+] * 2 + [
+    {"direction": "north", "steps": 1},
+    {"direction": "east", "steps": 4},
+]
+
+
+class TestHistogram(unittest.TestCase):
+    def test_render(self):
+        histogram = Histogram("test_seconds", "Test histogram.", (0.1, 1), ("stage",))
+        for value in (0.05, 0.1, 0.5, 2):
+            histogram.observe(("a",), value)
+        histogram.observe(("b",), 0.5)
+        self.assertEqual(
+            histogram.render(),
+            [
+                "# HELP test_seconds Test histogram.",
+                "# TYPE test_seconds histogram",
+                'test_seconds_bucket{stage="a",le="0.1"} 2',
+                'test_seconds_bucket{stage="a",le="1.0"} 3',
+                'test_seconds_bucket{stage="a",le="+Inf"} 4',
+                'test_seconds_sum{stage="a"} 2.65',
+                'test_seconds_count{stage="a"} 4',
+                'test_seconds_bucket{stage="b",le="0.1"} 0',
+                'test_seconds_bucket{stage="b",le="1.0"} 1',
+                'test_seconds_bucket{stage="b",le="+Inf"} 1',
+                'test_seconds_sum{stage="b"} 0.5',
+                'test_seconds_count{stage="b"} 1',
+            ],
+        )
+
+    def test_escapes_label_values(self):
+        histogram = Histogram("test", "Test.", (1,), ("name",))
+        histogram.observe(('a"b\\',), 1)
+        self.assertIn('test_count{name="a\\"b\\\\"} 1', histogram.render())
+
+    def test_drain_and_merge(self):
+        worker = Histogram("test", "Test.", (1, 10), ("name",))
+        worker.observe(("a",), 5)
+        worker.observe(("b",), 50)
+        histogram = Histogram("test", "Test.", (1, 10), ("name",))
+        histogram.observe(("a",), 0)
+
+        histogram.merge(worker.drain())
+        self.assertEqual(worker.series, {})
+        self.assertEqual(
+            histogram.series, {("a",): [[1, 1, 0], 5], ("b",): [[0, 0, 1], 50]}
+        )
+
+
+class TestRegistry(unittest.TestCase):
+    def test_collectors(self):
+        registry = Registry()
+        registry.histogram("test_seconds", "Test histogram.", (1,), ())
+        registry.collector("a", lambda: [("test_total", "counter", "Test.", 1)])
+        registry.collector("a", lambda: [("test_total", "counter", "Test.", 2)])
+        body = registry.render()
+        self.assertIn("# TYPE test_seconds histogram\n", body)
+        self.assertTrue(body.endswith("# TYPE test_total counter\ntest_total 2\n"))
+        self.assertEqual(body.count("test_total 2"), 1)
+        self.assertEqual(registry.drain(), {"test_seconds": {}})
+
+
+class TestInstrumentation(unittest.TestCase):
+    def setUp(self):
+        REGISTRY.drain()
+
+    def tearDown(self):
+        REGISTRY.drain()
+
+    def test_trace(self):
+        trace = Trace("test")
+        trace.stage("first")
+        trace.stage("second")
+        self.assertEqual(
+            sorted(STAGE_SECONDS.series), [("test", "first"), ("test", "second")]
+        )
+
+    def test_disabled(self):
+        with patch.object(instrumentation, "ENABLED", False):
+            self.assertEqual(execute_commands_v2(COMMANDS, 0, 0)[0], 11)
+        self.assertEqual(REGISTRY.drain(), {name: {} for name in REGISTRY.histograms})
+
+    def test_v2_stages_and_sizes(self):
+        with patch.object(instrumentation, "ENABLED", True):
+            self.assertEqual(execute_commands_v2(COMMANDS, 0, 0)[0], 11)
+
+        self.assertEqual(sorted(stage for _, stage in STAGE_SECONDS.series), V2_STAGES)
+        for counts, total in STAGE_SECONDS.series.values():
+            self.assertEqual(sum(counts), 1)
+            self.assertGreaterEqual(total, 0)
+        self.assertEqual(SEGMENTS.series[("v2", "before_merge")][1], 10)
+        self.assertEqual(SEGMENTS.series[("v2", "after_merge")][1], 5)
+        self.assertEqual(CROSSINGS.series[("v2",)][1], 6)
+
+    def test_process_backend_sends_histograms_back(self):
+        with patch.dict(os.environ, {"INSTRUMENTATION": "1"}), patch.object(
+            instrumentation, "ENABLED", True
+        ):
+            backend = ProcessPoolBackend(workers=1, queue_size=1, timeout=30)
+            try:
+                result, _ = backend.run(execute_commands_v2, COMMANDS, 0, 0, size=10)
+                outcomes = backend.run_many(
+                    [(execute_commands_v2, (COMMANDS, 0, 0))] * 2, [10, 10]
+                )
+            finally:
+                backend.shutdown()
+
+        self.assertEqual(result, 11)
+        self.assertEqual([outcome[0] for outcome in outcomes], [11, 11])
+        for stage in V2_STAGES:
+            self.assertEqual(sum(STAGE_SECONDS.series[("v2", stage)][0]), 3)
+
+    def test_metrics_endpoint(self):
+        with patch.object(instrumentation, "ENABLED", True):
+            execute_commands_v2(COMMANDS, 0, 0)
+        response = app.test_client().get("/metrics")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, "text/plain")
+        body = response.get_data(as_text=True)
+        self.assertIn("# TYPE robot_engine_stage_seconds histogram", body)
+        self.assertIn(
+            'robot_engine_stage_seconds_count{engine="v2",stage="merge_segments"} 1',
+            body,
+        )
+        self.assertIn(
+            'robot_engine_segments_sum{engine="v2",phase="before_merge"} 10', body
+        )
+
+    def test_metrics_endpoint_result_cache(self):
+        result_cache = ResultCache(max_entries=1)
+        result_cache.get(b"a")
+        result_cache.put(b"a", 1)
+        result_cache.put(b"b", 2)
+        result_cache.get(b"b")
+        with patch("app.main.result_cache", result_cache):
+            body = app.test_client().get("/metrics").get_data(as_text=True)
+        self.assertIn("# TYPE robot_result_cache_hits_total counter", body)
+        self.assertIn("\nrobot_result_cache_hits_total 1\n", body)
+        self.assertIn("\nrobot_result_cache_misses_total 1\n", body)
+        self.assertIn("\nrobot_result_cache_evictions_total 1\n", body)
+        self.assertIn("\nrobot_result_cache_entries 1\n", body)
+
+        with patch("app.main.result_cache", None):
+            body = app.test_client().get("/metrics").get_data(as_text=True)
+        self.assertNotIn("robot_result_cache", body)
+
+
+if __name__ == "__main__":
+    unittest.main()
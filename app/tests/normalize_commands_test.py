@@ -0,0 +1,74 @@
+import random
+import unittest
+from app.execute_commands_v1 import execute_commands_v1
+from app.normalize_commands import normalize_commands
+
+
+class TestNormalizeCommands(unittest.TestCase):
+    def test_fuses_same_direction_and_drops_zero_steps(self):
+        commands = [
+            {"direction": "north", "steps": 5},
+            {"direction": "north", "steps": 3},
+            {"direction": "east", "steps": 0},
+            {"direction": "north", "steps": 0},
+            {"direction": "north", "steps": 2},
+            {"direction": "east", "steps": 1},
+        ]
+        normalized, stats = normalize_commands(commands)
+        self.assertEqual(
+            normalized,
+            [{"direction": "north", "steps": 10}, {"direction": "east", "steps": 1}],
+        )
+        self.assertEqual(stats.input_commands, 6)
+        self.assertEqual(stats.output_commands, 2)
+        self.assertAlmostEqual(stats.reduction, 2 / 3)
+
+    def test_folds_back_and_forth_moves(self):
+        commands = [
+            {"direction": "north", "steps": 10},
+            {"direction": "south", "steps": 4},
+            {"direction": "north", "steps": 2},
+            {"direction": "south", "steps": 7},
+            {"direction": "north", "steps": 1},
+        ]
+        normalized, _ = normalize_commands(commands)
+        self.assertEqual(
+            normalized,
+            [{"direction": "north", "steps": 10}, {"direction": "south", "steps": 8}],
+        )
+
+    def test_returns_to_run_start(self):
+        commands = [
+            {"direction": "east", "steps": 5},
+            {"direction": "west", "steps": 10},
+            {"direction": "east", "steps": 5},
+            {"direction": "north", "steps": 1},
+        ]
+        normalized, _ = normalize_commands(commands)
+        self.assertEqual(len(normalized), 4)
+        self.assertEqual(normalized[-1], {"direction": "north", "steps": 1})
+
+    def test_no_commands(self):
+        normalized, stats = normalize_commands([{"direction": "west", "steps": 0}])
+        self.assertEqual(normalized, [])
+        self.assertEqual(stats.reduction, 1.0)
+        self.assertEqual(normalize_commands([])[1].reduction, 0.0)
+
+    def test_keeps_visited_cells(self):
+        rng = random.Random(5)
+        directions = ["north", "south", "east", "west"]
+        for _ in range(300):
+            commands = [
+                {"direction": rng.choice(directions), "steps": rng.randint(0, 5)}
+                for _ in range(rng.randint(0, 30))
+            ]
+            normalized, stats = normalize_commands(commands)
+            self.assertLessEqual(stats.output_commands, stats.input_commands)
+            self.assertEqual(
+                execute_commands_v1(normalized, 0, 0)[0],
+                execute_commands_v1(commands, 0, 0)[0],
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,131 @@
+import os
+import random
+import tempfile
+import unittest
+from functools import partial
+from unittest.mock import patch
+
+from app import create_app, get_db
+from app.db_queries import ExecutionQueryService, ExecutionWriteBuffer
+from app.normalize_commands import normalize_commands
+from app.path_archive import decode_path_archive, encode_commands_archive
+
+db = get_db()
+
+
+def realistic_path(size):
+    commands = []
+    for _ in range(size):
+        commands.extend(
+            [
+                {"direction": "north", "steps": 50},
+                {"direction": "east", "steps": 1},
+                {"direction": "south", "steps": 50},
+                {"direction": "east", "steps": 1},
+            ]
+        )
+    return commands
+
+
+class TestPathArchive(unittest.TestCase):
+    def test_round_trip(self):
+        rng = random.Random(3)
+        directions = ["north", "south", "east", "west"]
+        commands = [
+            {"direction": rng.choice(directions), "steps": rng.randint(0, 2**40)}
+            for _ in range(500)
+        ]
+        archive = encode_commands_archive(-7, 12, commands)
+        path = decode_path_archive(archive["path"])
+        self.assertEqual((path.x, path.y), (-7, 12))
+        self.assertEqual(list(path.commands()), commands)
+
+    def test_bounding_box(self):
+        commands = [
+            {"direction": "north", "steps": 2},
+            {"direction": "west", "steps": 5},
+            {"direction": "south", "steps": 4},
+            {"direction": "east", "steps": 1},
+        ]
+        archive = encode_commands_archive(10, 22, commands)
+        self.assertEqual(
+            [archive[key] for key in ("min_x", "min_y", "max_x", "max_y")],
+            [5, 20, 10, 24],
+        )
+        empty = encode_commands_archive(3, 4, [])
+        self.assertEqual(
+            [empty[key] for key in ("min_x", "min_y", "max_x", "max_y")], [3, 4, 3, 4]
+        )
+        self.assertEqual(list(decode_path_archive(empty["path"]).commands()), [])
+
+    def test_compact(self):
+        normalized, _ = normalize_commands(realistic_path(2500))
+        archive = encode_commands_archive(0, 0, normalized)
+        self.assertLess(len(archive["path"]), 4096)
+
+
+class TestArchivedPathQueries(unittest.TestCase):
+    def setUp(self):
+        """Set up the application on a temporary SQLite database."""
+        handle, self.path = tempfile.mkstemp(suffix=".db")
+        os.close(handle)
+        with patch.dict(os.environ, {"DATABASE_URI": f"sqlite:///{self.path}"}):
+            self.app = create_app(db)
+        with self.app.app_context():
+            db.create_all()
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def archive(self, x, y, steps):
+        commands = [{"direction": "east", "steps": steps}]
+        return partial(encode_commands_archive, x, y, commands)
+
+    def test_sync_and_batch_archives(self):
+        service = ExecutionQueryService(db)
+        with self.app.app_context():
+            execution = service.add_execution(1, 3, 0.1, archive=self.archive(0, 0, 2))
+            service.add_execution(1, 2, 0.1)
+            service.add_executions(
+                [(1, 5, 0.1), (1, 2, 0.1)], [self.archive(100, 100, 4), None]
+            )
+
+            path = service.get_archived_path(execution.id)
+            self.assertEqual(list(path.commands()), [{"direction": "east", "steps": 2}])
+            self.assertIsNone(service.get_archived_path(execution.id + 1))
+
+            paths = list(service.iter_archived_paths(batch_size=1))
+            self.assertEqual(
+                [(path.x, path.y) for _, _, path in paths], [(0, 0), (100, 100)]
+            )
+
+            inside = list(service.iter_archived_paths(bounding_box=(101, -5, 200, 100)))
+            self.assertEqual([path.x for _, _, path in inside], [100])
+
+    def test_buffered_archive(self):
+        write_buffer = ExecutionWriteBuffer(self.app, db, max_interval=60)
+        service = ExecutionQueryService(db, write_buffer)
+        calls = []
+
+        def archive():
+            calls.append(1)
+            return encode_commands_archive(1, 1, [{"direction": "north", "steps": 1}])
+
+        def broken_archive():
+            raise ValueError("broken")
+
+        service.add_execution(1, 2, 0.1, archive=archive)
+        service.add_execution(1, 2, 0.1, archive=broken_archive)
+        service.add_execution(1, 1, 0.1)
+        self.assertEqual(calls, [])
+        self.assertEqual(write_buffer.flush(), 3)
+        write_buffer.close()
+
+        with self.app.app_context():
+            paths = list(ExecutionQueryService(db).iter_archived_paths())
+        self.assertEqual(len(paths), 1)
+        self.assertEqual((paths[0][2].x, paths[0][2].y), (1, 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
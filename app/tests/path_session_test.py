@@ -0,0 +1,122 @@
+import random
+import unittest
+from app.execute_commands_v1 import execute_commands_v1
+from app.execute_commands_v2 import Line
+from app.path_session import IntervalSet, PathSession, StabbingIndex
+
+
+class TestIntervalSet(unittest.TestCase):
+    def test_add_returns_uncovered_parts(self):
+        intervals = IntervalSet()
+        self.assertEqual(intervals.add(0, 2), [(0, 2)])
+        self.assertEqual(intervals.add(6, 8), [(6, 8)])
+        self.assertEqual(intervals.add(1, 10), [(3, 5), (9, 10)])
+        self.assertEqual(intervals.add(0, 10), [])
+        self.assertEqual(intervals.starts, [0])
+        self.assertEqual(intervals.ends, [10])
+
+    def test_contiguous_intervals_are_merged(self):
+        intervals = IntervalSet()
+        intervals.add(0, 2)
+        intervals.add(3, 4)
+        intervals.add(8, 9)
+        self.assertEqual(intervals.lines(5), [Line(5, 0, 4), Line(5, 8, 9)])
+        self.assertTrue(intervals.covers(3))
+        self.assertFalse(intervals.covers(5))
+
+
+class TestStabbingIndex(unittest.TestCase):
+    def test_count(self):
+        index = StabbingIndex()
+        index.add(0, -3, 5)
+        index.add(1, 4, 4)
+        index.add(2, 0, 100)
+        index.add(0, 7, 9)
+        self.assertEqual(index.count(4, 0, 2), 3)
+        self.assertEqual(index.count(4, 1, 1), 1)
+        self.assertEqual(index.count(-3, -10, 10), 1)
+        self.assertEqual(index.count(6, 0, 2), 1)
+        self.assertEqual(index.count(8, 0, 0), 1)
+        self.assertEqual(index.count(101, 0, 2), 0)
+
+    def test_matches_brute_force(self):
+        rng = random.Random(4)
+        index, intervals = StabbingIndex(), []
+        for constant in range(200):
+            start = rng.randint(-50, 50)
+            end = start + rng.randint(0, 60)
+            index.add(constant, start, end)
+            intervals.append((constant, start, end))
+        for _ in range(500):
+            position = rng.randint(-60, 120)
+            low = rng.randint(0, 200)
+            high = low + rng.randint(0, 100)
+            expected = sum(
+                low <= constant <= high and start <= position <= end
+                for constant, start, end in intervals
+            )
+            self.assertEqual(index.count(position, low, high), expected)
+
+
+class TestPathSession(unittest.TestCase):
+    def test_no_commands(self):
+        session = PathSession(3, 4)
+        self.assertEqual(session.visited, 1)
+        self.assertEqual(session.extend([]), 1)
+
+    def test_extend_in_batches(self):
+        session = PathSession(10, 22)
+        self.assertEqual(session.extend([{"direction": "east", "steps": 2}]), 3)
+        self.assertEqual(session.extend([{"direction": "north", "steps": 1}]), 4)
+        self.assertEqual(
+            session.extend(
+                [
+                    {"direction": "west", "steps": 2},
+                    {"direction": "south", "steps": 1},
+                ]
+            ),
+            6,
+        )
+        self.assertEqual(session.commands, 4)
+        self.assertEqual((session.x, session.y), (10, 22))
+
+    def test_teeth(self):
+        commands = [
+            {"direction": "east", "steps": 2},
+            {"direction": "north", "steps": 4},
+            {"direction": "east", "steps": 2},
+            {"direction": "south", "steps": 4},
+            {"direction": "east", "steps": 2},
+            {"direction": "north", "steps": 2},
+            {"direction": "west", "steps": 8},
+        ]
+        self.assertEqual(PathSession(0, 0).extend(commands), 23)
+
+    def test_matches_v1_on_random_batches(self):
+        rng = random.Random(11)
+        directions = ["north", "south", "east", "west"]
+        for _ in range(100):
+            x, y = rng.randint(-5, 5), rng.randint(-5, 5)
+            session = PathSession(x, y)
+            commands = []
+            for _ in range(rng.randint(1, 5)):
+                batch = [
+                    {"direction": rng.choice(directions), "steps": rng.randint(0, 6)}
+                    for _ in range(rng.randint(0, 10))
+                ]
+                commands.extend(batch)
+                self.assertEqual(
+                    session.extend(batch), execute_commands_v1(commands, x, y)[0]
+                )
+
+    def test_large_input(self):
+        session = PathSession(0, 0)
+        for _ in range(100):
+            visited = session.extend(
+                [{"direction": "north", "steps": 1} for _ in range(100)]
+            )
+        self.assertEqual(visited, 10001)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+import os
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+from flask import json
+from app import get_db
+from app.main import app
+from app.models import Execution
+from app.tests.performance_tests.workloads import random_walk
+
+db = get_db()
+
+
+class TestBatchThroughput(unittest.TestCase):
+    """
+    Compares submitting paths one request at a time with submitting them in a
+    single enter-paths request, on a temporary SQLite database so that the
+    commits are part of the measure.
+    """
+
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp(suffix=".db")
+        os.close(handle)
+        self.config = patch.dict(
+            app.config, {"SQLALCHEMY_DATABASE_URI": f"sqlite:///{self.path}"}
+        )
+        self.config.start()
+        with app.app_context():
+            db.create_all()
+        self.client = app.test_client()
+
+    def tearDown(self):
+        self.config.stop()
+        os.remove(self.path)
+
+    def test_batch_vs_single_requests(self, jobs=200):
+        paths = [
+            {"start": {"x": 0, "y": 0}, "commmands": random_walk(20, 1000, seed)}
+            for seed in range(jobs)
+        ]
+
+        start_time = time.perf_counter()
+        single_results = []
+        for path in paths:
+            response = self.client.post(
+                "/robot-cleaning-service/enter-path",
+                data=json.dumps(path),
+                content_type="application/json",
+            )
+            single_results.append(json.loads(response.data)["result"])
+        single_duration = time.perf_counter() - start_time
+
+        start_time = time.perf_counter()
+        response = self.client.post(
+            "/robot-cleaning-service/enter-paths",
+            data=json.dumps(paths),
+            content_type="application/json",
+        )
+        batch_duration = time.perf_counter() - start_time
+
+        batch_results = [
+            item["result"] for item in json.loads(response.data)["results"]
+        ]
+        self.assertEqual(batch_results, single_results)
+        with app.app_context():
+            self.assertEqual(Execution.query.count(), 2 * jobs)
+
+        print(
+            f"\n{jobs} paths: {single_duration * 1000:.1f} ms in single requests, "
+            f"{batch_duration * 1000:.1f} ms in one batch "
+            f"({single_duration / batch_duration:.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,288 @@
+"""
+Benchmarks the engines on the workloads and compares two runs.
+
+Every case runs warm-up rounds, then measured rounds of enough calls to last
+at least `--min-round-time` seconds each. The median and the interquartile
+range of the rounds are written as JSON, headless. `compare` flags the
+cases whose median grew by more than `--threshold` between two runs and
+exits with status 1 when there is any.
+
+Usage:
+    PYTHONPATH=. python app/tests/performance_tests/benchmark.py run \
+        [--output benchmark.json] [--engine v2] [--workload spiral] [--quick]
+    PYTHONPATH=. python app/tests/performance_tests/benchmark.py compare \
+        baseline.json benchmark.json [--threshold 0.1]
+"""
+import argparse
+import datetime
+import gc
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from typing import Any, Callable, Dict, Iterator, List, Tuple
+
+from app.engines import ENGINES
+from app.normalize_commands import normalize_commands
+from app.tests.performance_tests.workloads import (
+    Commands,
+    adversarial_grid,
+    random_walk,
+    realistic_path,
+    spiral_path,
+    square_path,
+    teeth_path,
+)
+
+FORMAT_VERSION = 1
+
+# workload name -> the sizes it runs at, full and quick, and its generator
+WORKLOADS: Dict[str, Tuple[Tuple[int, ...], Tuple[int, ...], Callable]] = {
+    "square": ((10, 100, 1000), (10, 100), lambda size: square_path(size, 100)),
+    "teeth": ((100, 1000, 2500), (100,), lambda size: teeth_path(size, 10)),
+    "realistic": ((10, 100, 1000), (10,), lambda size: realistic_path(size, 1000)),
+    "random-walk": (
+        (100, 1000, 10000),
+        (100, 1000),
+        lambda size: random_walk(size, 1000, seed=size),
+    ),
+    "spiral": ((100, 1000, 10000), (100, 1000), lambda size: spiral_path(size)),
+    "adversarial-grid": (
+        (10, 100, 500),
+        (10, 100),
+        lambda size: adversarial_grid(size),
+    ),
+}
+
+# V1 keeps every visited cell in memory, it is only run on paths it finishes
+# in a reasonable time
+V1_MAX_STEPS = 2_000_000
+
+
+class Case:
+    """One engine on one workload, named `<engine>/<workload>/<size>`."""
+
+    def __init__(self, engine: str, workload: str, size: int, commands: Commands):
+        self.engine = engine
+        self.workload = workload
+        self.size = size
+        self.commands = commands
+
+    @property
+    def name(self) -> str:
+        return f"{self.engine}/{self.workload}/{self.size}"
+
+
+def cases(
+    engines: List[str], workloads: List[str], quick: bool = False
+) -> Iterator[Case]:
+    for workload in workloads:
+        full_sizes, quick_sizes, generate = WORKLOADS[workload]
+        for size in quick_sizes if quick else full_sizes:
+            # the engines run on normalized paths, as in the service
+            commands, _ = normalize_commands(generate(size))
+            steps = sum(command["steps"] for command in commands)
+            for engine in engines:
+                if engine == "v1" and steps > V1_MAX_STEPS:
+                    continue
+                yield Case(engine, workload, size, commands)
+
+
+def measure(
+    fn: Callable[[], Any],
+    warmup_rounds: int = 2,
+    rounds: int = 7,
+    min_round_time: float = 0.005,
+) -> List[float]:
+    """
+    Times `fn` like `timeit`: the number of calls per round is doubled until a
+    round lasts `min_round_time`, and the garbage collector is off during the
+    rounds.
+
+    Returns:
+        List[float]: The duration of one call, in seconds, for every round.
+    """
+    for _ in range(warmup_rounds):
+        fn()
+
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        number = 1
+        while True:
+            duration = _time_calls(fn, number)
+            if duration >= min_round_time or number >= 1 << 20:
+                break
+            number *= 2
+        return [_time_calls(fn, number) / number for _ in range(rounds)]
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+
+def summarize(durations: List[float]) -> Dict[str, float]:
+    """
+    Returns:
+        Dict[str, float]: The median, the quartiles and interquartile range,
+        the min, max and mean of the durations, and their number of rounds.
+    """
+    if len(durations) > 1:
+        q1, _, q3 = statistics.quantiles(durations, n=4, method="inclusive")
+    else:
+        q1 = q3 = durations[0]
+    return {
+        "median": statistics.median(durations),
+        "q1": q1,
+        "q3": q3,
+        "iqr": q3 - q1,
+        "min": min(durations),
+        "max": max(durations),
+        "mean": statistics.fmean(durations),
+        "rounds": len(durations),
+    }
+
+
+def run(args) -> Dict[str, Any]:
+    benchmarks = []
+    for case in cases(args.engine or list(ENGINES), args.workload, args.quick):
+        engine = ENGINES[case.engine]
+        try:
+            durations = measure(
+                lambda: engine(case.commands, 0, 0),
+                warmup_rounds=args.warmup_rounds,
+                rounds=args.rounds,
+                min_round_time=args.min_round_time,
+            )
+        except MemoryError:
+            print(f"{case.name}: out of memory, skipped")
+            continue
+        stats = summarize(durations)
+        benchmarks.append(
+            {
+                "name": case.name,
+                "engine": case.engine,
+                "workload": case.workload,
+                "size": case.size,
+                "commands": len(case.commands),
+                "steps": sum(command["steps"] for command in case.commands),
+                "stats": stats,
+            }
+        )
+        print(
+            f"{case.name}: median {stats['median'] * 1000:.3f} ms, "
+            f"IQR {stats['iqr'] * 1000:.3f} ms"
+        )
+
+    return {
+        "version": FORMAT_VERSION,
+        "datetime": datetime.datetime.utcnow().isoformat(),
+        "machine": {
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "benchmarks": benchmarks,
+    }
+
+
+def compare(
+    baseline: Dict[str, Any], current: Dict[str, Any], threshold: float
+) -> Tuple[List[Dict[str, Any]], List[str]]:
+    """
+    Compares the medians of the cases of two runs. A case regressed when its
+    median grew by more than `threshold` (0.1 is 10%) and the two
+    interquartile ranges do not overlap, so that noise is not flagged.
+
+    Returns:
+        Tuple[List[Dict[str, Any]], List[str]]: The comparison of every case
+        of both runs, and the names of the regressed cases.
+    """
+    baseline_stats = {item["name"]: item["stats"] for item in baseline["benchmarks"]}
+    rows, regressions = [], []
+    for item in current["benchmarks"]:
+        before = baseline_stats.get(item["name"])
+        if before is None:
+            continue
+        after = item["stats"]
+        change = after["median"] / before["median"] - 1
+        regressed = change > threshold and after["q1"] > before["q3"]
+        rows.append(
+            {
+                "name": item["name"],
+                "baseline": before["median"],
+                "current": after["median"],
+                "change": change,
+                "regressed": regressed,
+            }
+        )
+        if regressed:
+            regressions.append(item["name"])
+    return rows, regressions
+
+
+def _time_calls(fn: Callable[[], Any], number: int) -> float:
+    start_time = time.perf_counter()
+    for _ in range(number):
+        fn()
+    return time.perf_counter() - start_time
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="benchmark the engines")
+    run_parser.add_argument("--output", default="benchmark.json")
+    run_parser.add_argument(
+        "--engine", action="append", choices=list(ENGINES), help="repeatable"
+    )
+    run_parser.add_argument(
+        "--workload",
+        action="append",
+        choices=list(WORKLOADS),
+        help="repeatable (default: all)",
+    )
+    run_parser.add_argument("--quick", action="store_true", help="small sizes only")
+    run_parser.add_argument("--warmup-rounds", type=int, default=2)
+    run_parser.add_argument("--rounds", type=int, default=7)
+    run_parser.add_argument("--min-round-time", type=float, default=0.005)
+
+    compare_parser = commands.add_parser("compare", help="compare two runs")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=0.1)
+    args = parser.parse_args()
+
+    if args.command == "run":
+        args.workload = args.workload or list(WORKLOADS)
+        results = run(args)
+        with open(args.output, "w") as output_file:
+            json.dump(results, output_file, indent=2)
+            output_file.write("\n")
+        print(f"Saved {len(results['benchmarks'])} benchmarks to {args.output}")
+        return
+
+    with open(args.baseline) as baseline_file, open(args.current) as current_file:
+        rows, regressions = compare(
+            json.load(baseline_file), json.load(current_file), args.threshold
+        )
+    for row in rows:
+        print(
+            f"{row['name']:<32} {row['baseline'] * 1000:>10.3f} ms "
+            f"{row['current'] * 1000:>10.3f} ms {row['change']:>+8.1%}"
+            f"{'  REGRESSION' if row['regressed'] else ''}"
+        )
+    if regressions:
+        print(
+            f"{len(regressions)} regression(s) above {args.threshold:.0%}: "
+            f"{', '.join(regressions)}"
+        )
+        sys.exit(1)
+    print(f"No regression above {args.threshold:.0%}")
+
+
+if __name__ == "__main__":
+    main()
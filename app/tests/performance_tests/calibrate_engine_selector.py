@@ -0,0 +1,118 @@
+"""
+Calibrates the cost models of the adaptive engine selector.
+
+Every engine runs on paths of different shapes and sizes, and the measured
+durations are fitted to the terms of `PathFeatures.cost_terms` with
+non-negative least squares. The memory budget of V1 is converted into a
+maximum number of steps from the memory V1 uses per visited cell.
+
+Usage:
+    PYTHONPATH=. python app/tests/performance_tests/calibrate_engine_selector.py \
+        [--output app/engine_selector.json] [--v1-memory-budget-mb 256]
+"""
+import argparse
+import json
+import time
+import tracemalloc
+
+import numpy as np
+
+from app.engine_selector import COST_FEATURES, DEFAULT_CONFIG_PATH, PathFeatures
+from app.engines import ENGINES
+from app.normalize_commands import normalize_commands
+from app.tests.performance_tests.workloads import (
+    random_walk,
+    realistic_path,
+    square_path,
+    teeth_path,
+)
+
+# V1 is only timed on paths it can finish quickly
+V1_CALIBRATION_MAX_STEPS = 2_000_000
+# the bitmap is a brute-force reference, run with EXECUTION_ENGINE=bitmap: its
+# memory grows with the steps, so the adaptive selector never picks it
+UNCALIBRATED_ENGINES = ("bitmap",)
+
+
+def calibration_paths():
+    for size in (1, 10, 100, 1000, 2500, 10000):
+        yield random_walk(size, 10, seed=size)
+        yield random_walk(size, 1000, seed=size)
+        yield random_walk(size, 100000, seed=size)
+    for size in (1, 10, 100, 1000, 2500):
+        yield teeth_path(size)
+        yield teeth_path(size, steps=50)
+        yield realistic_path(size, steps=1000)
+        yield square_path(min(size, 100), 100)
+
+
+def measure(engine, commands, rounds=3):
+    durations = []
+    for _ in range(rounds):
+        start_time = time.perf_counter()
+        engine(commands, 0, 0)
+        durations.append(time.perf_counter() - start_time)
+    return float(np.median(durations))
+
+
+def fit_non_negative(terms, durations):
+    """Least squares, dropping the terms whose coefficient would be negative."""
+    active = list(range(terms.shape[1]))
+    while True:
+        solution, *_ = np.linalg.lstsq(terms[:, active], durations, rcond=None)
+        if (solution >= 0).all():
+            coefficients = np.zeros(terms.shape[1])
+            coefficients[active] = solution
+            return coefficients
+        active = [index for index, value in zip(active, solution) if value >= 0]
+
+
+def v1_bytes_per_step():
+    commands = random_walk(1000, 1000, seed=1)
+    tracemalloc.start()
+    ENGINES["v1"](commands, 0, 0)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / sum(command["steps"] for command in commands)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--output", default=DEFAULT_CONFIG_PATH)
+    parser.add_argument("--v1-memory-budget-mb", type=float, default=256)
+    args = parser.parse_args()
+
+    engines = {
+        name: engine
+        for name, engine in ENGINES.items()
+        if name not in UNCALIBRATED_ENGINES
+    }
+    samples = {name: ([], []) for name in engines}
+    for commands in calibration_paths():
+        normalized, _ = normalize_commands(commands)
+        features = PathFeatures.from_commands(normalized)
+        terms = features.cost_terms()
+        for name, engine in engines.items():
+            if name == "v1" and features.total_steps > V1_CALIBRATION_MAX_STEPS:
+                continue
+            samples[name][0].append([terms[term] for term in COST_FEATURES])
+            samples[name][1].append(measure(engine, normalized))
+
+    costs = {}
+    for name, (terms, durations) in samples.items():
+        coefficients = fit_non_negative(np.array(terms), np.array(durations))
+        costs[name] = dict(zip(COST_FEATURES, map(float, coefficients)))
+        print(f"{name}: {costs[name]}")
+
+    bytes_per_step = v1_bytes_per_step()
+    v1_max_steps = int(args.v1_memory_budget_mb * 1024 * 1024 / bytes_per_step)
+    print(f"v1: {bytes_per_step:.0f} bytes per step, max {v1_max_steps} steps")
+
+    with open(args.output, "w") as config_file:
+        json.dump({"costs": costs, "v1_max_steps": v1_max_steps}, config_file, indent=2)
+        config_file.write("\n")
+    print(f"Saved the engine selector config to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
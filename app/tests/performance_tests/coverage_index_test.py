@@ -0,0 +1,59 @@
+import unittest
+
+import numpy as np
+
+from app.coverage_index import CoverageIndex
+from app.execute_commands_v1 import execute_commands_v1
+from app.tests.performance_tests.timing import measure
+from app.tests.performance_tests.workloads import random_walk
+
+
+class TestCoverageIndexPerformance(unittest.TestCase):
+    """
+    A million point lookups and a thousand rectangle counts on a 10k-command
+    path, against building the set of visited points of V1 once.
+    """
+
+    def test_queries(self):
+        commands = random_walk(10000, 100)
+        rng = np.random.default_rng(0)
+        xs, ys = rng.integers(-2000, 2000, (2, 1000000))
+        corners = rng.integers(-2000, 2000, (1000, 4)).tolist()
+
+        build = measure(lambda: CoverageIndex.from_commands(commands, 0, 0))
+        index = CoverageIndex.from_commands(commands, 0, 0)
+        points = measure(lambda: index.contains(xs, ys))
+        rectangles = measure(lambda: index.count_rectangles(corners), repeat=1)
+        v1 = measure(lambda: execute_commands_v1(commands, 0, 0), repeat=1)
+        print(
+            f"\nindex of {len(index)} cells built in {build * 1000:.0f} ms, "
+            f"1M points in {points * 1000:.0f} ms, 1000 rectangles in "
+            f"{rectangles * 1000:.0f} ms; V1's set in {v1 * 1000:.0f} ms"
+        )
+        self.assertLess(points, 0.5)
+        self.assertLess(build + points, v1)
+
+    def test_large_rectangles(self):
+        """
+        Rectangles covering the whole path used to cost a crossing count of
+        all its lines each: 10,000 of them took over a minute.
+        """
+        commands = random_walk(10000, 100)
+        index = CoverageIndex.from_commands(commands, 0, 0)
+        rng = np.random.default_rng(0)
+        corners = np.concatenate(
+            (
+                rng.integers(-(10**6), -(10**4), (10000, 2)),
+                rng.integers(10**4, 10**6, (10000, 2)),
+            ),
+            axis=1,
+        )
+        counts = index.count_rectangles(corners)
+        rectangles = measure(lambda: index.count_rectangles(corners), repeat=1)
+        print(f"\n10000 rectangles covering {len(index)} cells in {rectangles:.2f} s")
+        self.assertEqual(counts.tolist(), [len(index)] * 10000)
+        self.assertLess(rectangles, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
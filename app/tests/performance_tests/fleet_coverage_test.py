@@ -0,0 +1,61 @@
+import logging
+import time
+import unittest
+
+from flask import json
+
+from app.execute_commands_numpy import execute_commands_numpy
+from app.main import app
+from app.tests.performance_tests.timing import measure
+from app.tests.performance_tests.workloads import fleet
+
+
+class TestFleetCoveragePerformance(unittest.TestCase):
+    """
+    One fleet request of 100 robots with 10k commands each, random walks of 1
+    to 10 steps, through the whole request path: the 35 MB JSON body, its
+    validation and the engine.
+    """
+
+    def setUp(self):
+        logging.disable(logging.INFO)
+        self.addCleanup(logging.disable, logging.NOTSET)
+
+    def test_hundred_robots(self):
+        robots = fleet(100, 10000)
+        body = json.dumps(
+            {
+                "robots": [
+                    {"start": {"x": x, "y": y}, "commmands": commands}
+                    for commands, x, y in robots
+                ]
+            }
+        )
+        client = app.test_client()
+
+        def post():
+            start_time = time.perf_counter()
+            response = client.post(
+                "/robot-cleaning-service/fleet-coverage",
+                data=body,
+                content_type="application/json",
+            )
+            self.assertEqual(response.status_code, 200)
+            return time.perf_counter() - start_time, response.get_json()["duration"]
+
+        duration, engine = min(post() for _ in range(3))
+        separate = measure(
+            lambda: [execute_commands_numpy(*robot) for robot in robots], repeat=1
+        )
+        print(
+            f"\nfleet of {len(robots)} robots x 10000 commands: "
+            f"{duration * 1000:.0f} ms for the request, {engine * 1000:.0f} ms "
+            f"in the engine, {separate * 1000:.0f} ms for the robots one by one "
+            f"(without their union)"
+        )
+        self.assertLess(engine, 1)
+        self.assertLess(duration, 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
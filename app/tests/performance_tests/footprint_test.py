@@ -0,0 +1,32 @@
+import unittest
+
+from app.execute_commands_footprint import execute_commands_footprint
+from app.tests.performance_tests.timing import measure
+from app.tests.performance_tests.workloads import random_walk, realistic_path
+
+
+class TestFootprintPerformance(unittest.TestCase):
+    """
+    The union of the rectangles swept by a wide brush over 10k commands, for
+    paths that barely overlap (random walks) and a cleaning sweep.
+    """
+
+    def test_wide_brushes(self):
+        for name, commands in [
+            ("random walk", random_walk(10000, 1000)),
+            ("short random walk", random_walk(10000, 10)),
+            ("realistic", realistic_path(2500, 200)),
+        ]:
+            for width in (1, 50, 1000):
+                duration = measure(
+                    lambda: execute_commands_footprint(commands, 0, 0, width)
+                )
+                print(
+                    f"\n{name} ({len(commands)} commands), width {width}: "
+                    f"{duration * 1000:.0f} ms"
+                )
+                self.assertLess(duration, 0.5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,45 @@
+import timeit
+import unittest
+from unittest.mock import patch
+
+from app import instrumentation
+from app.execute_commands_v2 import execute_commands_v2
+from app.instrumentation import REGISTRY
+from app.tests.performance_tests.workloads import random_walk, square_path
+
+
+class TestInstrumentationOverhead(unittest.TestCase):
+    """
+    Measures V2 with the instrumentation off and on. On, a path pays for four
+    stage timings and three histogram observations, whatever its size.
+    """
+
+    def measure(self, commands, number, repeat=5):
+        durations = timeit.repeat(
+            lambda: execute_commands_v2(commands, 0, 0), number=number, repeat=repeat
+        )
+        return min(durations) / number
+
+    def test_instrumentation_overhead(self):
+        overheads = []
+        for name, commands, number in [
+            ("square", square_path(3, 10), 1000),
+            ("random walk", random_walk(10000, 100), 5),
+        ]:
+            with patch.object(instrumentation, "ENABLED", False):
+                off = self.measure(commands, number)
+            with patch.object(instrumentation, "ENABLED", True):
+                on = self.measure(commands, number)
+            REGISTRY.drain()
+            print(
+                f"\n{name} ({len(commands)} commands): off {off * 1e6:.1f} us, "
+                f"on {on * 1e6:.1f} us (+{(on - off) * 1e6:.1f} us)"
+            )
+            overheads.append(on - off)
+        # the cost is fixed, so it is measured on the small path, where it is
+        # not lost in the noise of the timing
+        self.assertLess(overheads[0], 30e-6)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+import tracemalloc
+import unittest
+from app.execute_commands_v2 import (
+    calculate_crossings_sweep,
+    count_points,
+    count_store_points,
+    create_lines,
+    create_segment_stores,
+    merge_segment_store,
+    merge_segments,
+    sweep_crossings,
+)
+
+
+def run_line_pipeline(commands):
+    horizontal_lines, vertical_lines = create_lines(0, 0, commands)
+    horizontal_lines = merge_segments(horizontal_lines)
+    vertical_lines = merge_segments(vertical_lines)
+    crossings = calculate_crossings_sweep(vertical_lines, horizontal_lines)
+    return count_points(horizontal_lines) + count_points(vertical_lines) - crossings
+
+
+def run_store_pipeline(commands):
+    horizontal, vertical = create_segment_stores(0, 0, commands)
+    horizontal = merge_segment_store(horizontal)
+    vertical = merge_segment_store(vertical)
+    crossings = sweep_crossings(
+        vertical.constants,
+        vertical.starts,
+        vertical.ends,
+        horizontal.constants,
+        horizontal.starts,
+        horizontal.ends,
+    )
+    return count_store_points(horizontal) + count_store_points(vertical) - crossings
+
+
+def peak_memory(pipeline, commands):
+    tracemalloc.start()
+    try:
+        result = pipeline(commands)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, peak
+
+
+class TestSegmentStoreMemory(unittest.TestCase):
+    def assert_lower_peak(self, name, commands):
+        line_result, line_peak = peak_memory(run_line_pipeline, commands)
+        store_result, store_peak = peak_memory(run_store_pipeline, commands)
+
+        print(
+            f"{name}: {len(commands)} commands, Line peak {line_peak / 1024:.0f} KiB, "
+            f"SegmentStore peak {store_peak / 1024:.0f} KiB "
+            f"({1 - store_peak / line_peak:.0%} lower)"
+        )
+        self.assertEqual(line_result, store_result)
+        self.assertLess(store_peak, line_peak)
+
+    def test_peak_memory_teeth_path(self):
+        commands = []
+        for _ in range(2500):
+            commands.extend(
+                [
+                    {"direction": "east", "steps": 1},
+                    {"direction": "south", "steps": 1},
+                    {"direction": "east", "steps": 1},
+                    {"direction": "north", "steps": 1},
+                ]
+            )
+        self.assert_lower_peak("teeth path", commands)
+
+    def test_peak_memory_realistic_path(self):
+        commands = []
+        for _ in range(2500):
+            commands.extend(
+                [
+                    {"direction": "north", "steps": 100000},
+                    {"direction": "east", "steps": 1},
+                    {"direction": "south", "steps": 100000},
+                    {"direction": "east", "steps": 1},
+                ]
+            )
+        self.assert_lower_peak("realistic path", commands)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+import random
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+from flask import json
+from app.execution_backend import InlineBackend, ProcessPoolBackend
+from app.main import app
+
+
+def random_walk(size):
+    rng = random.Random(size)
+    directions = ["north", "south", "east", "west"]
+    return [
+        {"direction": rng.choice(directions), "steps": rng.randint(1, 100000)}
+        for _ in range(size)
+    ]
+
+
+class TestMixedLoad(unittest.TestCase):
+    """
+    Sends large paths in the background and measures the latency of the health
+    endpoint and of small paths meanwhile, for the inline and the process pool
+    execution backends.
+    """
+
+    def measure(self, backend, large_requests=4, probes=50):
+        client = app.test_client()
+        large_payload = json.dumps(
+            {"start": {"x": 0, "y": 0}, "commmands": random_walk(10000)}
+        )
+        small_payload = json.dumps(
+            {"start": {"x": 0, "y": 0}, "commmands": random_walk(10)}
+        )
+
+        def post(payload):
+            return client.post(
+                "/robot-cleaning-service/enter-path",
+                data=payload,
+                content_type="application/json",
+            )
+
+        latencies = {"health": [], "small": []}
+        with patch("app.main.execution_backend", backend), patch(
+            "app.db_queries.ExecutionQueryService.add_execution",
+            return_value=MagicMock(timestamp="2023-01-01T00:00:00Z"),
+        ):
+            workers = [
+                threading.Thread(target=post, args=(large_payload,))
+                for _ in range(large_requests)
+            ]
+            for worker in workers:
+                worker.start()
+            for _ in range(probes):
+                start_time = time.perf_counter()
+                self.assertEqual(client.get("/health").status_code, 200)
+                latencies["health"].append(time.perf_counter() - start_time)
+
+                start_time = time.perf_counter()
+                self.assertEqual(post(small_payload).status_code, 201)
+                latencies["small"].append(time.perf_counter() - start_time)
+            for worker in workers:
+                worker.join()
+        return latencies
+
+    def test_mixed_load_latency(self):
+        process_backend = ProcessPoolBackend(
+            workers=2, queue_size=8, timeout=30, inline_max_size=100
+        )
+        process_backend.warm_up()
+        try:
+            for name, backend in (
+                ("inline", InlineBackend()),
+                ("process", process_backend),
+            ):
+                latencies = self.measure(backend)
+                for kind, values in latencies.items():
+                    values.sort()
+                    print(
+                        f"{name} backend, {kind}: "
+                        f"p50 {values[len(values) // 2] * 1000:.1f} ms, "
+                        f"p95 {values[int(len(values) * 0.95)] * 1000:.1f} ms"
+                    )
+        finally:
+            process_backend.shutdown()
+
+
+if __name__ == "__main__":
+    unittest.main()
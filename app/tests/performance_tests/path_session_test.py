@@ -0,0 +1,49 @@
+import time
+import unittest
+
+from app.execute_commands_v2 import execute_commands_v2
+from app.path_session import PathSession
+
+
+def stacked_rows(rows: int, columns: int, length: int):
+    """Short rows stacked on top of each other, then long columns across them."""
+    commands = []
+    for _ in range(rows):
+        commands += [
+            {"direction": "east", "steps": 3},
+            {"direction": "north", "steps": 1},
+            {"direction": "west", "steps": 3},
+            {"direction": "north", "steps": 1},
+        ]
+    for column in range(columns):
+        commands += [
+            {"direction": "south" if column % 2 == 0 else "north", "steps": length},
+            {"direction": "east", "steps": 1},
+        ]
+    return commands
+
+
+class TestPathSessionPerformance(unittest.TestCase):
+    """
+    Each command of a session counts its crossings among the lines that
+    cover it only, not among every line in its range: long columns across
+    thousands of rows stay within a few times a full V2 run.
+    """
+
+    def test_long_columns_across_many_rows(self):
+        commands = stacked_rows(5000, 2500, 10000)
+
+        start_time = time.perf_counter()
+        visited = PathSession(0, 0).extend(commands)
+        session = time.perf_counter() - start_time
+        result, v2 = execute_commands_v2(commands, 0, 0)
+        print(
+            f"\n{len(commands)} commands: session {session * 1000:.0f} ms, "
+            f"V2 {v2 * 1000:.0f} ms"
+        )
+        self.assertEqual(visited, result)
+        self.assertLess(session, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
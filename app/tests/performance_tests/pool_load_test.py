@@ -0,0 +1,106 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+from unittest.mock import patch
+from flask import json
+from app import get_db
+from app.db_pool import pool_metrics
+from app.main import app
+
+db = get_db()
+
+# concurrent requests the service is sized for
+TARGET_CONCURRENCY = 32
+REQUESTS_PER_CLIENT = 25
+
+
+class TestPoolLoad(unittest.TestCase):
+    """
+    Sends requests from `TARGET_CONCURRENCY` threads at once, reads and
+    writes mixed, with the default pool configuration, and checks that no
+    checkout timed out and that the pool never opened more connections than
+    its size plus overflow.
+    """
+
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp(suffix=".db")
+        os.close(handle)
+        self.config = patch.dict(
+            app.config, {"SQLALCHEMY_DATABASE_URI": f"sqlite:///{self.path}"}
+        )
+        self.config.start()
+        with app.app_context():
+            db.create_all()
+
+    def tearDown(self):
+        with app.app_context():
+            db.engine.dispose()
+        self.config.stop()
+        os.remove(self.path)
+
+    def test_no_connection_exhaustion(self):
+        payload = json.dumps(
+            {
+                "start": {"x": 0, "y": 0},
+                "commmands": [{"direction": "north", "steps": 10}] * 10,
+            }
+        )
+        statuses = []
+        latencies = []
+        lock = threading.Lock()
+        barrier = threading.Barrier(TARGET_CONCURRENCY)
+
+        def client_loop(index):
+            client = app.test_client()
+            barrier.wait()
+            for request_index in range(REQUESTS_PER_CLIENT):
+                start_time = time.perf_counter()
+                if (index + request_index) % 2:
+                    response = client.post(
+                        "/robot-cleaning-service/enter-path",
+                        data=payload,
+                        content_type="application/json",
+                    )
+                else:
+                    response = client.get(
+                        "/robot-cleaning-service/get-last-executions?limit=20"
+                    )
+                latency = time.perf_counter() - start_time
+                with lock:
+                    statuses.append(response.status_code)
+                    latencies.append(latency)
+
+        clients = [
+            threading.Thread(target=client_loop, args=(index,))
+            for index in range(TARGET_CONCURRENCY)
+        ]
+        start_time = time.perf_counter()
+        for client in clients:
+            client.start()
+        for client in clients:
+            client.join()
+        elapsed = time.perf_counter() - start_time
+
+        with app.app_context():
+            metrics = pool_metrics(db.engine.pool)
+        latencies.sort()
+        print(
+            f"{len(statuses)} requests from {TARGET_CONCURRENCY} clients in "
+            f"{elapsed:.2f}s, p50 {latencies[len(latencies) // 2] * 1000:.1f}ms, "
+            f"p99 {latencies[int(len(latencies) * 0.99)] * 1000:.1f}ms"
+        )
+        print(f"pool: {metrics}")
+
+        self.assertEqual(sorted(set(statuses)), [200, 201])
+        self.assertEqual(metrics["timeouts"], 0)
+        self.assertEqual(metrics["checked_out"], 0)
+        self.assertLessEqual(
+            metrics["peak_checked_out"], metrics["size"] + metrics["max_overflow"]
+        )
+        self.assertGreaterEqual(metrics["checkouts"], len(statuses))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,181 @@
+"""
+Measures the cold start of the service: the time from a fresh interpreter to
+the first response, as a serverless runtime sees it.
+
+Every run starts a new interpreter that imports `app.main` and answers one
+request with the Flask test client, on a temporary SQLite database. The
+medians of the import time and of the import-to-first-response time are
+printed, with, from one more run under `python -X importtime`, the import
+time of every top-level package. `--budget` makes the command exit with
+status 1 when the median time to the first response is above it.
+
+Usage:
+    PYTHONPATH=. python app/tests/performance_tests/startup.py \
+        [--request health|enter-path] [--runs 7] [--top 10] [--budget 0.5] \
+        [--output startup.json]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from collections import defaultdict
+from typing import Any, Dict, List, NamedTuple
+
+# the request answered by each run, from a fresh interpreter
+FIRST_REQUEST = """
+import json, sys, time
+start_time = time.perf_counter()
+from app.main import app
+import_time = time.perf_counter() - start_time
+client = app.test_client()
+if sys.argv[1] == "health":
+    response = client.get("/health")
+else:
+    response = client.post(
+        "/robot-cleaning-service/enter-path",
+        json={"start": {"x": 0, "y": 0}, "commmands": [
+            {"direction": "north", "steps": 2}, {"direction": "east", "steps": 2}
+        ]},
+    )
+print(json.dumps({
+    "status": response.status_code,
+    "import": import_time,
+    "first_response": time.perf_counter() - start_time,
+    "modules": sorted(name for name in sys.modules if "." not in name),
+}))
+"""
+
+CREATE_TABLES = """
+from app import get_db
+from app.main import app
+db = get_db()
+with app.app_context():
+    db.create_all()
+"""
+
+
+class ImportTime(NamedTuple):
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+def parse_importtime(output: str) -> List[ImportTime]:
+    """
+    Parses the report `python -X importtime` writes to stderr, e.g.
+    `import time:       123 |       4567 |   flask.app`.
+
+    Returns:
+        List[ImportTime]: Every import, with its self and cumulative times in
+        microseconds, and its depth in the import tree (0 for the imports of
+        the script).
+    """
+    imports = []
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        if not self_us.strip().isdigit():
+            # the header
+            continue
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        imports.append(
+            ImportTime(name.strip(), int(self_us), int(cumulative_us), depth)
+        )
+    return imports
+
+
+def package_times(imports: List[ImportTime]) -> Dict[str, int]:
+    """
+    Returns:
+        Dict[str, int]: The import time of every top-level package, in
+        microseconds: the sum of the self times of its modules, from the
+        slowest to the fastest.
+    """
+    totals = defaultdict(int)
+    for entry in imports:
+        totals[entry.module.split(".")[0]] += entry.self_us
+    return dict(sorted(totals.items(), key=lambda item: -item[1]))
+
+
+def first_request(request: str, environment: Dict[str, str]) -> Dict[str, Any]:
+    output = subprocess.run(
+        [sys.executable, "-c", FIRST_REQUEST, request],
+        env=environment,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+def run(args, environment: Dict[str, str]) -> Dict[str, Any]:
+    runs = [first_request(args.request, environment) for _ in range(args.runs)]
+    statuses = {item["status"] for item in runs}
+    importtime = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        env=environment,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stderr
+    return {
+        "request": args.request,
+        "statuses": sorted(statuses),
+        "import": statistics.median(item["import"] for item in runs),
+        "first_response": statistics.median(item["first_response"] for item in runs),
+        "packages": package_times(parse_importtime(importtime)),
+        "modules": runs[-1]["modules"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--request", choices=["health", "enter-path"], default="health")
+    parser.add_argument("--runs", type=int, default=7)
+    parser.add_argument("--top", type=int, default=10, help="packages to print")
+    parser.add_argument("--budget", type=float, help="seconds to the first response")
+    parser.add_argument("--output")
+    args = parser.parse_args()
+
+    handle, database = tempfile.mkstemp(suffix=".db")
+    os.close(handle)
+    # the configuration is in the environment, as on a serverless runtime
+    environment = dict(
+        os.environ, DATABASE_URI=f"sqlite:///{database}", PYTHONPATH=os.getcwd()
+    )
+    try:
+        subprocess.run(
+            [sys.executable, "-c", CREATE_TABLES], env=environment, check=True
+        )
+        results = run(args, environment)
+    finally:
+        os.remove(database)
+
+    print(
+        f"{args.request}: import {results['import'] * 1000:.1f} ms, "
+        f"first response {results['first_response'] * 1000:.1f} ms "
+        f"(median of {args.runs} runs, status {results['statuses']})"
+    )
+    print("Import time by package (python -X importtime):")
+    for package, microseconds in list(results["packages"].items())[: args.top]:
+        print(f"  {package:<24} {microseconds / 1000:>8.1f} ms")
+    if args.output:
+        with open(args.output, "w") as output_file:
+            json.dump(results, output_file, indent=2)
+            output_file.write("\n")
+
+    if args.budget is not None and results["first_response"] > args.budget:
+        print(
+            f"The first response takes {results['first_response']:.3f}s, "
+            f"above the budget of {args.budget:g}s"
+        )
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
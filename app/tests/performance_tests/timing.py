@@ -0,0 +1,10 @@
+import timeit
+from typing import Any, Callable
+
+
+def measure(fn: Callable[[], Any], repeat: int = 3) -> float:
+    """
+    Returns:
+        float: The fastest of `repeat` calls of `fn`, in seconds.
+    """
+    return min(timeit.repeat(fn, number=1, repeat=repeat))
@@ -0,0 +1,41 @@
+import unittest
+
+import jsonschema
+
+from app.normalize_commands import normalize_commands
+from app.tests.performance_tests.timing import measure
+from app.tests.performance_tests.workloads import random_walk, realistic_path
+from app.validation import ENTER_PATH_SCHEMA, parse_enter_path
+
+
+class TestValidationSpeed(unittest.TestCase):
+    """
+    Compares the generic jsonschema validation followed by the normalization
+    (what flask_inputs did for every request) with `parse_enter_path`, which
+    does both in one pass.
+    """
+
+    def test_validation_speed(self):
+        def generic(data):
+            jsonschema.validate(data, ENTER_PATH_SCHEMA)
+            return normalize_commands(data["commmands"])
+
+        for name, commands in [
+            ("realistic", realistic_path(2500, 50)),
+            ("random walk", random_walk(10000, 100000)),
+        ]:
+            data = {"start": {"x": 0, "y": 0}, "commmands": commands}
+            self.assertEqual(parse_enter_path(data).normalized, generic(data)[0])
+            generic_duration = measure(lambda: generic(data), repeat=5)
+            single_pass_duration = measure(lambda: parse_enter_path(data), repeat=5)
+            print(
+                f"\n{name} ({len(commands)} commands): jsonschema + normalization "
+                f"{generic_duration * 1000:.2f} ms, single pass "
+                f"{single_pass_duration * 1000:.2f} ms "
+                f"({generic_duration / single_pass_duration:.0f}x)"
+            )
+            self.assertLess(single_pass_duration, generic_duration)
+
+
+if __name__ == "__main__":
+    unittest.main()
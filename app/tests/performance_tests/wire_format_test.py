@@ -0,0 +1,39 @@
+import json
+import unittest
+
+from app.tests.performance_tests.timing import measure
+from app.tests.performance_tests.workloads import random_walk, realistic_path
+from app.validation import parse_enter_path
+from app.wire_format import decode_path, encode_path
+
+
+class TestWireFormatSize(unittest.TestCase):
+    """
+    Compares the JSON and the `application/x-robot-path` bodies of the same
+    paths: bytes on the wire, and the time to turn them into engine input
+    (parse and validate for JSON, decode for the binary format).
+    """
+
+    def test_wire_format(self):
+        for name, commands in [
+            ("realistic", realistic_path(2500, 50)),
+            ("random walk", random_walk(10000, 100000)),
+        ]:
+            json_body = json.dumps({"start": {"x": 0, "y": 0}, "commmands": commands})
+            binary_body = encode_path(0, 0, commands)
+
+            json_duration = measure(
+                lambda: parse_enter_path(json.loads(json_body)), repeat=5
+            )
+            binary_duration = measure(lambda: decode_path(binary_body), repeat=5)
+            print(
+                f"\n{name} ({len(commands)} commands): JSON {len(json_body)} bytes "
+                f"decoded in {json_duration * 1000:.2f} ms, binary "
+                f"{len(binary_body)} bytes decoded in {binary_duration * 1000:.3f} ms"
+            )
+            self.assertLess(len(binary_body) * 5, len(json_body))
+            self.assertLess(binary_duration, json_duration)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,112 @@
+import random
+from typing import List, Dict
+
+Commands = List[Dict[str, int]]
+
+
+def square_path(size: int, steps: int) -> Commands:
+    """`size` loops around the same square of side `steps`."""
+    commands = []
+    for _ in range(size):
+        commands.extend(
+            [
+                {"direction": "east", "steps": steps},
+                {"direction": "south", "steps": steps},
+                {"direction": "west", "steps": steps},
+                {"direction": "north", "steps": steps},
+            ]
+        )
+    return commands
+
+
+def teeth_path(size: int, steps: int = 1) -> Commands:
+    """A comb of `size` teeth: many short lines and no overlaps."""
+    commands = []
+    for _ in range(size):
+        commands.extend(
+            [
+                {"direction": "east", "steps": steps},
+                {"direction": "south", "steps": steps},
+                {"direction": "east", "steps": steps},
+                {"direction": "north", "steps": steps},
+            ]
+        )
+    return commands
+
+
+def realistic_path(size: int, steps: int = 100000) -> Commands:
+    """Long back-and-forth lines one cell apart, like a robot cleaning a room."""
+    commands = []
+    for _ in range(size):
+        commands.extend(
+            [
+                {"direction": "north", "steps": steps},
+                {"direction": "east", "steps": 1},
+                {"direction": "south", "steps": steps},
+                {"direction": "east", "steps": 1},
+            ]
+        )
+    return commands
+
+
+def random_walk(size: int, steps: int, seed: int = 0) -> Commands:
+    """`size` commands in random directions with 1 to `steps` steps each."""
+    rng = random.Random(seed)
+    directions = ["north", "south", "east", "west"]
+    return [
+        {"direction": rng.choice(directions), "steps": rng.randint(1, steps)}
+        for _ in range(size)
+    ]
+
+
+def spiral_path(size: int, steps: int = 1) -> Commands:
+    """
+    An outward square spiral of `size` commands, `steps` cells between two
+    turns: every line is longer than the previous one and nothing overlaps.
+    """
+    directions = ["east", "north", "west", "south"]
+    return [
+        {"direction": directions[index % 4], "steps": (index // 2 + 1) * steps}
+        for index in range(size)
+    ]
+
+
+def adversarial_grid(size: int, spacing: int = 2) -> Commands:
+    """
+    `size` horizontal lines, then `size` vertical lines across them, `spacing`
+    cells apart: about size² crossings, the worst case of the sweep, in a
+    bounding box of (size * spacing)² cells.
+    """
+    length = size * spacing
+    commands = []
+    for row in range(size):
+        commands.append(
+            {"direction": "east" if row % 2 == 0 else "west", "steps": length}
+        )
+        commands.append({"direction": "north", "steps": spacing})
+    if size % 2:
+        commands.append({"direction": "west", "steps": length})
+    commands.append({"direction": "south", "steps": length + spacing})
+    for column in range(size):
+        commands.append(
+            {"direction": "north" if column % 2 == 0 else "south", "steps": length}
+        )
+        commands.append({"direction": "east", "steps": spacing})
+    return commands
+
+
+def fleet(robots: int, size: int, steps: int = 10, spacing: int = 150) -> list:
+    """
+    `robots` random walks of `size` commands, started on a square grid
+    `spacing` cells apart like robots docked across one facility: the
+    (commands, x, y) tuples of `app.fleet_coverage.execute_fleet_commands`.
+    """
+    columns = max(1, int(robots**0.5))
+    return [
+        (
+            random_walk(size, steps, seed=robot),
+            (robot % columns) * spacing,
+            (robot // columns) * spacing,
+        )
+        for robot in range(robots)
+    ]
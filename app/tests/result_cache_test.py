@@ -0,0 +1,102 @@
+import unittest
+from app.result_cache import (
+    InMemoryStore,
+    ResultCache,
+    cache_key,
+    canonicalize_commands,
+)
+from app.normalize_commands import normalize_commands
+
+
+def normalized_key(commands, width=1):
+    return cache_key(normalize_commands(commands)[0], width)
+
+
+class TestCanonicalizeCommands(unittest.TestCase):
+    def test_merges_and_drops_commands(self):
+        commands = [
+            {"direction": "north", "steps": 5},
+            {"direction": "north", "steps": 0},
+            {"direction": "north", "steps": 3},
+            {"direction": "east", "steps": 0},
+            {"direction": "south", "steps": 4},
+        ]
+        self.assertEqual(canonicalize_commands(commands), [("north", 8), ("south", 4)])
+
+    def test_cache_key(self):
+        self.assertEqual(
+            normalized_key([{"direction": "east", "steps": 2}]),
+            normalized_key(
+                [
+                    {"direction": "east", "steps": 1},
+                    {"direction": "north", "steps": 0},
+                    {"direction": "east", "steps": 1},
+                ]
+            ),
+        )
+        self.assertNotEqual(
+            normalized_key([{"direction": "east", "steps": 2}]),
+            normalized_key([{"direction": "west", "steps": 2}]),
+        )
+        self.assertEqual(
+            normalized_key([]), normalized_key([{"direction": "east", "steps": 0}])
+        )
+        self.assertEqual(
+            normalized_key(
+                [
+                    {"direction": "north", "steps": 10},
+                    {"direction": "south", "steps": 4},
+                    {"direction": "north", "steps": 2},
+                    {"direction": "south", "steps": 7},
+                ]
+            ),
+            normalized_key(
+                [
+                    {"direction": "north", "steps": 10},
+                    {"direction": "south", "steps": 9},
+                ]
+            ),
+        )
+
+    def test_cache_key_hashes_the_commands_as_given(self):
+        commands = [{"direction": "east", "steps": 1}] * 2
+        self.assertNotEqual(
+            cache_key(commands), cache_key([{"direction": "east", "steps": 2}])
+        )
+        self.assertEqual(cache_key(commands), cache_key(list(commands)))
+
+    def test_cache_key_width(self):
+        commands = [{"direction": "east", "steps": 2}]
+        self.assertEqual(cache_key(commands), cache_key(commands, 1))
+        self.assertNotEqual(cache_key(commands), cache_key(commands, 3))
+        self.assertNotEqual(cache_key(commands, 3), cache_key(commands, 4))
+
+
+class TestResultCache(unittest.TestCase):
+    def test_lru_eviction(self):
+        cache = ResultCache(max_entries=2)
+        cache.put(b"a", 1)
+        cache.put(b"b", 2)
+        self.assertEqual(cache.get(b"a"), 1)
+        cache.put(b"c", 3)
+
+        self.assertIsNone(cache.get(b"b"))
+        self.assertEqual(cache.get(b"a"), 1)
+        self.assertEqual(cache.get(b"c"), 3)
+        self.assertEqual(
+            cache.stats(),
+            {"entries": 2, "max_entries": 2, "hits": 3, "misses": 1, "evictions": 1},
+        )
+
+    def test_shared_store(self):
+        shared_store = InMemoryStore()
+        ResultCache(max_entries=2, shared_store=shared_store).put(b"a", 1)
+
+        cache = ResultCache(max_entries=2, shared_store=shared_store)
+        self.assertEqual(cache.get(b"a"), 1)
+        self.assertEqual(cache.stats()["hits"], 1)
+        self.assertEqual(cache.stats()["entries"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,250 @@
+import datetime
+import os
+import random
+import tempfile
+import unittest
+from unittest.mock import patch
+from flask import json
+from app import get_db
+from app.db_queries import ExecutionQueryService, ExecutionWriteBuffer, RollupBuffer
+from app.main import app
+from app.models import Execution
+from app.rollups import aggregate, bin_duration, duration_bin, percentile
+from app.validation import InvalidInputError, parse_stats_query
+
+db = get_db()
+
+START = datetime.datetime(2023, 1, 1, 10, 0)
+
+
+def execution_rows(count, seed=0):
+    rng = random.Random(seed)
+    return [
+        {
+            "timestamp": START + datetime.timedelta(seconds=rng.randint(0, 7199)),
+            "commands": rng.randint(0, 100),
+            "result": rng.randint(1, 1000),
+            "duration": rng.lognormvariate(-6, 1),
+        }
+        for _ in range(count)
+    ]
+
+
+class TestRollupFunctions(unittest.TestCase):
+    def test_duration_bins(self):
+        self.assertEqual(duration_bin(0), 0)
+        for duration in (1e-5, 0.0123, 2.5, 30):
+            self.assertLess(
+                abs(bin_duration(duration_bin(duration)) / duration - 1), 0.045
+            )
+
+    def test_percentile(self):
+        durations = [row["duration"] for row in execution_rows(2000)]
+        histogram = {}
+        for duration in durations:
+            histogram[duration_bin(duration)] = (
+                histogram.get(duration_bin(duration), 0) + 1
+            )
+        exact = sorted(durations)
+        for q in (50, 95, 99):
+            estimate = percentile(histogram, len(durations), q)
+            self.assertLess(
+                abs(estimate / exact[int(q / 100 * len(exact)) - 1] - 1), 0.1
+            )
+
+    def test_aggregate(self):
+        rows = [
+            {"timestamp": START, "commands": 2, "result": 3, "duration": 0.5},
+            {
+                "timestamp": START + datetime.timedelta(seconds=59),
+                "commands": 4,
+                "result": 5,
+                "duration": 0.5,
+            },
+            {
+                "timestamp": START + datetime.timedelta(minutes=1),
+                "commands": 1,
+                "result": 1,
+                "duration": 1.0,
+            },
+        ]
+        rollups, histogram = aggregate(rows)
+        self.assertEqual(
+            [
+                (
+                    row["resolution"],
+                    row["bucket_start"],
+                    row["executions"],
+                    row["total_commands"],
+                )
+                for row in rollups
+            ],
+            [
+                ("hour", START, 3, 7),
+                ("minute", START, 2, 6),
+                ("minute", START + datetime.timedelta(minutes=1), 1, 1),
+            ],
+        )
+        self.assertEqual(sum(row["executions"] for row in histogram), 6)
+
+
+class TestParseStatsQuery(unittest.TestCase):
+    def test_defaults(self):
+        self.assertEqual(
+            parse_stats_query({}, now=START),
+            ("minute", START - datetime.timedelta(hours=1), START),
+        )
+
+    def test_invalid(self):
+        for args in [
+            {"resolution": "day"},
+            {"since": "yesterday"},
+            {"since": "2023-01-02T00:00", "until": "2023-01-01T00:00"},
+            {"since": "2023-01-01T00:00", "until": "2023-01-03T00:00"},
+        ]:
+            with self.assertRaises(InvalidInputError):
+                parse_stats_query(args, now=START)
+
+
+class TestStats(unittest.TestCase):
+    def setUp(self):
+        """Point the application to a temporary SQLite database."""
+        handle, self.path = tempfile.mkstemp(suffix=".db")
+        os.close(handle)
+        self.config = patch.dict(
+            app.config, {"SQLALCHEMY_DATABASE_URI": f"sqlite:///{self.path}"}
+        )
+        self.config.start()
+        self.service = ExecutionQueryService(db)
+        with app.app_context():
+            db.create_all()
+
+    def tearDown(self):
+        self.config.stop()
+        os.remove(self.path)
+
+    def test_rollups_follow_every_write_path(self):
+        rows = execution_rows(300)
+        with app.app_context():
+            for row in rows[:10]:
+                with patch("app.db_queries.datetime") as mock_datetime:
+                    mock_datetime.datetime.utcnow.return_value = row["timestamp"]
+                    self.service.add_execution(
+                        row["commands"], row["result"], row["duration"]
+                    )
+            self.service.insert_executions(rows[10:200])
+        write_buffer = ExecutionWriteBuffer(app, db, max_interval=60)
+        for row in rows[200:]:
+            write_buffer.add(row)
+        write_buffer.close()
+
+        with app.app_context():
+            hours = self.service.get_stats(
+                "hour", START, START + datetime.timedelta(hours=2)
+            )
+            minutes = self.service.get_stats(
+                "minute", START, START + datetime.timedelta(hours=2)
+            )
+            self.assertEqual(
+                [bucket["executions"] for bucket in hours],
+                [
+                    sum(1 for row in rows if row["timestamp"].hour == hour)
+                    for hour in (10, 11)
+                ],
+            )
+            self.assertEqual(sum(bucket["executions"] for bucket in minutes), 300)
+            self.assertEqual(
+                sum(bucket["commands"] for bucket in minutes),
+                sum(row["commands"] for row in rows),
+            )
+
+            incremental = self.service.get_stats(
+                "minute", START, START + datetime.timedelta(hours=2)
+            )
+            self.service.rebuild_rollups(batch_size=70)
+            rebuilt = self.service.get_stats(
+                "minute", START, START + datetime.timedelta(hours=2)
+            )
+            self.assertEqual(len(rebuilt), len(incremental))
+            for before, after in zip(incremental, rebuilt):
+                self.assertEqual(before["executions"], after["executions"])
+                self.assertAlmostEqual(before["mean_duration"], after["mean_duration"])
+                self.assertEqual(before["p95_duration"], after["p95_duration"])
+
+    def test_rollup_buffer(self):
+        rows = execution_rows(30)
+        rollup_buffer = RollupBuffer(app, db, max_interval=60)
+        service = ExecutionQueryService(db, rollup_buffer=rollup_buffer)
+        with app.app_context():
+            for row in rows[:10]:
+                with patch("app.db_queries.datetime") as mock_datetime:
+                    mock_datetime.datetime.utcnow.return_value = row["timestamp"]
+                    service.add_execution(
+                        row["commands"], row["result"], row["duration"]
+                    )
+            with patch("app.db_queries.datetime") as mock_datetime:
+                mock_datetime.datetime.utcnow.return_value = START
+                service.add_executions(
+                    [
+                        (row["commands"], row["result"], row["duration"])
+                        for row in rows[10:]
+                    ]
+                )
+            # the executions are committed, their rollups wait for the flush
+            self.assertEqual(db.session.query(Execution).count(), 30)
+            until = START + datetime.timedelta(hours=2)
+            self.assertEqual(self.service.get_stats("hour", START, until), [])
+        self.assertEqual(rollup_buffer.flush(), 30)
+        rollup_buffer.close()
+        with app.app_context():
+            hours = self.service.get_stats("hour", START, until)
+            self.assertEqual(sum(bucket["executions"] for bucket in hours), 30)
+            self.assertEqual(
+                sum(bucket["commands"] for bucket in hours),
+                sum(row["commands"] for row in rows),
+            )
+
+    def test_rebuild_rollups_command(self):
+        rows = execution_rows(50)
+        with app.app_context():
+            # executions stored before the rollup tables existed
+            db.session.execute(Execution.__table__.insert(), rows)
+            db.session.commit()
+        result = app.test_cli_runner().invoke(
+            args=["rebuild-rollups", "--batch-size", "20"]
+        )
+        self.assertEqual(result.exit_code, 0, result.output)
+        with app.app_context():
+            minutes = self.service.get_stats(
+                "minute", START, START + datetime.timedelta(hours=2)
+            )
+            self.assertEqual(sum(bucket["executions"] for bucket in minutes), 50)
+
+    def test_endpoint(self):
+        with app.app_context():
+            self.service.insert_executions(execution_rows(50))
+        response = app.test_client().get(
+            "/robot-cleaning-service/stats",
+            query_string={
+                "resolution": "hour",
+                "since": "2023-01-01T10:00",
+                "until": "2023-01-01T11:00",
+            },
+        )
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.data)
+        self.assertEqual(data["resolution"], "hour")
+        self.assertEqual(len(data["buckets"]), 1)
+        bucket = data["buckets"][0]
+        self.assertEqual(bucket["start"], "2023-01-01T10:00:00")
+        self.assertLessEqual(bucket["p50_duration"], bucket["p95_duration"])
+        self.assertLessEqual(bucket["p95_duration"], bucket["p99_duration"])
+
+        response = app.test_client().get(
+            "/robot-cleaning-service/stats?resolution=week"
+        )
+        self.assertEqual(response.status_code, 400)
+
+
+if __name__ == "__main__":
+    unittest.main()
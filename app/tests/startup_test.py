@@ -0,0 +1,80 @@
+import json
+import os
+import subprocess
+import sys
+import unittest
+from unittest.mock import patch
+from app import create_app, get_db, load_environment
+from app.tests.performance_tests.startup import (
+    ImportTime,
+    package_times,
+    parse_importtime,
+)
+
+# modules the first request of a serverless runtime must not wait for
+DEFERRED_MODULES = ["flask_migrate", "alembic", "jsonschema", "sqlalchemy"]
+
+HEALTH_CHECK = """
+import json, sys
+from app.main import app
+status = app.test_client().get("/health").status_code
+print(json.dumps([status, sorted(name for name in sys.modules if "." not in name)]))
+"""
+
+
+class TestParseImporttime(unittest.TestCase):
+    def test_parse(self):
+        output = "\n".join(
+            [
+                "import time: self [us] | cumulative | imported package",
+                "import time:       100 |        100 |   flask.json",
+                "import time:        50 |        150 | flask",
+                "import time:        20 |         20 |     jinja2.utils",
+                "import time:        30 |         50 |   jinja2",
+            ]
+        )
+        imports = parse_importtime(output)
+        self.assertEqual(imports[0], ImportTime("flask.json", 100, 100, 1))
+        self.assertEqual(imports[1], ImportTime("flask", 50, 150, 0))
+        self.assertEqual(imports[2].depth, 2)
+        self.assertEqual(package_times(imports), {"flask": 150, "jinja2": 50})
+
+
+class TestStartup(unittest.TestCase):
+    def test_load_environment(self):
+        with patch("dotenv.load_dotenv") as load_dotenv:
+            with patch.dict(os.environ, {"DATABASE_URI": "sqlite://"}):
+                load_environment()
+            load_dotenv.assert_not_called()
+
+            with patch.dict(os.environ):
+                os.environ.pop("DATABASE_URI", None)
+                load_environment()
+            load_dotenv.assert_called_once()
+
+    def test_get_db_registers_deferred_apps(self):
+        with patch.dict(os.environ, {"DATABASE_URI": "sqlite://"}):
+            os.environ.pop("FLASK_RUN_FROM_CLI", None)
+            # the same whether or not `db` was imported before the application
+            for _ in range(2):
+                app = create_app()
+                self.assertNotIn("sqlalchemy", app.extensions)
+                db = get_db()
+                self.assertIs(app.extensions["sqlalchemy"].db, db)
+
+    def test_health_check_defers_database_and_tooling(self):
+        output = subprocess.run(
+            [sys.executable, "-c", HEALTH_CHECK],
+            env=dict(os.environ, DATABASE_URI="sqlite://", PYTHONPATH=os.getcwd()),
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        status, modules = json.loads(output.splitlines()[-1])
+        self.assertEqual(status, 200)
+        for module in DEFERRED_MODULES:
+            self.assertNotIn(module, modules)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,176 @@
+import copy
+import random
+import unittest
+
+import jsonschema
+
+from app.normalize_commands import normalize_commands
+from app.validation import (
+    ENTER_PATH_SCHEMA,
+    MAX_BATCH_JOBS,
+    InvalidInputError,
+    parse_enter_path,
+    parse_enter_paths,
+)
+
+INVALID_VALUES = [None, True, -1, 1.5, "north", "", [], {}, 100001, -100001, 2.0]
+
+
+def jsonschema_errors(data):
+    """The errors flask_inputs reported for the enter-path schema."""
+    try:
+        jsonschema.validate(data, ENTER_PATH_SCHEMA)
+    except jsonschema.ValidationError as e:
+        return [e.message]
+    return None
+
+
+class TestParseEnterPath(unittest.TestCase):
+    def test_valid_path(self):
+        data = {
+            "start": {"x": 10, "y": -22},
+            "commmands": [
+                {"direction": "north", "steps": 2},
+                {"direction": "north", "steps": 0},
+                {"direction": "north", "steps": 3},
+                {"direction": "east", "steps": 1},
+            ],
+        }
+        path = parse_enter_path(data)
+        self.assertEqual((path.x, path.y), (10, -22))
+        self.assertIs(path.commands, data["commmands"])
+        self.assertEqual(
+            (path.normalized, path.normalization), normalize_commands(data["commmands"])
+        )
+
+    def test_integral_floats(self):
+        path = parse_enter_path(
+            {
+                "start": {"x": 1.0, "y": 0},
+                "commmands": [{"direction": "east", "steps": 2.0}],
+            }
+        )
+        self.assertEqual((path.x, path.normalized[0]["steps"]), (1, 2))
+        self.assertIs(type(path.normalized[0]["steps"]), int)
+
+    def test_width(self):
+        data = {"start": {"x": 0, "y": 0}, "commmands": []}
+        self.assertEqual(parse_enter_path(data).width, 1)
+        self.assertEqual(parse_enter_path({**data, "width": 5.0}).width, 5)
+        for width, message in [
+            (0, "0 is less than the minimum of 1"),
+            (1001, "1001 is greater than the maximum of 1000"),
+            ("5", "'5' is not of type 'integer'"),
+        ]:
+            with self.assertRaises(InvalidInputError) as context:
+                parse_enter_path({**data, "width": width})
+            self.assertEqual(context.exception.errors, [message])
+
+    def test_error_messages(self):
+        for data, message in [
+            (None, "None is not of type 'object'"),
+            ({"start": {"x": 0, "y": 0}}, "'commmands' is a required property"),
+            (
+                {"start": {"x": 0}, "commmands": [{"direction": "up", "steps": 1}]},
+                "'y' is a required property",
+            ),
+            (
+                {
+                    "start": {"x": 0, "y": 0},
+                    "commmands": [{"direction": "up", "steps": 1}],
+                },
+                "'up' is not one of ['north', 'south', 'east', 'west']",
+            ),
+            (
+                {
+                    "start": {"x": 0, "y": 0},
+                    "commmands": [{"direction": "east", "steps": -1}],
+                },
+                "-1 is less than the minimum of 0",
+            ),
+            (
+                {
+                    "start": {"x": 0, "y": 0},
+                    "commmands": [{"direction": "east", "steps": 10**15}],
+                },
+                "1000000000000000 is greater than the maximum of 1000000000000",
+            ),
+        ]:
+            with self.assertRaises(InvalidInputError) as context:
+                parse_enter_path(data)
+            self.assertEqual(context.exception.errors, [message])
+
+    def test_matches_jsonschema(self):
+        rng = random.Random(12)
+        valid = {
+            "start": {"x": 0, "y": 0},
+            "commmands": [
+                {"direction": "north", "steps": 1},
+                {"direction": "west", "steps": 4, "extra": 1},
+            ],
+        }
+        locations = [
+            (),
+            ("start",),
+            ("start", "x"),
+            ("start", "y"),
+            ("commmands",),
+            ("commmands", 0),
+            ("commmands", 1, "direction"),
+            ("commmands", 1, "steps"),
+            ("width",),
+        ]
+        for _ in range(500):
+            data = copy.deepcopy(valid)
+            for _ in range(rng.randint(1, 3)):
+                location = rng.choice(locations)
+                if not location:
+                    data = rng.choice(INVALID_VALUES)
+                    continue
+                parent = data
+                try:
+                    for key in location[:-1]:
+                        parent = parent[key]
+                    if rng.random() < 0.3 and isinstance(parent, dict):
+                        parent.pop(location[-1], None)
+                    else:
+                        parent[location[-1]] = rng.choice(INVALID_VALUES)
+                except (KeyError, IndexError, TypeError):
+                    pass
+
+            expected = jsonschema_errors(data)
+            if expected is None:
+                parse_enter_path(data)
+            else:
+                with self.assertRaises(InvalidInputError) as context:
+                    parse_enter_path(data)
+                self.assertEqual(context.exception.errors, expected, data)
+
+    def test_too_many_commands(self):
+        data = {
+            "start": {"x": 0, "y": 0},
+            "commmands": [{"direction": "north", "steps": 1}] * 10001,
+        }
+        with self.assertRaises(InvalidInputError) as context:
+            parse_enter_path(data)
+        self.assertEqual(context.exception.errors, jsonschema_errors(data))
+
+
+class TestParseEnterPaths(unittest.TestCase):
+    def test_jobs(self):
+        jobs = parse_enter_paths(
+            [{"start": {"x": 0, "y": 0}, "commmands": []}, {"commmands": []}]
+        )
+        self.assertEqual(jobs[0].normalized, [])
+        self.assertEqual(jobs[1].errors, ["'start' is a required property"])
+
+    def test_invalid_batch(self):
+        with self.assertRaises(InvalidInputError) as context:
+            parse_enter_paths({})
+        self.assertEqual(context.exception.errors, ["{} is not of type 'array'"])
+        with self.assertRaises(InvalidInputError):
+            parse_enter_paths([{}] * (MAX_BATCH_JOBS + 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
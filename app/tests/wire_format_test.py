@@ -0,0 +1,80 @@
+import struct
+import unittest
+
+import numpy as np
+
+from app.execute_commands_numpy import execute_arrays_numpy
+from app.execute_commands_v2 import execute_commands_v2
+from app.result_cache import records_cache_key
+from app.validation import InvalidInputError
+from app.wire_format import decode_path, encode_path
+
+
+class TestWireFormat(unittest.TestCase):
+    def test_encode(self):
+        body = encode_path(
+            -1,
+            2,
+            [{"direction": "north", "steps": 1}, {"direction": "west", "steps": 258}],
+        )
+        self.assertEqual(
+            body,
+            struct.pack("<ii", -1, 2)
+            + b"\x00\x01\x00\x00\x00"
+            + b"\x03\x02\x01\x00\x00",
+        )
+
+    def test_round_trip(self):
+        commands = [
+            {"direction": "east", "steps": 2},
+            {"direction": "north", "steps": 1},
+            {"direction": "south", "steps": 2**31 - 1},
+        ]
+        body = encode_path(10, 22, commands)
+        path = decode_path(body)
+        self.assertEqual((path.x, path.y), (10, 22))
+        self.assertEqual(path.directions.tolist(), [1, 0, 2])
+        self.assertEqual(path.steps.tolist(), [2, 1, 2**31 - 1])
+        self.assertEqual(len(path.commands), 3)
+        # views of the body, not copies
+        self.assertFalse(path.steps.flags.writeable)
+        self.assertTrue(np.shares_memory(path.steps, np.frombuffer(body, np.uint8)))
+
+        self.assertEqual(
+            execute_arrays_numpy(path.directions, path.steps, path.x, path.y)[0],
+            execute_commands_v2(commands, 10, 22)[0],
+        )
+
+    def test_empty_path(self):
+        path = decode_path(encode_path(0, 0, []))
+        self.assertEqual(len(path.commands), 0)
+        self.assertEqual(execute_arrays_numpy(path.directions, path.steps, 0, 0)[0], 1)
+
+    def test_invalid_body(self):
+        valid = encode_path(0, 0, [{"direction": "north", "steps": 1}])
+        for body in [
+            b"",
+            valid[:-1],
+            struct.pack("<ii", 100001, 0),
+            valid[:8] + b"\x04\x01\x00\x00\x00",
+            valid[:8] + b"\x00\xff\xff\xff\xff",
+            valid[:8] + b"\x00\x01\x00\x00\x00" * 10001,
+        ]:
+            with self.assertRaises(InvalidInputError) as context:
+                decode_path(body)
+            self.assertEqual(len(context.exception.errors), 1)
+
+    def test_records_cache_key(self):
+        first = decode_path(encode_path(0, 0, [{"direction": "north", "steps": 1}]))
+        moved = decode_path(encode_path(5, 5, [{"direction": "north", "steps": 1}]))
+        other = decode_path(encode_path(0, 0, [{"direction": "north", "steps": 2}]))
+        self.assertEqual(
+            records_cache_key(first.commands), records_cache_key(moved.commands)
+        )
+        self.assertNotEqual(
+            records_cache_key(first.commands), records_cache_key(other.commands)
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+import os
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+from app import create_app, get_db
+from app.db_queries import ExecutionQueryService, ExecutionWriteBuffer
+from app.models import Execution
+
+db = get_db()
+
+
+class TestExecutionWriteBuffer(unittest.TestCase):
+    def setUp(self):
+        """Set up the application on a temporary SQLite database."""
+        self.db = db
+        handle, self.path = tempfile.mkstemp(suffix=".db")
+        os.close(handle)
+        with patch.dict(os.environ, {"DATABASE_URI": f"sqlite:///{self.path}"}):
+            self.app = create_app(db)
+        with self.app.app_context():
+            self.db.create_all()
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def count_rows(self):
+        with self.app.app_context():
+            return Execution.query.count()
+
+    def test_add_execution_is_written_on_flush(self):
+        write_buffer = ExecutionWriteBuffer(self.app, self.db, max_interval=60)
+        service = ExecutionQueryService(self.db, write_buffer)
+
+        execution = service.add_execution(5, 10, 0.1)
+        self.assertIsNotNone(execution.timestamp)
+        self.assertEqual(self.count_rows(), 0)
+
+        self.assertEqual(write_buffer.flush(), 1)
+        self.assertEqual(self.count_rows(), 1)
+        write_buffer.close()
+
+    def test_add_executions_without_buffer(self):
+        service = ExecutionQueryService(self.db)
+        with self.app.app_context():
+            rows = service.add_executions([(1, 2, 0.1), (3, 4, 0.2)])
+        self.assertEqual([row["result"] for row in rows], [2, 4])
+        self.assertEqual(self.count_rows(), 2)
+
+    def test_flush_on_size(self):
+        write_buffer = ExecutionWriteBuffer(
+            self.app, self.db, max_size=3, max_interval=60
+        )
+        service = ExecutionQueryService(self.db, write_buffer)
+        for _ in range(3):
+            service.add_execution(1, 2, 0.1)
+
+        for _ in range(50):
+            if self.count_rows() == 3:
+                break
+            time.sleep(0.02)
+        self.assertEqual(self.count_rows(), 3)
+        write_buffer.close()
+
+    def test_close_flushes_remaining_rows(self):
+        write_buffer = ExecutionWriteBuffer(self.app, self.db, max_interval=60)
+        service = ExecutionQueryService(self.db, write_buffer)
+        service.add_execution(1, 2, 0.1)
+        service.add_execution(3, 4, 0.1)
+
+        write_buffer.close()
+        self.assertEqual(self.count_rows(), 2)
+
+    def test_synchronous_mode(self):
+        service = ExecutionQueryService(self.db)
+        with self.app.app_context():
+            execution = service.add_execution(5, 10, 0.1)
+            self.assertIsNotNone(execution.id)
+        self.assertEqual(self.count_rows(), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,437 @@
+import datetime
+from functools import lru_cache
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+import numpy as np
+
+from app.execute_commands_numpy import DIRECTION_CODES
+from app.normalize_commands import MOVES, NormalizationStats, normalize_moves
+from app.rollups import RESOLUTIONS
+
+COORDINATE_LIMIT = 100000
+MAX_COMMANDS = 10000
+# keeps the positions of the array engines far from the int64 limits, even
+# for the commands of a whole fleet
+MAX_STEPS = 10**12
+MAX_FOOTPRINT_WIDTH = 1000
+MAX_BATCH_JOBS = 1000
+MAX_FLEET_ROBOTS = 100
+MAX_QUERY_POINTS = 1000000
+MAX_QUERY_RECTANGLES = 10000
+MAX_PAGE_SIZE = 10000
+MAX_STATS_BUCKETS = 1440
+
+ENTER_PATH_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "start": {
+            "type": "object",
+            "properties": {
+                "x": {
+                    "type": "integer",
+                    "minimum": -COORDINATE_LIMIT,
+                    "maximum": COORDINATE_LIMIT,
+                },
+                "y": {
+                    "type": "integer",
+                    "minimum": -COORDINATE_LIMIT,
+                    "maximum": COORDINATE_LIMIT,
+                },
+            },
+            "required": ["x", "y"],
+        },
+        "commmands": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "direction": {
+                        "type": "string",
+                        "enum": ["north", "south", "east", "west"],
+                    },
+                    "steps": {
+                        "type": "integer",
+                        "minimum": 0,
+                        "maximum": MAX_STEPS,
+                    },
+                },
+                "required": ["direction", "steps"],
+            },
+            "maxItems": MAX_COMMANDS,
+        },
+        "width": {"type": "integer", "minimum": 1, "maximum": MAX_FOOTPRINT_WIDTH},
+    },
+    "required": ["start", "commmands"],
+}
+ENTER_PATHS_SCHEMA = {"type": "array", "maxItems": MAX_BATCH_JOBS}
+FLEET_COVERAGE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "robots": {"type": "array", "minItems": 1, "maxItems": MAX_FLEET_ROBOTS}
+    },
+    "required": ["robots"],
+}
+COVERAGE_QUERIES_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "points": {
+            "type": "array",
+            "items": {
+                "type": "array",
+                "items": {"type": "integer"},
+                "minItems": 2,
+                "maxItems": 2,
+            },
+            "maxItems": MAX_QUERY_POINTS,
+        },
+        "rectangles": {
+            "type": "array",
+            "items": {
+                "type": "array",
+                "items": {"type": "integer"},
+                "minItems": 4,
+                "maxItems": 4,
+            },
+            "maxItems": MAX_QUERY_RECTANGLES,
+        },
+    },
+}
+SCHEMAS = {
+    "enter-path": ENTER_PATH_SCHEMA,
+    "enter-paths": ENTER_PATHS_SCHEMA,
+    "fleet-coverage": FLEET_COVERAGE_SCHEMA,
+    "coverage-queries": COVERAGE_QUERIES_SCHEMA,
+}
+
+
+class InvalidInputError(Exception):
+    """Raised when a request body does not match its schema."""
+
+    def __init__(self, errors: List[str]):
+        super().__init__("; ".join(errors))
+        self.errors = errors
+
+
+class EnterPath(NamedTuple):
+    x: int
+    y: int
+    commands: List[Dict[str, Any]]
+    normalized: List[Dict[str, int]]
+    normalization: NormalizationStats
+    # side of the square brush of the robot, in cells
+    width: int = 1
+
+
+class FleetRobot(NamedTuple):
+    """A robot of a fleet-coverage body, a `FleetPath` of `app.fleet_coverage`."""
+
+    directions: np.ndarray
+    steps: np.ndarray
+    x: int
+    y: int
+
+
+def parse_enter_path(data: Any) -> EnterPath:
+    """
+    Validates an enter-path body against `ENTER_PATH_SCHEMA` and normalizes
+    its commands in the same pass over them, see `normalize_moves`.
+    time complexity: O(n)
+
+    The checks are specialized for the schema instead of interpreting it.
+    Only a body they reject goes through the generic jsonschema validator,
+    so the error messages are the ones jsonschema reports.
+
+    Returns:
+        EnterPath: The start position, the commands, their normalized form
+        and the brush width.
+
+    Raises:
+        InvalidInputError: With the message of the most relevant schema error.
+    """
+    try:
+        start = data["start"]
+        commands = data["commmands"]
+        x = _coordinate(start["x"])
+        y = _coordinate(start["y"])
+        if commands.__class__ is not list or len(commands) > MAX_COMMANDS:
+            raise ValueError
+        width = _width(data.get("width", 1))
+        normalized = normalize_moves(_moves(commands))
+    except (AttributeError, KeyError, TypeError, ValueError):
+        raise InvalidInputError(_schema_errors("enter-path", data))
+
+    return EnterPath(
+        x,
+        y,
+        commands,
+        normalized,
+        NormalizationStats(len(commands), len(normalized)),
+        width,
+    )
+
+
+def parse_enter_paths(jobs: Any) -> List[Union[EnterPath, InvalidInputError]]:
+    """
+    Validates an enter-paths body, every job on its own.
+
+    Returns:
+        List[Union[EnterPath, InvalidInputError]]: The parsed job, or its
+        error, for every job in order.
+
+    Raises:
+        InvalidInputError: When the body is not an array of at most
+        `MAX_BATCH_JOBS` jobs.
+    """
+    if jobs.__class__ is not list or len(jobs) > MAX_BATCH_JOBS:
+        raise InvalidInputError(_schema_errors("enter-paths", jobs))
+
+    parsed = []
+    for job in jobs:  # O(jobs)
+        try:
+            parsed.append(parse_enter_path(job))
+        except InvalidInputError as e:
+            parsed.append(e)
+    return parsed
+
+
+def parse_fleet_coverage(data: Any) -> List[FleetRobot]:
+    """
+    Validates a fleet-coverage body: `robots`, from 1 to `MAX_FLEET_ROBOTS`
+    of them, each with its own start and commands like an enter-path body.
+
+    Returns:
+        List[FleetRobot]: The parsed robots, in order.
+
+    Raises:
+        InvalidInputError: With the errors of every invalid robot, prefixed
+        with its index.
+    """
+    robots = data.get("robots") if data.__class__ is dict else None
+    if robots.__class__ is not list or not 1 <= len(robots) <= MAX_FLEET_ROBOTS:
+        raise InvalidInputError(_schema_errors("fleet-coverage", data))
+
+    parsed, errors = [], []
+    for index, robot in enumerate(robots):  # O(robots)
+        try:
+            parsed.append(parse_fleet_robot(robot))
+        except InvalidInputError as e:
+            errors.extend(f"robots[{index}]: {error}" for error in e.errors)
+    if errors:
+        raise InvalidInputError(errors)
+    return parsed
+
+
+def parse_fleet_robot(data: Any) -> FleetRobot:
+    """
+    Validates an enter-path body like `parse_enter_path`, into the arrays of
+    its commands instead of their normalized form: the fleet merges the
+    segments of all its robots anyway, and normalizing a million commands
+    took most of a fleet request.
+    time complexity: O(n)
+
+    Returns:
+        FleetRobot: The direction codes and steps of the commands, and the
+        start position.
+
+    Raises:
+        InvalidInputError: With the message of the most relevant schema error.
+    """
+    try:
+        start = data["start"]
+        commands = data["commmands"]
+        x = _coordinate(start["x"])
+        y = _coordinate(start["y"])
+        if commands.__class__ is not list or len(commands) > MAX_COMMANDS:
+            raise ValueError
+        _width(data.get("width", 1))
+        directions, steps = _move_arrays(commands)
+    except (AttributeError, KeyError, TypeError, ValueError):
+        raise InvalidInputError(_schema_errors("enter-path", data))
+    return FleetRobot(directions, steps, x, y)
+
+
+def parse_coverage_queries(data: Any) -> Tuple[EnterPath, np.ndarray, np.ndarray]:
+    """
+    Validates a coverage-queries body: an enter-path body with `points`, up
+    to `MAX_QUERY_POINTS` [x, y] cells, and `rectangles`, up to
+    `MAX_QUERY_RECTANGLES` [x1, y1, x2, y2] opposite corners. Both are
+    optional. The queries are checked by NumPy as they are converted, without
+    a Python loop over them.
+
+    Returns:
+        Tuple[EnterPath, np.ndarray, np.ndarray]: The path, and the int64
+        arrays of the points (one row each) and of the rectangles.
+
+    Raises:
+        InvalidInputError: With the message of the most relevant schema error.
+    """
+    path = parse_enter_path(data)
+    try:
+        points = _query_array(data.get("points", []), 2, MAX_QUERY_POINTS)
+        rectangles = _query_array(data.get("rectangles", []), 4, MAX_QUERY_RECTANGLES)
+    except (TypeError, ValueError):
+        raise InvalidInputError(_schema_errors("coverage-queries", data))
+    return path, points, rectangles
+
+
+def parse_executions_page(
+    args: Dict[str, str]
+) -> Tuple[Optional[Tuple[datetime.datetime, int]], int]:
+    """
+    Parses the `before=<ISO 8601 timestamp>,<id>` cursor and the `limit`
+    query parameters of get-last-executions.
+
+    Returns:
+        Tuple[Optional[Tuple[datetime.datetime, int]], int]: The cursor, None
+        for the first page, and the page size (default: 100).
+
+    Raises:
+        InvalidInputError: When a parameter is malformed.
+    """
+    errors = []
+    before = None
+    if args.get("before"):
+        try:
+            timestamp, execution_id = args["before"].rsplit(",", 1)
+            before = (datetime.datetime.fromisoformat(timestamp), int(execution_id))
+        except ValueError:
+            errors.append("'before' must be '<ISO 8601 timestamp>,<id>'")
+
+    limit = 100
+    try:
+        limit = int(args.get("limit", limit))
+        if not 1 <= limit <= MAX_PAGE_SIZE:
+            raise ValueError
+    except ValueError:
+        errors.append(f"'limit' must be an integer between 1 and {MAX_PAGE_SIZE}")
+
+    if errors:
+        raise InvalidInputError(errors)
+    return before, limit
+
+
+def parse_stats_query(
+    args: Dict[str, str], now: Optional[datetime.datetime] = None
+) -> Tuple[str, datetime.datetime, datetime.datetime]:
+    """
+    Parses the `resolution` ("minute" or "hour", default: "minute") and the
+    ISO 8601 `since` and `until` query parameters of the stats endpoint. By
+    default the range ends now and covers 60 buckets; it can cover at most
+    `MAX_STATS_BUCKETS` buckets.
+
+    Returns:
+        Tuple[str, datetime.datetime, datetime.datetime]: The resolution and
+        the [since, until) range.
+
+    Raises:
+        InvalidInputError: When a parameter is malformed.
+    """
+    resolution = args.get("resolution", "minute")
+    if resolution not in RESOLUTIONS:
+        raise InvalidInputError(
+            [f"'resolution' must be one of {', '.join(RESOLUTIONS)}"]
+        )
+    step = RESOLUTIONS[resolution]
+
+    errors = []
+    bounds = {}
+    for name in ("since", "until"):
+        if args.get(name):
+            try:
+                bounds[name] = datetime.datetime.fromisoformat(args[name])
+            except ValueError:
+                errors.append(f"'{name}' must be an ISO 8601 timestamp")
+    if errors:
+        raise InvalidInputError(errors)
+
+    until = bounds.get("until") or now or datetime.datetime.utcnow()
+    since = bounds.get("since") or until - 60 * step
+    if since >= until:
+        raise InvalidInputError(["'since' must be before 'until'"])
+    if until - since > MAX_STATS_BUCKETS * step:
+        raise InvalidInputError(
+            [f"The range can cover at most {MAX_STATS_BUCKETS} {resolution}s"]
+        )
+    return resolution, since, until
+
+
+def _moves(commands: List[Any]) -> Iterator[Tuple[int, int, int]]:
+    for command in commands:  # O(n)
+        if command.__class__ is not dict:
+            raise TypeError
+        axis, sign = MOVES[command["direction"]]
+        steps = command["steps"]
+        if steps.__class__ is not int:
+            steps = _integer(steps)
+        if not 0 <= steps <= MAX_STEPS:
+            raise ValueError
+        yield axis, sign, steps
+
+
+def _move_arrays(commands: List[Any]) -> Tuple[np.ndarray, np.ndarray]:
+    # the checks of `_moves`, a column at a time
+    count = len(commands)
+    directions = np.fromiter(
+        map(
+            DIRECTION_CODES.__getitem__, [command["direction"] for command in commands]
+        ),
+        dtype=np.int64,
+        count=count,
+    )
+    steps = [command["steps"] for command in commands]
+    if set(map(type, steps)) - {int}:
+        steps = [step if step.__class__ is int else _integer(step) for step in steps]
+    if steps and not (0 <= min(steps) and max(steps) <= MAX_STEPS):
+        raise ValueError
+    return directions, np.array(steps, dtype=np.int64).reshape(count)
+
+
+def _query_array(rows: Any, columns: int, limit: int) -> np.ndarray:
+    if rows.__class__ is not list or len(rows) > limit:
+        raise ValueError
+    if not rows:
+        return np.empty((0, columns), dtype=np.int64)
+    array = np.array(rows)
+    if array.dtype.kind == "f" and np.all(np.mod(array, 1) == 0):
+        array = array.astype(np.int64)
+    if array.dtype.kind != "i" or array.shape != (len(rows), columns):
+        raise ValueError
+    return array.astype(np.int64, copy=False)
+
+
+def _coordinate(value: Any) -> int:
+    if value.__class__ is not int:
+        value = _integer(value)
+    if not -COORDINATE_LIMIT <= value <= COORDINATE_LIMIT:
+        raise ValueError
+    return value
+
+
+def _width(value: Any) -> int:
+    if value.__class__ is not int:
+        value = _integer(value)
+    if not 1 <= value <= MAX_FOOTPRINT_WIDTH:
+        raise ValueError
+    return value
+
+
+def _integer(value: Any) -> int:
+    # jsonschema counts floats without a fractional part as integers
+    if value.__class__ is float and value.is_integer():
+        return int(value)
+    raise TypeError
+
+
+def _schema_errors(schema: str, instance: Any) -> List[str]:
+    from jsonschema.exceptions import best_match
+
+    error = best_match(_validator(schema).iter_errors(instance))
+    return [error.message if error is not None else "Invalid input"]
+
+
+@lru_cache(maxsize=None)
+def _validator(schema: str):
+    # compiled on the first invalid body; valid ones never need jsonschema
+    from jsonschema.validators import validator_for
+
+    return validator_for(SCHEMAS[schema])(SCHEMAS[schema])
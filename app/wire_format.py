@@ -0,0 +1,88 @@
+import struct
+from typing import Dict, List, NamedTuple
+
+import numpy as np
+
+from app.execute_commands_numpy import DIRECTION_CODES
+from app.validation import COORDINATE_LIMIT, MAX_COMMANDS, InvalidInputError
+
+CONTENT_TYPE = "application/x-robot-path"
+
+# start x and y
+HEADER = struct.Struct("<ii")
+# one packed 5-byte record per command
+RECORD_DTYPE = np.dtype([("direction", "u1"), ("steps", "<i4")])
+DIRECTION_NAMES = {code: name for name, code in DIRECTION_CODES.items()}
+
+
+class WirePath(NamedTuple):
+    x: int
+    y: int
+    commands: np.ndarray
+    directions: np.ndarray
+    steps: np.ndarray
+
+
+def encode_path(x: int, y: int, commands: List[Dict[str, int]]) -> bytes:
+    """
+    Encodes an enter-path body in the `application/x-robot-path` format:
+    the `HEADER` followed by one `RECORD_DTYPE` record per command, whose
+    direction is the code of `DIRECTION_CODES`, all little-endian.
+
+    Returns:
+        bytes: The encoded path, 8 + 5 * len(commands) bytes long.
+    """
+    records = np.empty(len(commands), dtype=RECORD_DTYPE)
+    records["direction"] = [
+        DIRECTION_CODES[command["direction"]] for command in commands
+    ]
+    records["steps"] = [command["steps"] for command in commands]
+    return HEADER.pack(x, y) + records.tobytes()
+
+
+def decode_path(body: bytes) -> WirePath:
+    """
+    Decodes and validates a path encoded by `encode_path`. The command arrays
+    are read-only views of `body`, nothing is copied.
+    time complexity: O(n), in NumPy
+
+    Returns:
+        WirePath: The start position, the records and their direction and
+        steps columns.
+
+    Raises:
+        InvalidInputError: When the body is not a valid path.
+    """
+    if len(body) < HEADER.size or (len(body) - HEADER.size) % RECORD_DTYPE.itemsize:
+        raise InvalidInputError(
+            [
+                f"Body must be {HEADER.size} + {RECORD_DTYPE.itemsize} * commands "
+                f"bytes long, got {len(body)}"
+            ]
+        )
+    x, y = HEADER.unpack_from(body)
+    commands = np.frombuffer(body, dtype=RECORD_DTYPE, offset=HEADER.size)
+
+    errors = []
+    for name, value in (("x", x), ("y", y)):
+        if not -COORDINATE_LIMIT <= value <= COORDINATE_LIMIT:
+            errors.append(
+                f"Start {name} {value} is out of [-{COORDINATE_LIMIT}, {COORDINATE_LIMIT}]"
+            )
+    if len(commands) > MAX_COMMANDS:
+        errors.append(
+            f"{len(commands)} commands is more than the maximum of {MAX_COMMANDS}"
+        )
+    directions, steps = commands["direction"], commands["steps"]
+    invalid = np.flatnonzero(directions >= len(DIRECTION_CODES))
+    if len(invalid):
+        errors.append(
+            f"Command {invalid[0]} has unknown direction code {directions[invalid[0]]}"
+        )
+    invalid = np.flatnonzero(steps < 0)
+    if len(invalid):
+        errors.append(f"Command {invalid[0]} has negative steps {steps[invalid[0]]}")
+    if errors:
+        raise InvalidInputError(errors)
+
+    return WirePath(x, y, commands, directions, steps)